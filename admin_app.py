@@ -1,49 +1,33 @@
 import streamlit as st
-import os
-import json
 import uuid
-from PIL import Image # Importar Image para el manejo de archivos
-
-# --- Funciones de Gestión de Datos ---
-def create_empty_data():
-    """Crea una estructura de datos completa y vacía para el archivo JSON."""
-    return {
-        "products": [],
-        "banners": [],
-        "news": [],
-        "testimonials": [],
-        "nav_menu": ["Inicio", "Peluquería", "Barbería", "Accesorios", "Herramientas", "Equipamientos", "Novedades", "Contacto", "Sobre Nosotros"],
-        "home_texts": {},
-        "contact_info": {},
-        "about_us": {},
-        "faqs": [],
-        "cta_texts": {}
-    }
-
-def load_data():
-    """Carga los datos desde el archivo data.json o crea una estructura por defecto."""
-    if os.path.exists("data.json"):
-        with open("data.json", "r", encoding="utf-8") as f:
-            try:
-                data = json.load(f)
-                # Asegura que todas las claves necesarias existan
-                for key, default_value in create_empty_data().items():
-                    if key not in data:
-                        data[key] = default_value
-                return data
-            except json.JSONDecodeError:
-                st.error("Error al decodificar el archivo data.json. Se usará una estructura vacía.")
-                return create_empty_data()
-    # Si el archivo no existe, crea la estructura completa
-    return create_empty_data()
-
-def save_data(data_to_save):
-    """Guarda los datos en el archivo data.json."""
-    try:
-        with open("data.json", "w", encoding="utf-8") as f:
-            json.dump(data_to_save, f, indent=4, ensure_ascii=False)
-    except IOError as e:
-        st.error(f"Error al guardar el archivo data.json: {e}")
+import tempfile
+from minerva.assets import asset_path, stylesheet
+from minerva.bulk import FORMATS, PRODUCT_FIELDS, export_products, import_products, iter_rows
+from minerva.catalog import (
+    CATEGORIES,
+    DECODE_ERROR,
+    RECOVERED_ERROR,
+    create_empty_data,
+    get_catalog,
+    last_save_error,
+    load_data,
+    load_last_version,
+    restore_version,
+    save_data,
+)
+from minerva.image_store import store_upload
+from minerva.images import PLACEHOLDER_IMAGE
+from minerva.staging import SECTION_LABELS, ChangeSet, describe_changes
+from minerva.versions import get_versions
+
+try:
+    from streamlit_sortables import sort_items
+except ImportError:  # dependencia opcional: sin ella se reordena con ▲/▼
+    sort_items = None
+
+USER_PLACEHOLDER = asset_path("usuario.svg")
+# Diferencias que se despliegan en "Cambios Pendientes"
+MAX_PREVIEW_DIFFS = 50
 
 # --- Configuración de la página del administrador ---
 st.set_page_config(
@@ -52,22 +36,105 @@ st.set_page_config(
     layout="wide",
 )
 
-# --- CSS personalizado ---
-def local_css(file_name):
-    """Importa un archivo CSS local."""
+# --- CSS personalizado (se lee una vez por proceso) ---
+styles = stylesheet()
+if styles:
+    st.markdown(styles, unsafe_allow_html=True)
+else:
+    st.warning("Advertencia: El archivo CSS 'style.css' no se encontró.")
+
+# --- Lógica de la aplicación principal ---
+# Los cambios de todas las secciones se acumulan en un borrador por sesión y
+# se publican juntos desde "Cambios Pendientes" (una sola escritura). Sin
+# cambios pendientes, el borrador se renueva cuando el catálogo cambia en disco.
+catalog_version = get_catalog().version
+changes = st.session_state.get("change_set")
+if changes is None or (not changes.pending() and changes.version != catalog_version):
     try:
-        if os.path.exists(file_name):
-            with open(file_name, encoding="utf-8") as f:
-                st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
+        changes = ChangeSet(load_data(), catalog_version)
+    except ValueError:
+        # data.json dañado: se parte de la última versión y al publicar se reescribe
+        recovered, manifest = load_last_version()
+        if recovered is None:
+            st.error(DECODE_ERROR)
+            changes = ChangeSet(create_empty_data(), catalog_version)
         else:
-            st.warning(f"Advertencia: El archivo CSS '{file_name}' no se encontró.")
-    except Exception as e:
-        st.error(f"Error al cargar el archivo CSS: {e}")
+            st.error(RECOVERED_ERROR.format(**manifest))
+            changes = ChangeSet(recovered, catalog_version)
+    st.session_state.change_set = changes
+data = changes.draft
 
-local_css("style.css")
 
-# --- Lógica de la aplicación principal ---
-data = load_data()
+def move_item(key, index, offset):
+    """Intercambia el elemento `index` de data[key] con su vecino (callback de ▲/▼)."""
+    items = st.session_state.change_set.draft[key]
+    items[index], items[index + offset] = items[index + offset], items[index]
+    st.session_state.change_set.stage()
+
+
+def remove_item(key, index, message):
+    """Quita el elemento `index` de data[key] del borrador."""
+    st.session_state.change_set.draft[key].pop(index)
+    st.session_state.change_set.stage()
+    st.toast(message)
+
+
+def remove_by_id(key, item_id, message):
+    draft = st.session_state.change_set.draft
+    draft[key] = [item for item in draft[key] if item.get("id") != item_id]
+    st.session_state.change_set.stage()
+    st.toast(message)
+
+
+def publish_changes():
+    """Publica el borrador de la sesión con un solo guardado (y una versión nueva)."""
+    change_set = st.session_state.change_set
+    try:
+        current = load_data()
+    except ValueError:
+        current = change_set.base
+    message = f"{len(change_set.ops())} cambios publicados desde el panel"
+    error = change_set.commit(current, lambda doc, ops: save_data(doc, message, ops))
+    if error:
+        st.session_state.publish_error = f"Error al guardar el archivo data.json: {error}"
+    else:
+        st.toast("Cambios publicados.")
+
+
+def restore(version_id):
+    """Publica el contenido de una versión anterior y descarta el borrador."""
+    error = restore_version(version_id)
+    if error:
+        st.session_state.publish_error = f"No se pudo restaurar la versión {version_id}: {error}"
+    else:
+        st.session_state.change_set = None
+        st.toast(f"Versión {version_id} restaurada.")
+
+
+def update_texts(key, values):
+    """
+    Copia al borrador los textos del formulario que cambiaron. Los campos
+    vacíos que no se tocaron siguen ausentes y la tienda usa su texto por defecto.
+    """
+    texts = data[key]
+    texts.update({field: value for field, value in values.items() if value != texts.get(field, "")})
+    changes.stage()
+
+
+def show_changes(rows):
+    """Tabla de cambios y, para los primeros, su diff."""
+    st.dataframe([{key: row[key] for key in ("seccion", "cambio", "elemento")} for row in rows],
+                 use_container_width=True)
+    # La vista previa de una importación masiva puede tener miles de filas
+    for row in rows[:MAX_PREVIEW_DIFFS]:
+        with st.expander(f"{row['seccion']} · {row['cambio']} {row['elemento']}".strip()):
+            st.code(row["diff"] or "(sin diferencias de contenido)", language="diff")
+    if len(rows) > MAX_PREVIEW_DIFFS:
+        st.caption(f"Se muestran las diferencias de los primeros {MAX_PREVIEW_DIFFS} cambios de {len(rows)}.")
+
+
+if last_save_error():
+    st.error(f"Error al guardar el archivo data.json: {last_save_error()}")
 
 st.title("Panel de Administración de Minerva")
 st.subheader("Bienvenido/a al Panel de Control. Gestiona el contenido de tu sitio web.")
@@ -76,6 +143,7 @@ st.subheader("Bienvenido/a al Panel de Control. Gestiona el contenido de tu siti
 st.sidebar.title("Menú de Gestión")
 selection = st.sidebar.radio("Elige una sección:", [
     "Productos",
+    "Importación / Exportación Masiva",
     "Banners",
     "Testimonios",
     "Textos de la Página de Inicio",
@@ -84,9 +152,17 @@ selection = st.sidebar.radio("Elige una sección:", [
     "Información de Contacto",
     "Textos de 'Sobre Nosotros'",
     "Preguntas Frecuentes (FAQs)",
-    "Textos de Llamada a la Acción (CTA)"
+    "Textos de Llamada a la Acción (CTA)",
+    "Cambios Pendientes",
+    "Versiones",
 ])
 
+pending_count = len(changes.ops())
+if pending_count:
+    st.sidebar.warning(f"{pending_count} cambios sin publicar. Revísalos y publícalos en «Cambios Pendientes».")
+else:
+    st.sidebar.caption("No hay cambios sin publicar.")
+
 # --- Gestión de Productos ---
 if selection == "Productos":
     st.header("Gestión de Productos")
@@ -95,7 +171,7 @@ if selection == "Productos":
     # Manejo de edición de producto
     product_to_edit = None
     if 'edit_product_id' in st.session_state and st.session_state.edit_product_id:
-        product_to_edit = next((item for item in data["products"] if item["id"] == st.session_state.edit_product_id), None)
+        product_to_edit = next((item for item in data["products"] if item.get("id") == st.session_state.edit_product_id), None)
         if not product_to_edit:
             st.warning("Producto no encontrado para editar. Creando uno nuevo.")
             st.session_state.edit_product_id = None # Resetear para crear nuevo
@@ -108,6 +184,9 @@ if selection == "Productos":
         nombre = st.text_input("Nombre del Producto", value=product_to_edit.get("nombre", "") if product_to_edit else "")
         descripcion = st.text_area("Descripción Corta del Producto", value=product_to_edit.get("descripcion", "") if product_to_edit else "", height=100)
         precio = st.text_input("Precio (Ej: '$15.999')", value=product_to_edit.get("precio", "") if product_to_edit else "")
+        category_options = ["Sin categoría"] + CATEGORIES
+        current_category = product_to_edit.get("categoria", "") if product_to_edit else ""
+        categoria = st.selectbox("Categoría", category_options, index=category_options.index(current_category) if current_category in category_options else 0)
 
         # Campo para subir imagen
         st.subheader("Imagen del Producto")
@@ -129,20 +208,10 @@ if selection == "Productos":
                 image_to_save = imagen_url_input # Inicialmente, toma la URL escrita
 
                 if uploaded_image is not None:
-                    # En una aplicación real, aquí guardarías la imagen en un servidor o almacenamiento
-                    # y obtendrías su URL. Por ahora, simulamos que se guarda y se obtiene una URL.
-                    # Ejemplo: image_to_save = save_uploaded_image_and_get_url(uploaded_image)
-                    # Para este ejemplo, si se sube una imagen, la usaremos como URL temporal.
-                    # Si tienes un sistema de archivos, deberías actualizar esta lógica.
+                    # Se guarda en el almacén por contenido: una imagen repetida reutiliza el archivo existente
                     try:
-                        img = Image.open(uploaded_image)
-                        img_path = f"images/{uploaded_image.name}" # Ruta donde se guardaría (simulado)
-                        # Aquí deberías implementar la lógica para guardar la imagen de forma persistente
-                        # y obtener su URL. Para este ejemplo, usaremos la ruta simulada.
-                        # Si el archivo ya existe, podrías sobrescribirlo o renombrarlo.
-                        # img.save(img_path) # Descomentar si tienes un sistema de guardado
-                        image_to_save = img_path # Usamos la ruta simulada como referencia
-                        st.warning(f"Imagen '{uploaded_image.name}' subida. En una implementación real, se guardaría y se generaría una URL.")
+                        image_to_save = store_upload(uploaded_image)
+                        st.info(f"Imagen '{uploaded_image.name}' guardada en {image_to_save}.")
                     except Exception as e:
                         st.error(f"Error al procesar la imagen subida: {e}")
                         image_to_save = "" # Limpiar si hay error
@@ -158,6 +227,7 @@ if selection == "Productos":
                         "nombre": nombre,
                         "descripcion": descripcion,
                         "precio": precio,
+                        "categoria": categoria if categoria in CATEGORIES else "",
                         "imagen": image_to_save,
                         "detalles": detalles
                     })
@@ -168,19 +238,26 @@ if selection == "Productos":
                         "nombre": nombre,
                         "descripcion": descripcion,
                         "precio": precio,
+                        "categoria": categoria if categoria in CATEGORIES else "",
                         "imagen": image_to_save,
                         "detalles": detalles
                     }
                     data["products"].append(new_product)
                     st.success("Producto agregado con éxito!")
 
-                save_data(data)
                 if 'product_to_edit' in locals():
                     del st.session_state.edit_product_id # Limpiar estado de edición
+                changes.stage()
                 st.rerun()
             else:
                 st.error("Por favor, completa los campos obligatorios: Nombre, Descripción y Precio.")
 
+    # Registros que la tienda descarta por no cumplir el esquema (validados una vez por versión)
+    product_errors = get_catalog().product_errors
+    if product_errors:
+        st.warning(f"{len(product_errors)} productos tienen datos inválidos y no se muestran en la tienda.")
+        st.dataframe(product_errors, use_container_width=True)
+
     st.markdown("---")
     st.subheader("Lista de Productos Existentes")
     if not data["products"]:
@@ -196,30 +273,67 @@ if selection == "Productos":
                         if product.get('imagen'):
                             st.image(product.get('imagen'), width=150, use_column_width=False)
                         else:
-                            st.image("https://via.placeholder.com/150x150.png?text=Sin+Imagen", width=150, use_column_width=False)
+                            st.image(PLACEHOLDER_IMAGE, width=150, use_column_width=False)
                     except Exception as e:
                         st.error(f"Error al cargar imagen: {e}")
-                        st.image("https://via.placeholder.com/150x150.png?text=Error+Imagen", width=150, use_column_width=False)
+                        st.image(PLACEHOLDER_IMAGE, width=150, use_column_width=False)
 
                 with col2:
                     st.write(f"**Descripción:** {product.get('descripcion', 'N/A')}")
                     st.write(f"**Precio:** {product.get('precio', 'N/A')}")
+                    st.write(f"**Categoría:** {product.get('categoria') or 'Sin categoría'}")
                     st.write(f"**URL Imagen:** {product.get('imagen', 'N/A')}")
                     st.write(f"**Detalles:** {product.get('detalles', 'N/A')}")
 
                 # Botones de acción para cada producto
                 col_buttons_1, col_buttons_2 = st.columns(2)
                 with col_buttons_1:
-                    if st.button("Eliminar", key=f"del_prod_{product['id']}"):
-                        data["products"] = [p for p in data["products"] if p["id"] != product["id"]]
-                        save_data(data)
-                        st.success("Producto eliminado.")
-                        st.rerun()
+                    st.button("Eliminar", key=f"del_prod_{product['id']}", on_click=remove_by_id,
+                              args=("products", product["id"], "Producto eliminado."))
                 with col_buttons_2:
                     if st.button("Editar", key=f"edit_prod_{product['id']}"):
                         st.session_state.edit_product_id = product["id"] # Almacenar el ID del producto a editar
                         st.rerun() # Recargar la app para mostrar el formulario de edición
 
+# --- Importación / Exportación Masiva de Productos ---
+elif selection == "Importación / Exportación Masiva":
+    st.header("Importación / Exportación Masiva de Productos")
+    st.markdown("Carga o descarga el catálogo completo en CSV o JSON Lines. Las filas con un `id` existente actualizan ese producto; el resto se agregan como productos nuevos.")
+    st.caption(f"Columnas: {', '.join(PRODUCT_FIELDS)}. Obligatorias para productos nuevos: nombre y precio.")
+
+    st.subheader("Importar")
+    bulk_file = st.file_uploader("Selecciona un archivo CSV o JSONL", type=["csv", "jsonl"], key="bulk_import_uploader")
+    if bulk_file is not None and st.button("Importar productos"):
+        bulk_format = "jsonl" if bulk_file.name.lower().endswith(".jsonl") else "csv"
+        progress = st.empty()
+        report = import_products(
+            iter_rows(bulk_file, bulk_format),
+            data["products"],
+            on_batch=lambda processed: progress.text(f"Filas procesadas: {processed}"),
+        )
+        # Queda en el borrador: se publica con el resto de los cambios
+        changes.stage()
+        st.success(f"Importación terminada: {report.inserted} productos nuevos, {report.updated} actualizados. "
+                   "Publícala desde «Cambios Pendientes».")
+        if report.errors:
+            st.warning(f"{len(report.errors)} filas con errores no se importaron.")
+            st.dataframe(report.errors[:500], use_container_width=True)
+
+    st.markdown("---")
+    st.subheader("Exportar")
+    export_format = st.radio("Formato", FORMATS, horizontal=True, format_func=str.upper)
+    if st.button("Generar archivo de exportación"):
+        # Se escribe fila por fila a un temporal (en disco si supera los 8 MB)
+        with tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) as export_file:
+            export_products(data["products"], export_format, export_file)
+            export_file.seek(0)
+            st.download_button(
+                "Descargar productos",
+                data=export_file.read(),
+                file_name=f"productos.{export_format}",
+                mime="text/csv" if export_format == "csv" else "application/jsonl",
+            )
+
 # --- Gestión de Banners ---
 elif selection == "Banners":
     st.header("Gestión de Banners")
@@ -253,14 +367,9 @@ elif selection == "Banners":
         submit_button = st.form_submit_button("Guardar Banner")
         if submit_button:
             if uploaded_banner_image is not None:
-                # En una aplicación real, aquí guardarías la imagen en un servidor o almacenamiento
-                # y obtendrías su URL. Por ahora, simulamos que se guarda y se obtiene una URL.
                 try:
-                    img = Image.open(uploaded_banner_image)
-                    img_path = f"images/{uploaded_banner_image.name}" # Ruta donde se guardaría (simulado)
-                    # img.save(img_path) # Descomentar si tienes un sistema de guardado
-                    img_url = img_path # Usamos la ruta simulada como referencia
-                    st.warning(f"Imagen '{uploaded_banner_image.name}' subida. En una implementación real, se guardaría y se generaría una URL.")
+                    img_url = store_upload(uploaded_banner_image)
+                    st.info(f"Imagen '{uploaded_banner_image.name}' guardada en {img_url}.")
                 except Exception as e:
                     st.error(f"Error al procesar la imagen del banner subida: {e}")
                     img_url = "" # Limpiar si hay error
@@ -275,9 +384,9 @@ elif selection == "Banners":
                     new_banner = {"img": img_url, "id": str(uuid.uuid4())}
                     data["banners"].append(new_banner)
                     st.success("Banner agregado.")
-                save_data(data)
                 if 'edit_banner_id' in st.session_state:
                     del st.session_state.edit_banner_id
+                changes.stage()
                 st.rerun()
 
     st.markdown("---")
@@ -285,19 +394,34 @@ elif selection == "Banners":
     if not data["banners"]:
         st.info("Aún no hay banners para mostrar.")
     else:
+        if sort_items is not None:
+            # Orden del carrusel por arrastre; cada etiqueta identifica un banner por su id
+            labels = {f"Banner {b['id'][:8]} · {b.get('img', '').rsplit('/', 1)[-1]}": b for b in data["banners"] if "id" in b}
+            if len(labels) == len(data["banners"]):
+                st.write("Arrastra los banners para cambiar el orden del carrusel.")
+                # La clave cambia con cada edición del borrador: el componente guarda su último
+                # orden por clave y, si no, podría devolver banners ya quitados o sin los nuevos
+                new_order = sort_items(list(labels), key=f"banner_sort_{changes.revision}")
+                if new_order != list(labels) and sorted(new_order) == sorted(labels):
+                    data["banners"] = [labels[label] for label in new_order]
+                    changes.stage()
         # Iterar sobre una copia para evitar problemas al modificar la lista mientras se itera
-        for banner in list(data["banners"]):
+        for i, banner in enumerate(list(data["banners"])):
             try:
                 # Usar el ID directamente ya que está asegurado por la función create_empty_data
-                with st.expander(f"**Banner {banner.get('id', 'sin ID')[:8]}**"):
+                with st.expander(f"**{i + 1}. Banner {banner.get('id', 'sin ID')[:8]}**"):
                     st.image(banner.get('img'), caption=f"Banner {banner.get('id', 'sin ID')[:8]}", use_column_width=True)
-                    col1, col2 = st.columns(2)
+                    col1, col2, col3, col4 = st.columns(4)
+                    if sort_items is None:
+                        with col3:
+                            if i > 0:
+                                st.button("▲", key=f"up_ban_{banner['id']}", on_click=move_item, args=("banners", i, -1))
+                        with col4:
+                            if i < len(data["banners"]) - 1:
+                                st.button("▼", key=f"down_ban_{banner['id']}", on_click=move_item, args=("banners", i, 1))
                     with col1:
-                        if st.button("Eliminar", key=f"del_ban_{banner['id']}"):
-                            data["banners"] = [b for b in data["banners"] if b["id"] != banner["id"]]
-                            save_data(data)
-                            st.success("Banner eliminado.")
-                            st.rerun()
+                        st.button("Eliminar", key=f"del_ban_{banner['id']}", on_click=remove_by_id,
+                                  args=("banners", banner["id"], "Banner eliminado."))
                     with col2:
                          if st.button("Editar", key=f"edit_ban_{banner['id']}"):
                             st.session_state.edit_banner_id = banner["id"]
@@ -326,11 +450,11 @@ elif selection == "Testimonios":
                     "name": name,
                     "city": city,
                     "quote": quote,
-                    "image": image_url or "https://via.placeholder.com/100x100.png?text=User"
+                    "image": image_url
                 }
                 data["testimonials"].append(new_testimonial)
-                save_data(data)
                 st.success("Testimonio agregado con éxito.")
+                changes.stage()
                 st.rerun()
             else:
                 st.error("Por favor, completa los campos obligatorios: Nombre y Cita.")
@@ -349,18 +473,15 @@ elif selection == "Testimonios":
                         if test.get('image'):
                             st.image(test.get('image'), width=75)
                         else:
-                            st.image("https://via.placeholder.com/75x75.png?text=User", width=75)
+                            st.image(USER_PLACEHOLDER, width=75)
                     except Exception as e:
                         st.error(f"Error al cargar imagen del testimonio: {e}")
-                        st.image("https://via.placeholder.com/75x75.png?text=Error", width=75)
+                        st.image(USER_PLACEHOLDER, width=75)
                 with col2:
                     st.write(f"**Cita:** {test.get('quote')}")
                 
-                if st.button("Eliminar", key=f"del_test_{i}"):
-                    data["testimonials"].pop(i)
-                    save_data(data)
-                    st.success("Testimonio eliminado.")
-                    st.rerun()
+                st.button("Eliminar", key=f"del_test_{i}", on_click=remove_item,
+                          args=("testimonials", i, "Testimonio eliminado."))
 
 # --- Gestión de Textos de la Página de Inicio ---
 elif selection == "Textos de la Página de Inicio":
@@ -368,34 +489,35 @@ elif selection == "Textos de la Página de Inicio":
     st.markdown("Aquí puedes editar los textos principales de la página de inicio.")
 
     with st.form("edit_home_texts_form"):
+        values = {}
         st.subheader("Textos Principales del Hero")
-        data["home_texts"]['hero_title'] = st.text_input("Título Principal del Hero", value=data["home_texts"].get('hero_title', ''))
-        data["home_texts"]['hero_subtitle'] = st.text_area("Subtítulo del Hero", value=data["home_texts"].get('hero_subtitle', ''), height=50)
-        data["home_texts"]['hero_description'] = st.text_area("Descripción del Hero", value=data["home_texts"].get('hero_description', ''), height=100)
+        values['hero_title'] = st.text_input("Título Principal del Hero", value=data["home_texts"].get('hero_title', ''))
+        values['hero_subtitle'] = st.text_area("Subtítulo del Hero", value=data["home_texts"].get('hero_subtitle', ''), height=50)
+        values['hero_description'] = st.text_area("Descripción del Hero", value=data["home_texts"].get('hero_description', ''), height=100)
 
         st.markdown("---")
         st.subheader("Sección 'Por Qué Elegir Minerva'")
-        data["home_texts"]['section1_title'] = st.text_input("Título de la Sección 'Por Qué Elegir Minerva'", value=data["home_texts"].get('section1_title', ''))
-        data["home_texts"]['section1_description'] = st.text_area("Descripción de la Sección 'Por Qué Elegir Minerva'", value=data["home_texts"].get('section1_description', ''), height=50)
+        values['section1_title'] = st.text_input("Título de la Sección 'Por Qué Elegir Minerva'", value=data["home_texts"].get('section1_title', ''))
+        values['section1_description'] = st.text_area("Descripción de la Sección 'Por Qué Elegir Minerva'", value=data["home_texts"].get('section1_description', ''), height=50)
 
         st.markdown("---")
         st.subheader("Sección 'Nuestras Líneas de Productos'")
-        data["home_texts"]['section2_title'] = st.text_input("Título de la Sección 'Líneas de Productos'", value=data["home_texts"].get('section2_title', ''))
-        data["home_texts"]['section2_description'] = st.text_area("Descripción de la Sección 'Líneas de Productos'", value=data["home_texts"].get('section2_description', ''), height=50)
+        values['section2_title'] = st.text_input("Título de la Sección 'Líneas de Productos'", value=data["home_texts"].get('section2_title', ''))
+        values['section2_description'] = st.text_area("Descripción de la Sección 'Líneas de Productos'", value=data["home_texts"].get('section2_description', ''), height=50)
 
         st.markdown("---")
         st.subheader("Sección de Testimonios")
-        data["home_texts"]['testimonials_title'] = st.text_input("Título de la Sección 'Testimonios'", value=data["home_texts"].get('testimonials_title', ''))
-        data["home_texts"]['testimonials_description'] = st.text_area("Descripción de la Sección 'Testimonios'", value=data["home_texts"].get('testimonials_description', ''), height=50)
+        values['testimonials_title'] = st.text_input("Título de la Sección 'Testimonios'", value=data["home_texts"].get('testimonials_title', ''))
+        values['testimonials_description'] = st.text_area("Descripción de la Sección 'Testimonios'", value=data["home_texts"].get('testimonials_description', ''), height=50)
 
         st.markdown("---")
         st.subheader("Sección de Bestsellers")
-        data["home_texts"]['bestsellers_title'] = st.text_input("Título de la Sección 'Más Vendidos'", value=data["home_texts"].get('bestsellers_title', ''))
-        data["home_texts"]['bestsellers_description'] = st.text_area("Descripción de la Sección 'Más Vendidos'", value=data["home_texts"].get('bestsellers_description', ''), height=50)
+        values['bestsellers_title'] = st.text_input("Título de la Sección 'Más Vendidos'", value=data["home_texts"].get('bestsellers_title', ''))
+        values['bestsellers_description'] = st.text_area("Descripción de la Sección 'Más Vendidos'", value=data["home_texts"].get('bestsellers_description', ''), height=50)
 
         edit_texts_button = st.form_submit_button("Guardar Cambios")
         if edit_texts_button:
-            save_data(data)
+            update_texts("home_texts", values)
             st.success("Textos de inicio actualizados con éxito!")
             st.rerun()
 
@@ -411,8 +533,8 @@ elif selection == "Gestión del Menú de Navegación":
         if submit_new_item and new_item_name:
             if new_item_name not in data["nav_menu"]:
                 data["nav_menu"].append(new_item_name)
-                save_data(data)
                 st.success("Botón agregado con éxito.")
+                changes.stage()
                 st.rerun()
             else:
                 st.error("Ese botón ya existe.")
@@ -422,30 +544,27 @@ elif selection == "Gestión del Menú de Navegación":
     if not data["nav_menu"]:
         st.info("El menú está vacío.")
     else:
-        st.write("Usa los botones para reordenar o eliminar los elementos del menú.")
-        # Iterar sobre una copia para evitar problemas al modificar la lista mientras se itera
-        for i, item in enumerate(list(data["nav_menu"])):
+        if sort_items is not None:
+            st.write("Arrastra los botones para reordenarlos.")
+            new_order = sort_items(list(data["nav_menu"]), key=f"nav_sort_{changes.revision}")
+            if new_order != data["nav_menu"] and sorted(new_order) == sorted(data["nav_menu"]):
+                data["nav_menu"] = new_order
+                changes.stage()
+        else:
+            st.write("Usa los botones para reordenar los elementos del menú.")
+        for i, item in enumerate(data["nav_menu"]):
             col1, col2, col3, col4 = st.columns([4, 1, 1, 1])
             with col1:
                 st.markdown(f"**{i+1}. {item}**")
             with col2:
-                if st.button("Eliminar", key=f"del_nav_{i}"):
-                    data["nav_menu"].pop(i)
-                    save_data(data)
-                    st.success("Botón eliminado.")
-                    st.rerun()
-            with col3:
-                # Asegurarse de que el índice sea válido antes de intentar mover hacia arriba
-                if i > 0 and st.button("▲", key=f"up_nav_{i}"):
-                    data["nav_menu"][i], data["nav_menu"][i-1] = data["nav_menu"][i-1], data["nav_menu"][i]
-                    save_data(data)
-                    st.rerun()
-            with col4:
-                # Asegurarse de que el índice sea válido antes de intentar mover hacia abajo
-                if i < len(data["nav_menu"]) - 1 and st.button("▼", key=f"down_nav_{i}"):
-                    data["nav_menu"][i], data["nav_menu"][i+1] = data["nav_menu"][i+1], data["nav_menu"][i]
-                    save_data(data)
-                    st.rerun()
+                st.button("Eliminar", key=f"del_nav_{i}", on_click=remove_item, args=("nav_menu", i, "Botón eliminado."))
+            if sort_items is None:
+                with col3:
+                    if i > 0:
+                        st.button("▲", key=f"up_nav_{i}", on_click=move_item, args=("nav_menu", i, -1))
+                with col4:
+                    if i < len(data["nav_menu"]) - 1:
+                        st.button("▼", key=f"down_nav_{i}", on_click=move_item, args=("nav_menu", i, 1))
 
 # --- Gestión de Novedades ---
 elif selection == "Novedades":
@@ -463,12 +582,12 @@ elif selection == "Novedades":
             new_news = {
                 "titulo": title,
                 "contenido": content,
-                "imagen": image_url or "https://via.placeholder.com/400x300.png?text=Novedad",
+                "imagen": image_url,
                 "fecha": "Fecha no disponible" # Puedes implementar la captura de fecha si lo necesitas
             }
             data["news"].append(new_news)
-            save_data(data)
             st.success("Novedad agregada con éxito.")
+            changes.stage()
             st.rerun()
 
     st.markdown("---")
@@ -483,17 +602,14 @@ elif selection == "Novedades":
                     if news_item.get('imagen'):
                         st.image(news_item.get('imagen'), width=200)
                     else:
-                        st.image("https://via.placeholder.com/200x200.png?text=Sin+Imagen", width=200)
+                        st.image(PLACEHOLDER_IMAGE, width=200)
                 except Exception as e:
                     st.error(f"Error al cargar imagen de novedad: {e}")
-                    st.image("https://via.placeholder.com/200x200.png?text=Error+Imagen", width=200)
+                    st.image(PLACEHOLDER_IMAGE, width=200)
 
                 st.write(f"**Contenido:** {news_item.get('contenido')}")
-                if st.button("Eliminar", key=f"del_news_{i}"):
-                    data["news"].pop(i)
-                    save_data(data)
-                    st.success("Novedad eliminada.")
-                    st.rerun()
+                st.button("Eliminar", key=f"del_news_{i}", on_click=remove_item,
+                          args=("news", i, "Novedad eliminada."))
 
 # --- Gestión de Información de Contacto ---
 elif selection == "Información de Contacto":
@@ -501,17 +617,18 @@ elif selection == "Información de Contacto":
     st.markdown("Edita los datos de contacto que se muestran en tu página.")
 
     with st.form("contact_info_form"):
+        values = {}
         st.subheader("Detalles de Contacto")
-        data["contact_info"]['address'] = st.text_input("Dirección", value=data["contact_info"].get('address', ''))
-        data["contact_info"]['phone'] = st.text_input("Teléfono", value=data["contact_info"].get('phone', ''))
-        data["contact_info"]['email'] = st.text_input("Email", value=data["contact_info"].get('email', ''))
-        data["contact_info"]['hours'] = st.text_area("Horarios de Atención", value=data["contact_info"].get('hours', ''), height=100)
-        data["contact_info"]['facebook_url'] = st.text_input("URL de Facebook", value=data["contact_info"].get('facebook_url', ''))
-        data["contact_info"]['instagram_url'] = st.text_input("URL de Instagram", value=data["contact_info"].get('instagram_url', ''))
+        values['address'] = st.text_input("Dirección", value=data["contact_info"].get('address', ''))
+        values['phone'] = st.text_input("Teléfono", value=data["contact_info"].get('phone', ''))
+        values['email'] = st.text_input("Email", value=data["contact_info"].get('email', ''))
+        values['hours'] = st.text_area("Horarios de Atención", value=data["contact_info"].get('hours', ''), height=100)
+        values['facebook_url'] = st.text_input("URL de Facebook", value=data["contact_info"].get('facebook_url', ''))
+        values['instagram_url'] = st.text_input("URL de Instagram", value=data["contact_info"].get('instagram_url', ''))
 
         submit_button = st.form_submit_button("Guardar Contacto")
         if submit_button:
-            save_data(data)
+            update_texts("contact_info", values)
             st.success("Información de contacto actualizada.")
             st.rerun()
 
@@ -521,28 +638,29 @@ elif selection == "Textos de 'Sobre Nosotros'":
     st.markdown("Edita los textos de la página 'Sobre Nosotros'.")
 
     with st.form("about_us_form"):
+        values = {}
         st.subheader("Descripción General")
-        data["about_us"]['about_description'] = st.text_area("Descripción de la empresa", value=data["about_us"].get('about_description', ''), height=150)
+        values['about_description'] = st.text_area("Descripción de la empresa", value=data["about_us"].get('about_description', ''), height=150)
 
         st.subheader("Nuestra Filosofía y Misión")
-        data["about_us"]['philosophy_title'] = st.text_input("Título de 'Nuestra Filosofía'", value=data["about_us"].get('philosophy_title', ''))
-        data["about_us"]['philosophy_text'] = st.text_area("Texto de Filosofía", value=data["about_us"].get('philosophy_text', ''), height=100)
-        data["about_us"]['mission_text'] = st.text_area("Texto de Misión", value=data["about_us"].get('mission_text', ''), height=100)
+        values['philosophy_title'] = st.text_input("Título de 'Nuestra Filosofía'", value=data["about_us"].get('philosophy_title', ''))
+        values['philosophy_text'] = st.text_area("Texto de Filosofía", value=data["about_us"].get('philosophy_text', ''), height=100)
+        values['mission_text'] = st.text_area("Texto de Misión", value=data["about_us"].get('mission_text', ''), height=100)
 
         st.subheader("Nuestros Valores")
-        data["about_us"]['values_title'] = st.text_input("Título de 'Nuestros Valores'", value=data["about_us"].get('values_title', ''))
-        data["about_us"]['value1_title'] = st.text_input("Título Valor 1", value=data["about_us"].get('value1_title', ''))
-        data["about_us"]['value1_text'] = st.text_area("Texto Valor 1", value=data["about_us"].get('value1_text', ''), height=50)
-        data["about_us"]['value2_title'] = st.text_input("Título Valor 2", value=data["about_us"].get('value2_title', ''))
-        data["about_us"]['value2_text'] = st.text_area("Texto Valor 2", value=data["about_us"].get('value2_text', ''), height=50)
-        data["about_us"]['value3_title'] = st.text_input("Título Valor 3", value=data["about_us"].get('value3_title', ''))
-        data["about_us"]['value3_text'] = st.text_area("Texto Valor 3", value=data["about_us"].get('value3_text', ''), height=50)
-        data["about_us"]['value4_title'] = st.text_input("Título Valor 4", value=data["about_us"].get('value4_title', ''))
-        data["about_us"]['value4_text'] = st.text_area("Texto Valor 4", value=data["about_us"].get('value4_text', ''), height=50)
+        values['values_title'] = st.text_input("Título de 'Nuestros Valores'", value=data["about_us"].get('values_title', ''))
+        values['value1_title'] = st.text_input("Título Valor 1", value=data["about_us"].get('value1_title', ''))
+        values['value1_text'] = st.text_area("Texto Valor 1", value=data["about_us"].get('value1_text', ''), height=50)
+        values['value2_title'] = st.text_input("Título Valor 2", value=data["about_us"].get('value2_title', ''))
+        values['value2_text'] = st.text_area("Texto Valor 2", value=data["about_us"].get('value2_text', ''), height=50)
+        values['value3_title'] = st.text_input("Título Valor 3", value=data["about_us"].get('value3_title', ''))
+        values['value3_text'] = st.text_area("Texto Valor 3", value=data["about_us"].get('value3_text', ''), height=50)
+        values['value4_title'] = st.text_input("Título Valor 4", value=data["about_us"].get('value4_title', ''))
+        values['value4_text'] = st.text_area("Texto Valor 4", value=data["about_us"].get('value4_text', ''), height=50)
 
         submit_button = st.form_submit_button("Guardar Cambios")
         if submit_button:
-            save_data(data)
+            update_texts("about_us", values)
             st.success("Textos de 'Sobre Nosotros' actualizados.")
             st.rerun()
 
@@ -560,8 +678,8 @@ elif selection == "Preguntas Frecuentes (FAQs)":
         if submit_button and faq_q and faq_a:
             new_faq = {"q": faq_q, "a": faq_a}
             data["faqs"].append(new_faq)
-            save_data(data)
             st.success("FAQ agregada.")
+            changes.stage()
             st.rerun()
 
     st.markdown("---")
@@ -572,11 +690,8 @@ elif selection == "Preguntas Frecuentes (FAQs)":
         for i, faq in enumerate(data["faqs"]):
             with st.expander(f"**{faq.get('q', 'Pregunta sin título')}**"):
                 st.write(faq.get('a'))
-                if st.button("Eliminar", key=f"del_faq_{i}"):
-                    data["faqs"].pop(i)
-                    save_data(data)
-                    st.success("FAQ eliminada.")
-                    st.rerun()
+                st.button("Eliminar", key=f"del_faq_{i}", on_click=remove_item,
+                          args=("faqs", i, "FAQ eliminada."))
 
 # --- Gestión de Textos de Llamada a la Acción (CTA) ---
 elif selection == "Textos de Llamada a la Acción (CTA)":
@@ -584,16 +699,74 @@ elif selection == "Textos de Llamada a la Acción (CTA)":
     st.markdown("Edita los textos de llamadas a la acción en la página de inicio.")
 
     with st.form("cta_form"):
+        values = {}
         st.subheader("Texto del Banner Superior")
-        data["cta_texts"]['banner_text'] = st.text_area("Texto del banner (Ej: 'Envíos Gratis')", value=data["cta_texts"].get('banner_text', ''), height=50)
+        values['banner_text'] = st.text_area("Texto del banner (Ej: 'Envíos Gratis')", value=data["cta_texts"].get('banner_text', ''), height=50)
 
         st.subheader("Texto del Banner Final")
-        data["cta_texts"]['cta_title'] = st.text_input("Título del CTA", value=data["cta_texts"].get('cta_title', ''))
-        data["cta_texts"]['cta_description'] = st.text_area("Descripción del CTA", value=data["cta_texts"].get('cta_description', ''), height=100)
-        data["cta_texts"]['cta_button_text'] = st.text_input("Texto del botón del CTA", value=data["cta_texts"].get('cta_button_text', ''))
+        values['cta_title'] = st.text_input("Título del CTA", value=data["cta_texts"].get('cta_title', ''))
+        values['cta_description'] = st.text_area("Descripción del CTA", value=data["cta_texts"].get('cta_description', ''), height=100)
+        values['cta_button_text'] = st.text_input("Texto del botón del CTA", value=data["cta_texts"].get('cta_button_text', ''))
 
         submit_button = st.form_submit_button("Guardar Cambios")
         if submit_button:
-            save_data(data)
+            update_texts("cta_texts", values)
             st.success("Textos de CTA actualizados.")
-            st.rerun()
\ No newline at end of file
+            st.rerun()
+
+# --- Cambios Pendientes ---
+elif selection == "Cambios Pendientes":
+    st.header("Cambios Pendientes")
+    st.markdown("Los cambios de todas las secciones se acumulan aquí. Revísalos y publícalos juntos: la tienda se actualiza con una sola escritura.")
+
+    if st.session_state.get("publish_error"):
+        st.error(st.session_state.pop("publish_error"))
+    if not changes.pending():
+        st.info("No hay cambios sin publicar.")
+    else:
+        show_changes(changes.describe(MAX_PREVIEW_DIFFS))
+
+        col_publish, col_discard = st.columns(2)
+        with col_publish:
+            st.button("Publicar cambios", type="primary", on_click=publish_changes)
+        with col_discard:
+            st.button("Descartar cambios", on_click=changes.discard)
+
+# --- Versiones ---
+elif selection == "Versiones":
+    st.header("Historial de Versiones")
+    st.markdown("Cada publicación guarda una versión del catálogo. Compara dos versiones o vuelve a cualquiera de ellas: la restauración se publica como una versión nueva.")
+
+    if st.session_state.get("publish_error"):
+        st.error(st.session_state.pop("publish_error"))
+    versions = get_versions()
+    history = versions.history()
+    if not history:
+        st.info("Todavía no hay versiones registradas. Se crea una con cada publicación.")
+    else:
+        st.dataframe([{
+            "Versión": manifest["id"],
+            "Fecha": manifest["fecha"],
+            "Mensaje": manifest["mensaje"],
+            "Secciones modificadas": ", ".join(SECTION_LABELS.get(key, key) for key in manifest["cambios"]),
+        } for manifest in history], use_container_width=True, hide_index=True)
+
+        ids = [manifest["id"] for manifest in history]
+        st.subheader("Comparar versiones")
+        col_old, col_new = st.columns(2)
+        with col_old:
+            old_id = st.selectbox("Versión anterior", ids, index=min(1, len(ids) - 1))
+        with col_new:
+            new_id = st.selectbox("Versión nueva", ids, index=0)
+        # Solo se leen las secciones que difieren entre las dos versiones
+        rows = describe_changes(*versions.diff(old_id, new_id), diff_limit=MAX_PREVIEW_DIFFS)
+        if rows:
+            show_changes(rows)
+        else:
+            st.info("Las dos versiones tienen el mismo contenido.")
+
+        st.subheader("Restaurar una versión")
+        restore_id = st.selectbox("Versión a restaurar", ids, key="restore_id")
+        if changes.pending():
+            st.warning("Tienes cambios sin publicar: al restaurar una versión se descartan.")
+        st.button("Restaurar esta versión", on_click=restore, args=(restore_id,))
@@ -1,73 +1,38 @@
 import streamlit as st
-from streamlit_carousel import carousel
-import json
-import os
+from st_keyup import st_keyup
+import html
+import uuid
 from PIL import Image
+from minerva.cart import cart_total, get_cart_store
+from minerva.catalog import DEFAULT_NAV_MENU, get_catalog, get_category_positions, get_products_by_id
+from minerva.fragments import render_fragment, render_product_detail
+from minerva import metrics
+from minerva.assets import stylesheet
+from minerva.images import get_image_path, get_variant
+from minerva.pagination import Selection, paginate
+from minerva.pricing import (
+    SORT_OPTIONS, format_price, free_shipping_threshold, get_free_shipping_ids,
+    get_price_frame, get_price_index, price_bounds, select_positions,
+)
+from minerva.rankings import top_products
+from minerva.search import search_as_you_type
 
-# --- Funciones de Gestión de Datos ---
-def create_empty_data():
-    """Crea una estructura de datos completa y vacía para el archivo JSON."""
-    return {
-        "products": [],
-        "banners": [],
-        "news": [],
-        "testimonials": [],
-        "nav_menu": ["Inicio", "Peluquería", "Barbería", "Accesorios", "Herramientas", "Equipamientos", "Novedades", "Contacto", "Sobre Nosotros"],
-        "home_texts": {},
-        "contact_info": {},
-        "about_us": {},
-        "faqs": [],
-        "cta_texts": {}
-    }
-
-def load_data():
-    """Carga los datos desde el archivo data.json o crea una estructura por defecto."""
-    if os.path.exists("data.json"):
-        with open("data.json", "r", encoding="utf-8") as f:
-            try:
-                data = json.load(f)
-                # Asegura que todas las claves necesarias existan
-                for key, default_value in create_empty_data().items():
-                    if key not in data:
-                        data[key] = default_value
-                return data
-            except json.JSONDecodeError:
-                st.error("Error al decodificar el archivo data.json. Se utilizarán datos de ejemplo.")
-                return create_empty_data()
-    return create_empty_data()
-
-def get_image_path(image_url_or_path):
-    """
-    Verifica si la ruta de la imagen existe.
-    Si no existe, devuelve una URL de placeholder.
-    Acepta URLs directas o rutas de archivo locales.
-    """
-    if not image_url_or_path:
-        return "https://via.placeholder.com/400x400.png?text=Imagen+No+Encontrada"
-
-    if image_url_or_path.startswith("http://") or image_url_or_path.startswith("https://"):
-        return image_url_or_path
-    
-    full_path = os.path.join(os.getcwd(), image_url_or_path.replace('/', os.sep))
-
-    if not os.path.exists(full_path):
-        return "https://via.placeholder.com/400x400.png?text=Imagen+No+Encontrada"
-    
-    return image_url_or_path
-
+# --- Instrumentación opcional (MINERVA_PROFILE=1, o ?profile=1 con MINERVA_PROFILE_PARAM=1) ---
+profiling = metrics.begin_rerun(st.query_params.get("profile") == "1")
 
 # --- Cargar datos al inicio de la aplicación ---
-data = load_data()
-productos = data.get("products", [])
-banner_principal_items_raw = data.get("banners", [])
+# El snapshot es compartido entre sesiones y solo se recarga si data.json cambia
+with metrics.section("catalogo"):
+    catalog = get_catalog()
+if catalog.error:
+    st.error(catalog.error)
+data = catalog.data
+# Productos validados y normalizados (schema.Product), una vez por versión del catálogo
+productos = catalog.products
 novedades = data.get("news", [])
 testimonials = data.get("testimonials", [])
-nav_menu = data.get("nav_menu", ["Inicio", "Peluquería", "Barbería", "Accesorios", "Herramientas", "Equipamientos", "Novedades", "Contacto", "Sobre Nosotros"])
+nav_menu = data.get("nav_menu", DEFAULT_NAV_MENU)
 home_texts = data.get("home_texts", {})
-contact_info = data.get("contact_info", {})
-about_us_texts = data.get("about_us", {})
-faqs = data.get("faqs", [])
-cta_texts = data.get("cta_texts", {})
 
 # --- Configuración de la página ---
 st.set_page_config(
@@ -77,68 +42,87 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
-# --- Importar la fuente de Google Fonts y CSS personalizado ---
-st.markdown("""
-    <link href="https://fonts.googleapis.com/css2?family=Montserrat:wght@400;700&family=Roboto:wght@300;400;700&display=swap" rel="stylesheet">
-""", unsafe_allow_html=True)
-
-def local_css(file_name):
-    """Importa un archivo CSS local."""
-    try:
-        if os.path.exists(file_name):
-            with open(file_name, encoding="utf-8") as f:
-                st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
-        else:
-            st.warning(f"Advertencia: El archivo CSS '{file_name}' no se encontró. Utilizando estilos por defecto.")
-    except Exception as e:
-        st.error(f"Error al cargar el archivo CSS: {e}")
-
-local_css("style.css")
-
-# --- Carrusel de imágenes (banners) para el Home principal ---
-if banner_principal_items_raw:
-    banner_principal_items = [
-        dict(
-            title="",
-            text=" ",
-            img=get_image_path(item.get("img", "https://via.placeholder.com/1920x600.png?text=Minerva+Banner")),
-            link=""
-        ) for item in banner_principal_items_raw
-    ]
+# --- CSS personalizado y fuentes locales (se leen una vez por proceso) ---
+styles = stylesheet()
+if styles:
+    st.markdown(styles, unsafe_allow_html=True)
 else:
-    banner_principal_items = [
-        dict(
-            title="",
-            text=" ",
-            img="https://via.placeholder.com/1920x600.png?text=Minerva+Banner"),
-    ]
+    st.warning("Advertencia: El archivo CSS 'style.css' no se encontró. Utilizando estilos por defecto.")
+
+# --- Páginas de categoría: título y descripción ---
+CATEGORY_PAGES = {
+    "Peluquería": ("Peluquería Profesional", "Una línea completa de productos diseñados para los profesionales más exigentes."),
+    "Barbería": ("Barbería Profesional", "Productos esenciales para el cuidado de la barba y el afeitado perfecto."),
+    "Accesorios": ("Accesorios Esenciales", "Encuentra las herramientas perfectas para complementar tu rutina de belleza."),
+    "Herramientas": ("Herramientas Profesionales", "Cepillos, secadores, planchas y todo lo que necesitas para un acabado de salón."),
+    "Equipamientos": ("Equipamientos para Salones", "Sillas, lava-cabezas y todo el mobiliario necesario para tu negocio."),
+}
 
 # --- Inicialización del estado de la página ---
 if 'page' not in st.session_state:
     st.session_state.page = "Inicio"
-if 'selected_product_id' not in st.session_state:
-    st.session_state.selected_product_id = None
 if 'search_term' not in st.session_state:
     st.session_state.search_term = ""
+if 'search_box' not in st.session_state:
+    # Cambiar este número crea una caja de búsqueda nueva (vacía)
+    st.session_state.search_box = 0
+if 'cart_id' not in st.session_state:
+    # En la sesión solo se guarda el id; el contenido vive en el CartStore del servidor
+    st.session_state.cart_id = uuid.uuid4().hex
+cart_store = get_cart_store()
+
+# Búsqueda mientras se escribe: espera entre teclas y letras mínimas para buscar
+SEARCH_DEBOUNCE_MS = 300
+SEARCH_MIN_CHARS = 2
+
+def clear_search():
+    """Vacía la búsqueda y la caja de texto."""
+    st.session_state.search_term = ""
+    st.session_state.search_box += 1
+
+def navigate(page):
+    """Cambia de página: vacía la búsqueda y cierra el detalle de producto."""
+    st.session_state.page = page
+    clear_search()
+    st.query_params.pop("producto", None)
+
+def open_product(product_id):
+    """Abre el detalle del producto; la URL (?producto=<id>) se puede compartir."""
+    st.query_params["producto"] = product_id
+
+def add_to_cart(product_id, product_name):
+    """Agrega al carrito antes de que se dibuje el encabezado, así el contador queda al día."""
+    cart_store.add(st.session_state.cart_id, product_id, st.session_state[f"detail_qty_{product_id}"])
+    st.toast(f"'{product_name}' añadido al carrito.")
 
 # --- Header Completo (Banner, Logo, Búsqueda, Menú de Usuario) ---
-st.markdown(f"""
-    <div class="main-banner">
-        {cta_texts.get('banner_text', 'Envíos Gratis en compras mayores a $100.000 - Entregas en el día en Gran San Miguel de Tucumán')}
-    </div>
-""", unsafe_allow_html=True)
+st.markdown(render_fragment(catalog, "top_banner"), unsafe_allow_html=True)
 
 st.markdown("<div class='header-container'>", unsafe_allow_html=True)
 col_logo, col_search, col_user_menu = st.columns([1, 2, 1])
 with col_logo:
-    st.image(get_image_path("images/logo.png"), width=150)
+    st.image(get_variant(get_image_path("images/logo.png"), "logo"), width=150)
 
 with col_search:
-    st.session_state.search_term = st.text_input("¿Qué estás buscando?", value=st.session_state.search_term, placeholder="Buscar productos...", label_visibility="collapsed")
+    search_term = st_keyup("¿Qué estás buscando?", value=st.session_state.search_term, placeholder="Buscar productos...",
+                           label_visibility="collapsed", debounce=SEARCH_DEBOUNCE_MS,
+                           key=f"search_{st.session_state.search_box}") or ""
+    if search_term != st.session_state.search_term:
+        # Una búsqueda nueva vuelve a la primera página de resultados; la
+        # anterior se recuerda para filtrar sus resultados si solo se agregaron letras
+        st.session_state.grid_page_search = 1
+        st.session_state.previous_search = st.session_state.search_term
+        st.query_params.pop("producto", None)
+    st.session_state.search_term = search_term
 
 with col_user_menu:
     st.markdown("<div class='user-menu-container'>", unsafe_allow_html=True)
-    st.markdown("<span><a href='#'>Mi carrito</a></span>", unsafe_allow_html=True)
+    # Etiqueta fija: Streamlit arma el id del botón con la etiqueta, y un
+    # contador dentro de ella haría que el botón cambie de id tras cada compra
+    if st.button("🛒 Mi carrito", key="open_cart"):
+        navigate("Carrito")
+        st.rerun()
+    st.caption(f"{cart_store.count(st.session_state.cart_id)} productos en el carrito")
     st.markdown("</div>", unsafe_allow_html=True)
 st.markdown("</div>", unsafe_allow_html=True)
 
@@ -152,8 +136,7 @@ with cols_nav:
     for i, item in enumerate(nav_menu):
         with cols_items[i]:
             if st.button(item, key=f"nav_{item}"):
-                st.session_state.page = item
-                st.session_state.search_term = ""
+                navigate(item)
                 st.rerun()
 st.markdown("</div>", unsafe_allow_html=True)
 
@@ -162,44 +145,103 @@ with st.sidebar:
     st.markdown("<h3 style='text-align:center;'>Menú</h3>", unsafe_allow_html=True)
     for item in nav_menu:
         if st.button(item, key=f"nav_sidebar_{item}"):
-            st.session_state.page = item
-            st.session_state.search_term = ""
+            navigate(item)
             st.rerun()
 
+# --- Grilla de productos paginada ---
+@metrics.timed("grilla")
+def render_product_grid(products, grid_key, cols_per_row=3):
+    """Muestra solo la página actual de `products` (imágenes incluidas) y los controles de paginación."""
+    state_key = f"grid_page_{grid_key}"
+    free_shipping_ids = get_free_shipping_ids(catalog)
+    visible, page, pages = paginate(products, st.session_state.get(state_key, 1))
+    for i in range(0, len(visible), cols_per_row):
+        cols = st.columns(cols_per_row)
+        for j in range(cols_per_row):
+            if i + j < len(visible):
+                product = visible[i + j]
+                with cols[j]:
+                    # Solo el resumen: los detalles y el carrito están en la página del producto
+                    st.markdown(f"<div class='product-card'>", unsafe_allow_html=True)
+                    st.image(get_variant(get_image_path(product.imagen), "card"), use_container_width=True)
+                    badge = "<span class='free-shipping-badge'>Envío gratis</span>" if product.id in free_shipping_ids else ""
+                    st.markdown(f"<h4>{html.escape(product.nombre, quote=False)}</h4>"
+                                f"<p class='product-price'>{html.escape(product.precio, quote=False)}</p>{badge}", unsafe_allow_html=True)
+                    st.button("Ver detalles", key=f"detail_{grid_key}_{product.id}", on_click=open_product, args=(product.id,))
+                    st.markdown("</div>", unsafe_allow_html=True)
+
+    if pages > 1:
+        col_prev, col_info, col_next = st.columns([1, 2, 1])
+        with col_prev:
+            if st.button("← Anterior", key=f"{state_key}_prev", disabled=page <= 1):
+                st.session_state[state_key] = page - 1
+                st.rerun()
+        with col_info:
+            st.markdown(f"<p style='text-align:center;'>Página {page} de {pages} · {len(products)} productos</p>", unsafe_allow_html=True)
+        with col_next:
+            if st.button("Siguiente →", key=f"{state_key}_next", disabled=page >= pages):
+                st.session_state[state_key] = page + 1
+                st.rerun()
+
+def render_product_listing(grid_key, positions=None):
+    """Orden y filtro por precio (vectorizados sobre el DataFrame del catálogo) seguidos de la grilla paginada."""
+    frame = get_price_frame(catalog)
+    bounds = price_bounds(frame)
+    col_sort, col_price = st.columns([1, 2])
+    with col_sort:
+        sort = st.selectbox("Ordenar por", list(SORT_OPTIONS), key=f"sort_{grid_key}")
+    min_price = max_price = None
+    if bounds and bounds[0] < bounds[1]:
+        lowest, highest = bounds[0] // 100, -(-bounds[1] // 100)
+        with col_price:
+            low, high = st.slider("Rango de precio", min_value=lowest, max_value=highest, value=(lowest, highest), format="$%d", key=f"price_{grid_key}")
+        # Sin restringir el rango se muestran también los productos sin precio numérico
+        if (low, high) != (lowest, highest):
+            min_price, max_price = low * 100, high * 100
+    with metrics.section("filtro_precio"):
+        selected = select_positions(frame, positions, min_price, max_price, sort)
+    if len(selected) == 0:
+        st.info("No hay productos en ese rango de precio.")
+    else:
+        render_product_grid(Selection(productos, selected), grid_key)
+
+# --- Página de detalle de producto (?producto=<id>) ---
+def render_product_page(product):
+    """Detalle cacheado por versión del producto más los controles del carrito."""
+    if st.button("← Volver", key="close_product"):
+        st.query_params.pop("producto", None)
+        st.rerun()
+    st.markdown(render_product_detail(product, product.id in get_free_shipping_ids(catalog)), unsafe_allow_html=True)
+    col_qty, col_add = st.columns([1, 3])
+    with col_qty:
+        st.number_input("Cantidad", min_value=1, value=1, step=1, key=f"detail_qty_{product.id}")
+    with col_add:
+        st.button("Añadir al Carrito", key=f"add_{product.id}", on_click=add_to_cart, args=(product.id, product.nombre))
+
 # --- Contenido de las páginas ---
-if st.session_state.search_term:
+selected_product_id = st.query_params.get("producto")
+selected_product = get_products_by_id(catalog).get(selected_product_id) if selected_product_id else None
+if selected_product_id and selected_product is None:
+    st.warning("El producto que buscas ya no está disponible.")
+
+if selected_product is not None:
+    render_product_page(selected_product)
+
+elif len(st.session_state.search_term.strip()) >= SEARCH_MIN_CHARS:
     st.markdown(f"<h1 class='page-title'>Resultados de búsqueda para: '{st.session_state.search_term}'</h1>", unsafe_allow_html=True)
 
-    filtered_products = [
-        product for product in productos
-        if (st.session_state.search_term.lower() in product.get("nombre", "").lower() or
-            st.session_state.search_term.lower() in product.get("descripcion", "").lower())
-    ]
+    # Índice invertido por versión del catálogo + caché de consultas recientes compartida entre sesiones
+    with metrics.section("busqueda"):
+        filtered_positions = search_as_you_type(catalog, st.session_state.search_term, st.session_state.get("previous_search"))
 
-    if not filtered_products:
+    if not filtered_positions:
         st.info(f"No se encontraron productos que coincidan con '{st.session_state.search_term}'.")
     else:
-        cols_per_row = 3
-        for i in range(0, len(filtered_products), cols_per_row):
-            cols = st.columns(cols_per_row)
-            for j in range(cols_per_row):
-                if i + j < len(filtered_products):
-                    product = filtered_products[i + j]
-                    with cols[j]:
-                        st.markdown(f"<div class='product-card'>", unsafe_allow_html=True)
-                        st.image(get_image_path(product.get("imagen")), use_container_width=True)
-                        st.markdown(f"<h4>{product['nombre']}</h4>", unsafe_allow_html=True)
-                        st.markdown(f"<p class='product-price'>{product.get('precio', 'Precio no disponible')}</p>", unsafe_allow_html=True)
-                        with st.expander("Ver Detalles"):
-                            st.write(product.get("detalles", "Detalles no disponibles."))
-                            if st.button(f"Añadir al Carrito", key=f"add_{product['id']}"):
-                                st.success(f"'{product['nombre']}' añadido al carrito (simulado).")
-                        st.markdown("</div>", unsafe_allow_html=True)
+        render_product_listing("search", filtered_positions)
 
     st.markdown("<div class='section-spacer-small'></div>", unsafe_allow_html=True)
     if st.button("Limpiar Búsqueda y Volver al Inicio"):
-        st.session_state.page = "Inicio"
-        st.session_state.search_term = ""
+        navigate("Inicio")
         st.rerun()
 
 else:
@@ -212,12 +254,13 @@ else:
             st.markdown(f"<p class='hero-subtitle'>{home_texts.get('hero_subtitle', '**Formulaciones exclusivas** con botánicos premium y tecnología avanzada para **resultados de salón en casa**.')}</p>", unsafe_allow_html=True)
             st.markdown(f"<p class='hero-description'>{home_texts.get('hero_description', 'Restauramos el brillo, la fuerza y la salud de tu cabello de manera sostenible, con un compromiso ético y productos Cruelty-Free.')}</p>", unsafe_allow_html=True)
             if st.button("Descubre Tu Transformación Capilar", key="explore_products_hero"):
-                st.session_state.page = "Peluquería"
-                st.session_state.search_term = ""
+                navigate("Peluquería")
                 st.rerun()
             st.markdown("</div>", unsafe_allow_html=True)
         with col_hero_carousel:
-            carousel(items=banner_principal_items, width=1.0)
+            # Carrusel armado una vez por versión del catálogo: derivados del
+            # tamaño justo y carga diferida de las diapositivas siguientes
+            st.markdown(render_fragment(catalog, "banner_carousel"), unsafe_allow_html=True)
         st.markdown("</div>", unsafe_allow_html=True)
         st.markdown("<div class='section-spacer'></div>", unsafe_allow_html=True)
 
@@ -228,46 +271,11 @@ else:
         if not productos:
             st.info("Actualmente no hay productos disponibles.")
         else:
-            cols_per_row = 3
-            for i in range(0, len(productos), cols_per_row):
-                cols = st.columns(cols_per_row)
-                for j in range(cols_per_row):
-                    if i + j < len(productos):
-                        product = productos[i + j]
-                        with cols[j]:
-                            st.markdown(f"<div class='product-card'>", unsafe_allow_html=True)
-                            st.image(get_image_path(product.get('imagen')), use_container_width=True)
-                            st.markdown(f"<h4>{product['nombre']}</h4>", unsafe_allow_html=True)
-                            st.markdown(f"<p class='product-price'>{product.get('precio', 'Precio no disponible')}</p>", unsafe_allow_html=True)
-
-                            with st.expander("Ver Detalles"):
-                                st.write(product.get("detalles", "Detalles no disponibles."))
-                                if st.button(f"Añadir al Carrito", key=f"add_{product['id']}"):
-                                    st.success(f"'{product['nombre']}' añadido al carrito (simulado).")
-                            st.markdown("</div>", unsafe_allow_html=True)
+            render_product_listing("home")
         st.markdown("<div class='section-spacer'></div>", unsafe_allow_html=True)
 
-        st.markdown(f"<h2 class='section-title'>{home_texts.get('section1_title', '¿Por Qué Elegir Finisima? Tu Cabello Lo Merece.')}</h2>", unsafe_allow_html=True)
-        st.markdown(f"<p class='section-description'>{home_texts.get('section1_description', 'Descubre los pilares que hacen de Finisima la elección perfecta para un cuidado capilar excepcional.')}</p>", unsafe_allow_html=True)
-        benefits_col1, benefits_col2, benefits_col3 = st.columns(3)
-        with benefits_col1:
-            st.markdown("<div class='benefit-card'>", unsafe_allow_html=True)
-            st.markdown('<img src="https://via.placeholder.com/50x50.png?text=Botánico" class="benefit-icon">', unsafe_allow_html=True)
-            st.markdown("<h4>Fórmulas Botánicas Premium</h4>", unsafe_allow_html=True)
-            st.markdown("<p>Ingredientes naturales seleccionados que nutren y revitalizan tu cabello desde la raíz.</p>", unsafe_allow_html=True)
-            st.markdown("</div>", unsafe_allow_html=True)
-        with benefits_col2:
-            st.markdown("<div class='benefit-card'>", unsafe_allow_html=True)
-            st.markdown('<img src="https://via.placeholder.com/50x50.png?text=Tecnología" class="benefit-icon">', unsafe_allow_html=True)
-            st.markdown("<h4>Tecnología Capilar Avanzada</h4>", unsafe_allow_html=True)
-            st.markdown("<p>Innovación y ciencia al servicio de la belleza. Nuestras fórmulas combinan lo mejor de la naturaleza con tecnologías de vanguardia.</p>", unsafe_allow_html=True)
-            st.markdown("</div>", unsafe_allow_html=True)
-        with benefits_col3:
-            st.markdown("<div class='benefit-card'>", unsafe_allow_html=True)
-            st.markdown('<img src="https://via.placeholder.com/50x50.png?text=CrueltyFree" class="benefit-icon">', unsafe_allow_html=True)
-            st.markdown("<h4>Ética y Sostenibilidad</h4>", unsafe_allow_html=True)
-            st.markdown("<p>Somos una marca Cruelty-Free, comprometida con el respeto animal y el cuidado del planeta.</p>", unsafe_allow_html=True)
-            st.markdown("</div>", unsafe_allow_html=True)
+        # Bloque estático: un solo elemento cacheado por versión del catálogo
+        st.markdown(render_fragment(catalog, "benefits"), unsafe_allow_html=True)
 
         st.markdown("<div class='section-spacer'></div>", unsafe_allow_html=True)
 
@@ -290,36 +298,29 @@ else:
         st.markdown(f"<p class='section-description'>{home_texts.get('best_sellers_description', 'Descubre los favoritos de nuestros clientes, productos que garantizan resultados increíbles y han conquistado a miles de personas.')}</p>", unsafe_allow_html=True)
 
         if productos:
-            best_sellers = sorted(productos, key=lambda x: x.get('ventas', 0), reverse=True)[:3]
+            # Ranking precalculado por versión del catálogo (no se ordena el catálogo en cada visita)
+            with metrics.section("mas_vendidos"):
+                best_sellers = top_products(catalog)
             cols = st.columns(3)
             for i, product in enumerate(best_sellers):
-                with cols[i]:
+                with cols[i % 3]:
                     st.markdown("<div class='product-card'>", unsafe_allow_html=True)
-                    st.image(get_image_path(product.get('imagen')), use_container_width=True)
-                    st.markdown(f"<h4>{product.get('nombre')}</h4>", unsafe_allow_html=True)
-                    st.markdown(f"<p class='product-price'>{product.get('precio', 'Precio no disponible')}</p>", unsafe_allow_html=True)
+                    st.image(get_variant(get_image_path(product.imagen), "card"), use_container_width=True)
+                    st.markdown(f"<h4>{html.escape(product.nombre, quote=False)}</h4>", unsafe_allow_html=True)
+                    st.markdown(f"<p class='product-price'>{html.escape(product.precio, quote=False)}</p>", unsafe_allow_html=True)
+                    st.button("Ver detalles", key=f"detail_top_{product.id}", on_click=open_product, args=(product.id,))
                     st.markdown("</div>", unsafe_allow_html=True)
 
-    elif st.session_state.page == "Peluquería":
-        st.markdown("<h1 class='page-title'>Peluquería Profesional</h1>", unsafe_allow_html=True)
-        st.markdown("<p class='section-description'>Una línea completa de productos diseñados para los profesionales más exigentes.</p>", unsafe_allow_html=True)
-        
-    elif st.session_state.page == "Barbería":
-        st.markdown("<h1 class='page-title'>Barbería Profesional</h1>", unsafe_allow_html=True)
-        st.markdown("<p class='section-description'>Productos esenciales para el cuidado de la barba y el afeitado perfecto.</p>", unsafe_allow_html=True)
-    
-    elif st.session_state.page == "Accesorios":
-        st.markdown("<h1 class='page-title'>Accesorios Esenciales</h1>", unsafe_allow_html=True)
-        st.markdown("<p class='section-description'>Encuentra las herramientas perfectas para complementar tu rutina de belleza.</p>", unsafe_allow_html=True)
-    
-    elif st.session_state.page == "Herramientas":
-        st.markdown("<h1 class='page-title'>Herramientas Profesionales</h1>", unsafe_allow_html=True)
-        st.markdown("<p class='section-description'>Cepillos, secadores, planchas y todo lo que necesitas para un acabado de salón.</p>", unsafe_allow_html=True)
-    
-    elif st.session_state.page == "Equipamientos":
-        st.markdown("<h1 class='page-title'>Equipamientos para Salones</h1>", unsafe_allow_html=True)
-        st.markdown("<p class='section-description'>Sillas, lava-cabezas y todo el mobiliario necesario para tu negocio.</p>", unsafe_allow_html=True)
-    
+    elif st.session_state.page in CATEGORY_PAGES:
+        category_title, category_description = CATEGORY_PAGES[st.session_state.page]
+        st.markdown(f"<h1 class='page-title'>{category_title}</h1>", unsafe_allow_html=True)
+        st.markdown(f"<p class='section-description'>{category_description}</p>", unsafe_allow_html=True)
+        category_positions = get_category_positions(catalog, st.session_state.page)
+        if not category_positions:
+            st.info("Todavía no hay productos en esta categoría.")
+        else:
+            render_product_listing(f"category_{st.session_state.page}", category_positions)
+
     elif st.session_state.page == "Novedades":
         st.markdown("<h1 class='page-title'>Novedades y Blog</h1>", unsafe_allow_html=True)
         st.markdown("<p class='section-description'>Mantente al tanto de los últimos lanzamientos y tendencias en cuidado capilar. ¡Inspírate y cuida tu cabello como se merece!</p>", unsafe_allow_html=True)
@@ -330,7 +331,7 @@ else:
                 st.markdown(f"<div class='news-card'>", unsafe_allow_html=True)
                 col_news_img, col_news_content = st.columns([1, 2])
                 with col_news_img:
-                    image_to_display = get_image_path(novedad.get("imagen"))
+                    image_to_display = get_variant(get_image_path(novedad.get("imagen")), "news")
                     st.image(image_to_display, use_container_width=True)
                 with col_news_content:
                     st.markdown(f"<h3>{novedad.get('titulo')}</h3>", unsafe_allow_html=True)
@@ -356,61 +357,55 @@ else:
             st.markdown("</div>", unsafe_allow_html=True)
 
         with contact_col2:
-            st.markdown("<div class='contact-info-card'>", unsafe_allow_html=True)
-            st.markdown("<h3>Nuestros Datos de Contacto</h3>", unsafe_allow_html=True)
-            st.markdown(f"<p><strong>Dirección:</strong> {contact_info.get('address', 'Dirección no disponible.')}</p>", unsafe_allow_html=True)
-            st.markdown(f"<p><strong>Teléfono:</strong> {contact_info.get('phone', 'Teléfono no disponible.')}</p>", unsafe_allow_html=True)
-            st.markdown(f"<p><strong>Email:</strong> {contact_info.get('email', 'Email no disponible.')}</p>", unsafe_allow_html=True)
-            st.markdown(f"<p><strong>Horario:</strong> {contact_info.get('hours', 'Horario no disponible.')}</p>", unsafe_allow_html=True)
-            st.markdown("</div>", unsafe_allow_html=True)
+            st.markdown(render_fragment(catalog, "contact_info"), unsafe_allow_html=True)
         
     elif st.session_state.page == "Sobre Nosotros":
-        st.markdown("<h1 class='page-title'>Sobre Nosotros</h1>", unsafe_allow_html=True)
-        st.markdown("<p class='section-description'>Conoce la historia detrás de Finisima y nuestros valores.</p>", unsafe_allow_html=True)
-        st.markdown("<div class='about-section-card'>", unsafe_allow_html=True)
-        st.markdown(f"<h3>{about_us_texts.get('about_title', 'Nuestra Historia')}</h3>", unsafe_allow_html=True)
-        st.write(about_us_texts.get("about_story", "Historia no disponible."))
-        st.markdown("<div class='section-spacer-small'></div>", unsafe_allow_html=True)
-        st.markdown(f"<h3>{about_us_texts.get('values_title', 'Nuestros Valores')}</h3>", unsafe_allow_html=True)
-        st.markdown(f"""
-            <ul>
-                <li style="margin-bottom: 10px;"><strong style="color: #008C82;">✨ {about_us_texts.get('value1_title', 'Calidad Superior:')}</strong> {about_us_texts.get('value1_text', 'Comprometidos con la excelencia en cada producto que creamos.')}</li>
-                <li style="margin-bottom: 10px;"><strong style="color: #008C82;">🌱 {about_us_texts.get('value2_title', 'Innovación Constante:')}</strong> {about_us_texts.get('value2_text', 'Siempre a la vanguardia, explorando nuevos ingredientes y tecnologías de vanguardia.')}</li>
-                <li style="margin-bottom: 10px;"><strong style="color: #008C82;">🌿 {about_us_texts.get('value3_title', 'Sostenibilidad y Ética:')}</strong> {about_us_texts.get('value3_text', 'Respeto por el medio ambiente y prácticas responsables en toda nuestra cadena de valor.')}</li>
-                <li style="margin-bottom: 10px;"><strong style="color: #008C82;">💖 {about_us_texts.get('value4_title', 'Pasión por la Belleza:')}</strong> {about_us_texts.get('value4_text', 'Amor por lo que hacemos y dedicación por tu bienestar.')}</li>
-            </ul>
-        """, unsafe_allow_html=True)
-        st.markdown("</div>", unsafe_allow_html=True)
-        st.markdown("<div class='section-spacer-small'></div>", unsafe_allow_html=True)
-        st.markdown("<div class='about-section-card'>", unsafe_allow_html=True)
-        st.markdown(f"<h3>{about_us_texts.get('faqs_title', 'Preguntas Frecuentes')}</h3>", unsafe_allow_html=True)
-        for faq in faqs:
-            with st.expander(faq.get("question", "Pregunta frecuente...")):
-                st.write(faq.get("answer", "Respuesta no disponible."))
-        st.markdown("</div>", unsafe_allow_html=True)
-        st.markdown("<div class='section-spacer-small'></div>", unsafe_allow_html=True)
-        st.markdown("<div class='about-section-card'>", unsafe_allow_html=True)
-        st.markdown(f"<h3>{about_us_texts.get('team_title', 'Conoce a Nuestro Equipo')}</h3>", unsafe_allow_html=True)
-        st.write(about_us_texts.get("team_text", "Información del equipo no disponible."))
-        st.markdown("</div>", unsafe_allow_html=True)
+        st.markdown(render_fragment(catalog, "about_us"), unsafe_allow_html=True)
+
+    elif st.session_state.page == "Carrito":
+        st.markdown("<h1 class='page-title'>Mi Carrito</h1>", unsafe_allow_html=True)
+        cart_items = cart_store.items(st.session_state.cart_id)
+        products_by_id = get_products_by_id(catalog)
+        price_index = get_price_index(catalog)
+        # Se descartan productos que ya no existen en el catálogo
+        cart_items = {product_id: quantity for product_id, quantity in cart_items.items() if product_id in products_by_id}
+        if not cart_items:
+            st.info("Tu carrito está vacío.")
+        else:
+            for product_id, quantity in cart_items.items():
+                product = products_by_id[product_id]
+                unit_price = price_index.get(product_id)
+                col_name, col_qty, col_subtotal, col_remove = st.columns([3, 1, 1, 1])
+                with col_name:
+                    st.markdown(f"**{product.nombre}**")
+                    st.caption(product.precio)
+                with col_qty:
+                    new_quantity = st.number_input("Cantidad", min_value=0, value=quantity, step=1, key=f"qty_{product_id}", label_visibility="collapsed")
+                    if new_quantity != quantity:
+                        cart_store.set_quantity(st.session_state.cart_id, product_id, new_quantity)
+                        st.rerun()
+                with col_subtotal:
+                    st.markdown(format_price(unit_price * quantity) if unit_price is not None else "Consultar")
+                with col_remove:
+                    if st.button("Quitar", key=f"remove_{product_id}"):
+                        cart_store.set_quantity(st.session_state.cart_id, product_id, 0)
+                        st.rerun()
+            st.markdown("---")
+            total = cart_total(cart_items, price_index)
+            st.markdown(f"<h3>Total: {format_price(total)}</h3>", unsafe_allow_html=True)
+            threshold = free_shipping_threshold(data)
+            if total >= threshold:
+                st.success("¡Tu compra tiene envío gratis!")
+            else:
+                st.info(f"Te faltan {format_price(threshold - total)} para el envío gratis.")
+            if st.button("Vaciar carrito", key="clear_cart"):
+                cart_store.clear(st.session_state.cart_id)
+                st.rerun()
 
 
 # --- Pie de página ---
-st.markdown("<div class='footer'>", unsafe_allow_html=True)
-col_social, col_contact, col_legal = st.columns(3)
-with col_social:
-    st.markdown("<h4>Síguenos</h4>", unsafe_allow_html=True)
-    st.markdown("""
-        <a href='#' class='social-icon'><img src='https://via.placeholder.com/30x30.png?text=F' alt='Facebook'></a>
-        <a href='#' class='social-icon'><img src='https://via.placeholder.com/30x30.png?text=I' alt='Instagram'></a>
-        <a href='#' class='social-icon'><img src='https://via.placeholder.com/30x30.png?text=T' alt='Twitter'></a>
-    """, unsafe_allow_html=True)
-with col_contact:
-    st.markdown("<h4>Contacto</h4>", unsafe_allow_html=True)
-    st.markdown(f"<p>Email: {contact_info.get('email', 'N/A')}</p>", unsafe_allow_html=True)
-    st.markdown(f"<p>Tel: {contact_info.get('phone', 'N/A')}</p>", unsafe_allow_html=True)
-with col_legal:
-    st.markdown("<h4>Legal</h4>", unsafe_allow_html=True)
-    st.markdown("<p>Términos y Condiciones</p>", unsafe_allow_html=True)
-    st.markdown("<p>Política de Privacidad</p>", unsafe_allow_html=True)
-st.markdown("</div>", unsafe_allow_html=True)
\ No newline at end of file
+st.markdown(render_fragment(catalog, "footer"), unsafe_allow_html=True)
+
+profile_summary = metrics.end_rerun()
+if profiling and profile_summary:
+    st.caption(profile_summary)
@@ -0,0 +1,83 @@
+"""
+Compara la búsqueda con índice invertido contra el filtrado lineal original de app.py.
+
+Uso:
+    python benchmarks/bench_search.py --sizes 1000 10000 50000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from minerva.search import SearchIndex  # noqa: E402
+
+WORDS = [
+    "shampoo", "acondicionador", "máscara", "sérum", "argán", "keratina", "peluquería", "barbería",
+    "hidratante", "reparador", "nutritivo", "cabello", "seco", "dañado", "graso", "color", "brillo",
+    "aceite", "coco", "óleo", "tintura", "plancha", "secador", "cepillo", "tijera", "navaja", "barba",
+    "profesional", "vitaminas", "botánico", "sin", "sulfatos", "parabenos", "rizos", "alisado", "matizador",
+]
+
+SYLLABLES = ["ka", "ri", "mo", "te", "lu", "na", "so", "vi", "pe", "dra", "lis", "qua", "zen", "tro", "bel", "fi"]
+
+QUERIES = ["argan", "shampoo hidratante", "peluqueria", "ker", "barba profesional", "karimo", "inexistente"]
+
+
+def make_catalog(size, seed=42):
+    """Catálogo sintético: palabras del rubro más marcas/líneas inventadas, como en un listado de proveedor."""
+    rng = random.Random(seed)
+    brands = ["".join(rng.sample(SYLLABLES, 3)) for _ in range(max(50, size // 20))]
+    return [
+        {
+            "id": str(i),
+            "nombre": f"{rng.choice(brands).capitalize()} " + " ".join(rng.sample(WORDS, 2)) + f" {i}",
+            "descripcion": " ".join(rng.choices(WORDS, k=6) + rng.sample(brands, 2)),
+        }
+        for i in range(size)
+    ]
+
+
+def linear_search(productos, search_term):
+    """Réplica del filtrado que hacía app.py en cada rerun."""
+    return [
+        product for product in productos
+        if (search_term.lower() in product.get("nombre", "").lower() or
+            search_term.lower() in product.get("descripcion", "").lower())
+    ]
+
+
+def timeit(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=None, help="Cantidad de resultados a ordenar (ej. una página)")
+    args = parser.parse_args()
+
+    print(f"{'productos':>10} {'consulta':>20} {'lineal (ms)':>12} {'índice (ms)':>12} {'resultados':>10}")
+    for size in args.sizes:
+        productos = make_catalog(size)
+        start = time.perf_counter()
+        # El índice trabaja sobre productos normalizados (atributos, como schema.Product)
+        index = SearchIndex([SimpleNamespace(**product) for product in productos])
+        build_ms = (time.perf_counter() - start) * 1000
+        print(f"{size:>10} {'(construcción)':>20} {'':>12} {build_ms:>12.1f}")
+        for query in QUERIES:
+            linear_ms = timeit(lambda: linear_search(productos, query), max(1, args.repeat // 4)) * 1000
+            index_ms = timeit(lambda: index.search_positions(query, args.limit), args.repeat) * 1000
+            hits = len(index.search_positions(query))
+            print(f"{size:>10} {query:>20} {linear_ms:>12.2f} {index_ms:>12.3f} {hits:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+Mide cómo se comporta app.py a medida que crece el catálogo.
+
+Para cada tamaño genera un catálogo sintético con Faker, lo sirve con
+MINERVA_DATA_FILE y ejecuta la tienda con streamlit.testing.v1.AppTest (sin
+navegador). Por página (inicio, búsqueda, cada entrada de nav_menu y el
+carrito) registra el tiempo de la primera ejecución de una sesión nueva, la
+latencia de los reruns, la cantidad de elementos enviados y el pico de
+memoria. Los resultados se guardan en JSON para comparar entre versiones.
+
+Uso:
+    python benchmarks/bench_storefront.py --sizes 100 1000 10000 50000 --output resultados.json
+    python benchmarks/bench_storefront.py --sizes 1000 --compare resultados.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import streamlit  # noqa: E402
+from faker import Faker  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from bench_search import WORDS  # noqa: E402
+from minerva.catalog import CATEGORIES, DEFAULT_NAV_MENU, create_empty_data  # noqa: E402
+
+APP_FILE = os.path.join(ROOT, "app.py")
+# Imágenes del repositorio que se asignan a los productos sintéticos
+SAMPLE_IMAGES = ["images/shampoo.jpg", "images/acondicionador.jpg", "images/mascara.jpg", "serumargan.jpeg", "imagen_inexistente.jpg"]
+SEARCH_QUERIES = ["shampoo", "argan hidratante", "ker"]
+TIMEOUT = 600
+
+
+# --- Catálogo sintético ---
+def make_catalog(size, seed=42):
+    """Documento completo de data.json con `size` productos."""
+    fake = Faker("es_AR")
+    fake.seed_instance(seed)
+    rng = random.Random(seed)
+    brands = [fake.last_name() for _ in range(max(20, size // 50))]
+    data = create_empty_data()
+    data["products"] = [
+        {
+            "id": f"p{i}",
+            "nombre": f"{rng.choice(brands)} " + " ".join(rng.sample(WORDS, 2)).capitalize() + f" {i}",
+            "descripcion": fake.sentence(nb_words=10, ext_word_list=WORDS),
+            "detalles": fake.paragraph(nb_sentences=3, ext_word_list=WORDS),
+            "precio": f"${rng.randint(1500, 250000):,}".replace(",", "."),
+            "imagen": rng.choice(SAMPLE_IMAGES),
+            "categoria": rng.choice(CATEGORIES),
+            "ventas": rng.randint(0, 500),
+        }
+        for i in range(size)
+    ]
+    data["banners"] = [{"id": f"b{i}", "img": f"images/banner{i + 1}.jpg"} for i in range(3)]
+    data["testimonials"] = [{"id": f"t{i}", "author": fake.name(), "text": fake.sentence(nb_words=15, ext_word_list=WORDS)}
+                            for i in range(3)]
+    data["news"] = [
+        {"id": f"n{i}", "titulo": fake.sentence(nb_words=5, ext_word_list=WORDS), "fecha": fake.date(),
+         "contenido": fake.paragraph(ext_word_list=WORDS), "imagen": "images/novedad1.jpg"}
+        for i in range(5)
+    ]
+    data["faqs"] = [{"q": fake.sentence(nb_words=6, ext_word_list=WORDS) + "?", "a": fake.paragraph(ext_word_list=WORDS)}
+                    for _ in range(5)]
+    # Textos fijos tomados del data.json del proyecto, si existe
+    try:
+        with open(os.path.join(ROOT, "data.json"), encoding="utf-8") as f:
+            base = json.load(f)
+    except (OSError, ValueError):
+        base = {}
+    for key in ("home_texts", "contact_info", "about_us", "cta_texts"):
+        data[key] = base.get(key, data[key])
+    return data
+
+
+# --- Mediciones ---
+def count_elements(node):
+    """Cantidad de elementos (hojas) en el árbol que devolvió AppTest."""
+    children = getattr(node, "children", None)
+    if not children:
+        return 1
+    return sum(count_elements(child) for child in children.values())
+
+
+def timed_run(at):
+    start = time.perf_counter()
+    at.run(timeout=TIMEOUT)
+    elapsed = (time.perf_counter() - start) * 1000
+    if at.exception:
+        raise RuntimeError(f"app.py lanzó una excepción: {at.exception[0].value}")
+    return elapsed
+
+
+def new_session(page, query=None):
+    """Sesión nueva posicionada en `page` (o en los resultados de `query`)."""
+    at = AppTest.from_file(APP_FILE, default_timeout=TIMEOUT)
+    at.session_state["page"] = page
+    if query is not None:
+        # La caja de búsqueda (st_keyup) arranca con el valor de search_term
+        at.session_state["search_term"] = query
+    return at, timed_run(at)
+
+
+def measure_page(page, repeat, query=None):
+    at, first_ms = new_session(page, query)
+    reruns = sorted(timed_run(at) for _ in range(repeat))
+    # La memoria se mide en un rerun aparte para que tracemalloc no afecte las latencias
+    tracemalloc.start()
+    try:
+        timed_run(at)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        "primera_ms": round(first_ms, 2),
+        "rerun_mediana_ms": round(statistics.median(reruns), 2),
+        "rerun_p95_ms": round(reruns[min(len(reruns) - 1, int(len(reruns) * 0.95))], 2),
+        "elementos": count_elements(at._tree),
+        "memoria_pico_kb": round(peak / 1024, 1),
+    }
+
+
+def reset_minerva():
+    """Descarta los módulos de minerva para que el próximo arranque lea el nuevo MINERVA_DATA_FILE."""
+    for name in list(sys.modules):
+        if name == "minerva" or name.startswith("minerva."):
+            del sys.modules[name]
+
+
+def bench_size(size, repeat, workdir):
+    data_file = os.path.join(workdir, f"data-{size}.json")
+    start = time.perf_counter()
+    with open(data_file, "w", encoding="utf-8") as f:
+        json.dump(make_catalog(size), f, ensure_ascii=False)
+    generate_s = time.perf_counter() - start
+
+    os.environ["MINERVA_DATA_FILE"] = data_file
+    reset_minerva()
+    # Arranque en frío: importa minerva, lee el catálogo y arma índices y derivados
+    _, cold_ms = new_session("Inicio")
+    print(f"{size:>8} {'(arranque en frío)':>22} {cold_ms:>10.1f}")
+
+    cases = [(page, page, None) for page in ["Inicio"] + [item for item in DEFAULT_NAV_MENU if item != "Inicio"] + ["Carrito"]]
+    cases += [(f"Búsqueda: {query}", "Inicio", query) for query in SEARCH_QUERIES]
+    pages = {}
+    for name, page, query in cases:
+        result = pages[name] = measure_page(page, repeat, query)
+        print(f"{size:>8} {name:>22} {result['primera_ms']:>10.1f} {result['rerun_mediana_ms']:>10.1f} "
+              f"{result['elementos']:>9} {result['memoria_pico_kb']:>11.0f}")
+    return {
+        "productos": size,
+        "generacion_s": round(generate_s, 2),
+        "arranque_ms": round(cold_ms, 2),
+        "paginas": pages,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(previous, current):
+    """Imprime la variación de la mediana de rerun respecto de una corrida anterior."""
+    before = {(result["productos"], page): values
+              for result in previous["resultados"] for page, values in result["paginas"].items()}
+    print(f"\nComparación con {previous.get('revision') or 'la corrida anterior'}:")
+    for result in current["resultados"]:
+        for page, values in result["paginas"].items():
+            old = before.get((result["productos"], page))
+            if not old or not old["rerun_mediana_ms"]:
+                continue
+            change = (values["rerun_mediana_ms"] / old["rerun_mediana_ms"] - 1) * 100
+            print(f"{result['productos']:>8} {page:>22} {old['rerun_mediana_ms']:>10.1f} -> "
+                  f"{values['rerun_mediana_ms']:>10.1f} ms ({change:+.0f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 50000])
+    parser.add_argument("--repeat", type=int, default=5, help="Reruns medidos por página")
+    parser.add_argument("--output", default="bench_storefront.json", help="Archivo JSON de resultados")
+    parser.add_argument("--compare", default=None, help="Resultados anteriores contra los que comparar")
+    args = parser.parse_args()
+
+    # app.py resuelve style.css y las imágenes relativas al directorio del proyecto
+    os.chdir(ROOT)
+    report = {
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "streamlit": streamlit.__version__,
+        "repeticiones": args.repeat,
+        "resultados": [],
+    }
+    print(f"{'productos':>8} {'página':>22} {'1ª (ms)':>10} {'rerun (ms)':>10} {'elementos':>9} {'memoria (KB)':>11}")
+    with tempfile.TemporaryDirectory(prefix="minerva-bench-") as workdir:
+        for size in args.sizes:
+            report["resultados"].append(bench_size(size, args.repeat, workdir))
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados guardados en {args.output}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Módulos compartidos de la tienda Finisima (catálogo, búsqueda, imágenes)."""
@@ -0,0 +1,138 @@
+"""
+Recursos propios de la tienda: hoja de estilos, fuentes e imágenes de relleno.
+
+Antes cada rerun leía style.css del disco, la página pedía las fuentes a
+Google Fonts y cada imagen faltante, ícono de beneficio o red social era una
+URL de via.placeholder.com. Ahora:
+
+- style.css se lee y minifica una sola vez por proceso y se inyecta en línea
+  junto con las @font-face de las fuentes locales.
+- Las fuentes se sirven desde static/fonts (por ejemplo
+  static/fonts/montserrat-400.woff2). Si no están, se usa la pila de fuentes
+  del sistema de style.css, sin pedir nada a terceros.
+- Las imágenes de relleno son SVG incluidos en minerva/assets. st.image los
+  acepta como ruta y el HTML los recibe como data URI, sin otra petición.
+- Los archivos de static/ se enlazan con ?v=<hash del contenido>: el
+  servidor de Streamlit (Tornado) responde esas URLs con caché de largo plazo
+  y un archivo nuevo cambia de URL.
+"""
+import base64
+import functools
+import hashlib
+import os
+import re
+import threading
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+STYLE_FILE = "style.css"
+
+# Carpeta que Streamlit sirve en /app/static (junto a app.py)
+STATIC_DIR = "static"
+STATIC_URL = "app/static/"
+FONTS_DIR = os.path.join(STATIC_DIR, "fonts")
+
+# (familia, peso, archivo en static/fonts)
+FONT_FACES = (
+    ("Montserrat", 400, "montserrat-400.woff2"),
+    ("Montserrat", 700, "montserrat-700.woff2"),
+)
+
+_lock = threading.Lock()
+# ruta -> (mtime_ns, tamaño, hash) para no volver a leer archivos sin cambios
+_file_hashes = {}
+
+
+def file_hash(path):
+    """SHA-1 del contenido de `path`; solo se recalcula si cambian mtime o tamaño."""
+    st = os.stat(path)
+    cached = _file_hashes.get(path)
+    if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    with _lock:
+        _file_hashes[path] = (st.st_mtime_ns, st.st_size, digest.hexdigest())
+    return _file_hashes[path][2]
+
+
+def static_url(path):
+    """
+    URL servible de un archivo dentro de static/, versionada por contenido.
+    None si el archivo está fuera de static/ o no existe.
+    """
+    relative = os.path.relpath(path, STATIC_DIR)
+    if relative.startswith(os.pardir):
+        return None
+    try:
+        version = file_hash(path)[:12]
+    except OSError:
+        return None
+    return f"{STATIC_URL}{relative.replace(os.sep, '/')}?v={version}"
+
+
+# --- Imágenes de relleno ---
+def asset_path(name):
+    """Ruta de un recurso incluido en minerva/assets (por ejemplo "sin-imagen.svg")."""
+    return os.path.join(ASSETS_DIR, name)
+
+
+@functools.lru_cache(maxsize=None)
+def data_uri(path):
+    """Contenido de un SVG como data URI para usar en HTML."""
+    with open(path, "rb") as f:
+        return "data:image/svg+xml;base64," + base64.b64encode(f.read()).decode("ascii")
+
+
+# --- Hoja de estilos ---
+# Cadenas entre comillas (se copian tal cual), separadores con los espacios y
+# comentarios que los rodean, o una racha de espacios y comentarios
+_CSS_TOKEN_RE = re.compile(
+    r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\''
+    r"|(?:\s|/\*.*?\*/)*([{};,])(?:\s|/\*.*?\*/)*"
+    r"|(?:\s|/\*.*?\*/)+",
+    re.S,
+)
+
+
+def _minify_token(match):
+    token = match.group()
+    if token[0] in "\"'":
+        return token
+    return match.group(1) or " "
+
+
+def minify_css(css):
+    """
+    Quita comentarios y colapsa espacios fuera de las cadenas; el contenido
+    entre comillas (content:, url("..."), fuentes) no se toca.
+    """
+    return _CSS_TOKEN_RE.sub(_minify_token, css).strip()
+
+
+def font_faces(url_for=static_url):
+    """@font-face de las fuentes presentes en static/fonts (`url_for(ruta)` arma cada URL)."""
+    rules = []
+    for family, weight, filename in FONT_FACES:
+        path = os.path.join(FONTS_DIR, filename)
+        url = url_for(path) if os.path.exists(path) else None
+        if url:
+            rules.append(f"@font-face{{font-family:'{family}';font-style:normal;font-weight:{weight};"
+                         f"font-display:swap;src:url({url}) format('woff2')}}")
+    return "".join(rules)
+
+
+@functools.lru_cache(maxsize=None)
+def stylesheet(path=STYLE_FILE):
+    """
+    Bloque <style> con las fuentes locales y `path` minificado. Se arma una
+    vez por proceso; None si no se pudo leer la hoja de estilos.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            css = font_faces() + minify_css(f.read())
+    except OSError:
+        return None
+    version = hashlib.sha1(css.encode("utf-8")).hexdigest()[:12]
+    return f'<style data-version="{version}">{css}</style>'
@@ -0,0 +1,149 @@
+"""
+Importación y exportación masiva de productos (CSV y JSON Lines).
+
+Los archivos se leen y escriben fila por fila, sin cargarlos completos en
+memoria. La importación valida cada fila, actualiza por `id` (o agrega si
+el id no existe) y junta todos los cambios para un único save_data al final.
+"""
+import csv
+import io
+import json
+import uuid
+
+from minerva.catalog import CATEGORIES
+from minerva.pricing import parse_price
+from minerva.search import fold
+
+PRODUCT_FIELDS = ["id", "nombre", "descripcion", "precio", "categoria", "imagen", "detalles", "ventas"]
+REQUIRED_FIELDS = ["nombre", "precio"]
+BATCH_SIZE = 1000
+FORMATS = ("csv", "jsonl")
+
+_CATEGORIES_BY_KEY = {fold(categoria): categoria for categoria in CATEGORIES}
+
+
+class ImportReport:
+    """Resultado de una importación: cantidades y errores por fila."""
+
+    __slots__ = ("inserted", "updated", "errors")
+
+    def __init__(self):
+        self.inserted = 0
+        self.updated = 0
+        self.errors = []
+
+    def add_error(self, line, message):
+        self.errors.append({"fila": line, "error": message})
+
+
+def iter_rows(binary_file, fmt):
+    """
+    Recorre el archivo fila por fila. Devuelve tuplas (número de línea,
+    fila, error): si la línea no se pudo leer, fila es None y error el motivo.
+    """
+    text = io.TextIOWrapper(binary_file, encoding="utf-8-sig", newline="")
+    try:
+        if fmt == "csv":
+            reader = csv.DictReader(text)
+            for row in reader:
+                yield reader.line_num, row, None
+        elif fmt == "jsonl":
+            for line_number, line in enumerate(text, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_number, None, f"JSON inválido: {e.msg}"
+                    continue
+                if not isinstance(row, dict):
+                    yield line_number, None, "Cada línea debe ser un objeto JSON."
+                    continue
+                yield line_number, row, None
+        else:
+            raise ValueError(f"Formato no soportado: {fmt}")
+    finally:
+        # No cerrar el archivo subido al liberar el wrapper
+        text.detach()
+
+
+def normalize_row(row, required=REQUIRED_FIELDS):
+    """Valida y limpia una fila. Devuelve (producto, error)."""
+    product = {}
+    for field in PRODUCT_FIELDS:
+        value = row.get(field)
+        if value is None:
+            continue
+        product[field] = value.strip() if isinstance(value, str) else value
+    missing = [field for field in required if not product.get(field)]
+    if missing:
+        return None, f"Faltan campos obligatorios: {', '.join(missing)}"
+    if product.get("precio") and parse_price(product["precio"]) is None:
+        return None, f"Precio inválido: {product['precio']!r}"
+    if product.get("categoria"):
+        categoria = _CATEGORIES_BY_KEY.get(fold(str(product["categoria"])))
+        if categoria is None:
+            return None, f"Categoría desconocida: {product['categoria']!r}"
+        product["categoria"] = categoria
+    if product.get("ventas") in (None, ""):
+        product.pop("ventas", None)
+    else:
+        try:
+            product["ventas"] = int(product["ventas"])
+        except (TypeError, ValueError):
+            return None, f"Ventas inválidas: {product['ventas']!r}"
+    if product.get("id") not in (None, ""):
+        product["id"] = str(product["id"])
+    return product, None
+
+
+def import_products(rows, products, batch_size=BATCH_SIZE, on_batch=None):
+    """
+    Aplica sobre la lista `products` (en el lugar) las filas de `rows`
+    (salida de iter_rows). En una actualización, los campos vacíos no pisan
+    el valor existente y no hay campos obligatorios. `on_batch(filas_procesadas)` se llama cada
+    `batch_size` filas para informar el progreso.
+    """
+    report = ImportReport()
+    positions = {product.get("id"): i for i, product in enumerate(products)}
+    processed = 0
+    for line, row, error in rows:
+        processed += 1
+        if error is None:
+            is_update = str(row.get("id") or "").strip() in positions
+            product, error = normalize_row(row, () if is_update else REQUIRED_FIELDS)
+        if error is not None:
+            report.add_error(line, error)
+        elif product.get("id") in positions:
+            existing = products[positions[product["id"]]]
+            existing.update({field: value for field, value in product.items() if value not in (None, "")})
+            report.updated += 1
+        else:
+            product["id"] = product.get("id") or str(uuid.uuid4())
+            positions[product["id"]] = len(products)
+            products.append(product)
+            report.inserted += 1
+        if on_batch and processed % batch_size == 0:
+            on_batch(processed)
+    if on_batch:
+        on_batch(processed)
+    return report
+
+
+def export_products(products, fmt, binary_file):
+    """Escribe los productos fila por fila en `binary_file`."""
+    text = io.TextIOWrapper(binary_file, encoding="utf-8", newline="")
+    try:
+        if fmt == "csv":
+            writer = csv.DictWriter(text, fieldnames=PRODUCT_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            for product in products:
+                writer.writerow(product)
+        elif fmt == "jsonl":
+            for product in products:
+                text.write(json.dumps(product, ensure_ascii=False) + "\n")
+        else:
+            raise ValueError(f"Formato no soportado: {fmt}")
+        text.flush()
+    finally:
+        text.detach()
@@ -0,0 +1,73 @@
+"""
+Carrito de compras guardado del lado del servidor.
+
+En st.session_state solo se guarda el id del carrito. El contenido vive en un
+diccionario compartido por el proceso (id de producto -> cantidad, sin copias
+de los productos) con expiración: los carritos abandonados se descartan
+después de CART_TTL segundos sin uso y nunca hay más de MAX_CARTS a la vez.
+"""
+import os
+import threading
+
+from cachetools import TTLCache
+
+CART_TTL = int(os.environ.get("MINERVA_CART_TTL", str(2 * 60 * 60)))
+MAX_CARTS = int(os.environ.get("MINERVA_MAX_CARTS", "10000"))
+
+
+class CartStore:
+    """Carritos por id con expiración por inactividad."""
+
+    def __init__(self, maxsize=MAX_CARTS, ttl=CART_TTL):
+        self._carts = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def items(self, cart_id):
+        """Copia del carrito: {id de producto: cantidad}."""
+        with self._lock:
+            cart = self._carts.get(cart_id)
+            if cart is None:
+                return {}
+            # Volver a asignarlo renueva su expiración
+            self._carts[cart_id] = cart
+            return dict(cart)
+
+    def set_quantity(self, cart_id, product_id, quantity):
+        """Fija la cantidad de un producto (0 lo quita del carrito)."""
+        with self._lock:
+            cart = self._carts.get(cart_id, {})
+            if quantity > 0:
+                cart[product_id] = quantity
+            else:
+                cart.pop(product_id, None)
+            self._carts[cart_id] = cart
+
+    def add(self, cart_id, product_id, quantity=1):
+        """Suma `quantity` unidades de un producto."""
+        with self._lock:
+            cart = self._carts.get(cart_id, {})
+            cart[product_id] = cart.get(product_id, 0) + quantity
+            self._carts[cart_id] = cart
+
+    def clear(self, cart_id):
+        """Vacía el carrito."""
+        with self._lock:
+            self._carts.pop(cart_id, None)
+
+    def count(self, cart_id):
+        """Cantidad total de unidades en el carrito."""
+        with self._lock:
+            return sum(self._carts.get(cart_id, {}).values())
+
+
+def cart_total(items, price_index):
+    """Total en centavos; los productos sin precio numérico no suman."""
+    return sum((price_index.get(product_id) or 0) * quantity for product_id, quantity in items.items())
+
+
+_store = CartStore()
+
+
+def get_cart_store():
+    """Almacén de carritos compartido por todas las sesiones del proceso."""
+    return _store
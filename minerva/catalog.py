@@ -0,0 +1,281 @@
+"""
+Acceso a los datos del catálogo, compartido por la tienda y el panel.
+
+Streamlit vuelve a ejecutar app.py en cada interacción. En lugar de abrir y
+parsear data.json cada vez, se mantiene un único snapshot por proceso que solo
+se recarga cuando cambia el archivo o su journal (mtime, tamaño o contenido).
+Con MINERVA_STORAGE=sqlite los datos se leen de la base SQLite.
+
+El panel edita una copia mutable (load_data) y la guarda con save_data a
+través del escritor compartido. Cada guardado invalida la caché del proceso
+al instante, y los demás procesos se enteran por minerva.watch. Además queda
+registrado como versión (minerva.versions): si data.json está dañado, la
+tienda muestra la última versión en lugar de un catálogo vacío.
+"""
+import logging
+import threading
+from types import MappingProxyType
+
+from minerva.schema import validate_products
+from minerva.search import fold
+from minerva.storage import get_writer, open_store
+from minerva.versions import get_versions
+from minerva.watch import watch_files
+
+logger = logging.getLogger(__name__)
+
+# Categorías de producto (cada una tiene su página en el menú de navegación)
+CATEGORIES = ["Peluquería", "Barbería", "Accesorios", "Herramientas", "Equipamientos"]
+
+DEFAULT_NAV_MENU = ["Inicio", "Peluquería", "Barbería", "Accesorios", "Herramientas", "Equipamientos", "Novedades", "Contacto", "Sobre Nosotros"]
+
+
+def create_empty_data():
+    """Crea una estructura de datos completa y vacía para el archivo JSON."""
+    return {
+        "products": [],
+        "banners": [],
+        "news": [],
+        "testimonials": [],
+        "nav_menu": list(DEFAULT_NAV_MENU),
+        "home_texts": {},
+        "contact_info": {},
+        "about_us": {},
+        "faqs": [],
+        "cta_texts": {}
+    }
+
+
+DECODE_ERROR = "Error al decodificar el archivo data.json. Se utilizará una estructura vacía."
+RECOVERED_ERROR = ("Error al decodificar el archivo data.json. Se muestra la última versión guardada "
+                   "({id}, del {fecha}).")
+
+
+def _fill_missing_keys(data):
+    """Asegura que todas las claves necesarias existan."""
+    for key, default_value in create_empty_data().items():
+        if key not in data:
+            data[key] = default_value
+    return data
+
+
+def freeze(value):
+    """Convierte dicts y listas anidadas en estructuras de solo lectura."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+class CatalogSnapshot:
+    """Vista inmutable del catálogo para una versión concreta de data.json."""
+
+    __slots__ = ("data", "version", "error", "_derived", "_lock")
+
+    def __init__(self, data, version, error=None):
+        self.data = data
+        self.version = version
+        self.error = error
+        self._derived = {}
+        # Reentrante: un builder puede pedir otra estructura derivada (el
+        # índice de búsqueda usa los productos validados)
+        self._lock = threading.RLock()
+
+    def derive(self, name, builder):
+        """
+        Calcula una estructura derivada (índices, rankings...) una sola vez por
+        versión del catálogo. Al recargarse data.json se crea un snapshot nuevo,
+        por lo que lo derivado se descarta junto con el snapshot anterior.
+        """
+        try:
+            return self._derived[name]
+        except KeyError:
+            pass
+        with self._lock:
+            if name not in self._derived:
+                self._derived[name] = builder(self)
+            return self._derived[name]
+
+    def _validated_products(self):
+        return self.derive("validated_products", lambda snapshot: validate_products(snapshot.data.get("products", [])))
+
+    @property
+    def products(self):
+        """
+        Productos válidos como instancias de schema.Product (validados una vez
+        por versión). Los índices de búsqueda, categorías y precios usan
+        posiciones en esta tupla.
+        """
+        return self._validated_products()[0]
+
+    @property
+    def product_errors(self):
+        """Productos de data.json que no pasaron la validación (y por qué)."""
+        return self._validated_products()[1]
+
+
+class CatalogCache:
+    """Caché del catálogo compartida por todos los hilos/sesiones del proceso."""
+
+    def __init__(self, store):
+        self.store = store
+        self._lock = threading.Lock()
+        self._fingerprint = None
+        self._snapshot = None
+        self._watching = False
+        self._stale = True
+
+    def _load(self):
+        known_version = self._snapshot.version if self._snapshot is not None else None
+        try:
+            data, version = self.store.read(known_version)
+        except ValueError:
+            data, manifest = load_last_version(self.store.path)
+            if data is None:
+                return CatalogSnapshot(freeze(create_empty_data()), "error", error=DECODE_ERROR)
+            return CatalogSnapshot(freeze(_fill_missing_keys(data)), f"version:{manifest['id']}",
+                                   error=RECOVERED_ERROR.format(**manifest))
+        # Un "touch" sin cambios de contenido no invalida el snapshot
+        if data is None:
+            return self._snapshot
+        return CatalogSnapshot(freeze(_fill_missing_keys(data)), version)
+
+    def watch(self):
+        """
+        Vigila los archivos del almacenamiento para invalidar la caché cuando
+        otro proceso los modifica. Mientras la vigilancia está activa, get()
+        no consulta el disco hasta recibir un aviso.
+        """
+        self._watching = watch_files(self.store.watched_files(), self.invalidate) is not None
+        return self._watching
+
+    def get(self):
+        """Devuelve el snapshot vigente, recargando solo si data.json cambió."""
+        snapshot = self._snapshot
+        if self._watching and not self._stale and snapshot is not None:
+            return snapshot
+        # Se limpia antes de mirar el disco: un aviso que llegue durante la
+        # lectura vuelve a marcar la caché para la próxima consulta
+        self._stale = False
+        fingerprint = self.store.fingerprint()
+        if snapshot is not None and fingerprint == self._fingerprint:
+            return snapshot
+
+        with self._lock:
+            # Otro hilo pudo haber recargado mientras esperábamos el lock
+            if self._snapshot is not None and fingerprint == self._fingerprint:
+                return self._snapshot
+            if fingerprint is None:
+                self._snapshot = CatalogSnapshot(freeze(create_empty_data()), "vacio")
+            else:
+                self._snapshot = self._load()
+            self._fingerprint = fingerprint
+            return self._snapshot
+
+    def invalidate(self):
+        """Fuerza la recarga en el próximo acceso."""
+        self._stale = True
+        self._fingerprint = None
+
+
+_cache = CatalogCache(open_store())
+_cache.watch()
+# Los guardados de este mismo proceso invalidan la caché sin esperar al aviso
+get_writer().subscribe(_cache.invalidate)
+
+
+def get_catalog():
+    """Snapshot del catálogo compartido por todo el proceso."""
+    return _cache.get()
+
+
+def load_data():
+    """
+    Copia editable del catálogo, con los guardados que aún no se escribieron.
+    Lanza ValueError si data.json no es un JSON válido.
+    """
+    data = get_writer().load()
+    if data is None:
+        return create_empty_data()
+    return _fill_missing_keys(data)
+
+
+def load_last_version(path=None):
+    """(documento, manifiesto) de la última versión registrada, o (None, None)."""
+    versions = get_versions(path)
+    try:
+        manifest = versions.latest()
+        if manifest is not None:
+            return versions.load(manifest["id"]), manifest
+    except (OSError, ValueError) as e:
+        logger.error("No se pudo leer la última versión del catálogo: %s", e)
+    return None, None
+
+
+def save_data(data, message="", ops=None):
+    """
+    Guarda el catálogo (los guardados seguidos se agrupan en una sola
+    escritura) y lo registra como versión. Con `ops` (ver CatalogWriter.save)
+    no se copia ni se compara el catálogo entero. Devuelve el error de
+    escritura, o None si se guardó bien. La versión se registra recién
+    cuando el guardado llega a disco (los agrupados, al escribirse).
+    """
+    versions = get_versions()
+    try:
+        if not versions.ids():
+            # Primer guardado con historial: se conserva también el catálogo anterior
+            try:
+                previous = get_writer().load()
+            except ValueError:
+                previous = None
+            if previous is not None:
+                versions.record(previous, "Versión inicial")
+    except OSError as e:
+        logger.error("No se pudo registrar la versión inicial del catálogo: %s", e)
+    def record(doc):
+        try:
+            versions.record(doc, message, ops)
+        except OSError as e:
+            logger.error("No se pudo registrar la versión del catálogo: %s", e)
+
+    try:
+        get_writer().save(data, ops, on_written=record)
+    except OSError as e:
+        logger.error("Error al guardar el catálogo: %s", e)
+        return e
+    return None
+
+
+def restore_version(version_id):
+    """
+    Vuelve el catálogo a una versión anterior: su contenido se guarda como
+    una versión nueva. Devuelve el error de escritura, o None.
+    """
+    data = get_versions().load(version_id)
+    if data is None:
+        return KeyError(f"No existe la versión {version_id}.")
+    return save_data(data, f"Restaurada la versión {version_id}")
+
+
+def last_save_error():
+    """Error de la última escritura en disco (también las diferidas), o None."""
+    return get_writer().last_error
+
+
+def get_products_by_id(catalog):
+    """Diccionario id -> producto de un snapshot (se arma una vez por versión)."""
+    return catalog.derive("products_by_id", lambda snapshot: {product.id: product for product in snapshot.products})
+
+
+def _build_category_index(snapshot):
+    index = {}
+    for position, product in enumerate(snapshot.products):
+        if product.categoria:
+            index.setdefault(fold(product.categoria), []).append(position)
+    return {key: tuple(positions) for key, positions in index.items()}
+
+
+def get_category_positions(catalog, categoria):
+    """Posiciones de los productos de una categoría (índice armado una vez por versión)."""
+    return catalog.derive("category_index", _build_category_index).get(fold(categoria), ())
@@ -0,0 +1,230 @@
+"""
+Secciones estáticas de la tienda renderizadas como un único bloque HTML.
+
+El encabezado, el bloque de beneficios, "Sobre Nosotros", los datos de
+contacto y el pie de página solo cambian cuando el administrador edita sus
+textos. Cada uno se arma una vez por versión del catálogo (un guardado en el
+panel crea una versión nueva) y se envía con un solo st.markdown en lugar de
+decenas de elementos por rerun.
+
+El carrusel de banners también es un fragmento: se arma una vez por versión
+con derivados del tamaño justo, la primera imagen se pide de inmediato y las
+siguientes con loading="lazy", y nunca se incluyen más de MAX_BANNERS.
+
+El detalle de cada producto se arma una sola vez por versión del producto:
+schema.Product es inmutable y comparable, así que un producto editado es una
+clave nueva de la caché. Los fragmentos con imágenes también usan como clave
+las rutas ya resueltas: una imagen que aparece en disco (o desaparece) después
+de armarse el fragmento no queda fija como placeholder.
+"""
+import functools
+import html
+import os
+
+from minerva.assets import asset_path, data_uri
+from minerva.images import PLACEHOLDER_IMAGE, get_image_path, variant_url
+from minerva.metrics import timed
+
+# Banners que se muestran como máximo en el carrusel (los primeros de la lista)
+MAX_BANNERS = int(os.environ.get("MINERVA_MAX_BANNERS", "5"))
+BANNER_PLACEHOLDER = asset_path("banner.svg")
+# Detalles de producto renderizados que se conservan en memoria
+DETAIL_CACHE_SIZE = int(os.environ.get("MINERVA_DETAIL_CACHE_SIZE", "512"))
+
+
+def _top_banner(data):
+    cta_texts = data.get("cta_texts", {})
+    return f"""
+    <div class="main-banner">
+        {cta_texts.get('banner_text', 'Envíos Gratis en compras mayores a $100.000 - Entregas en el día en Gran San Miguel de Tucumán')}
+    </div>
+"""
+
+
+def _banner_slide(number, image_path):
+    src = variant_url(image_path, "banner")
+    if not src:
+        return None
+    attributes = [f'src="{html.escape(src)}"', f'alt="Banner {number}"', 'decoding="async"']
+    half = variant_url(image_path, "detail")
+    if half and half != src:
+        # El navegador elige el ancho según la pantalla (mitad en celulares)
+        attributes.append(f'srcset="{html.escape(half)} 960w, {html.escape(src)} 1920w"')
+        attributes.append('sizes="(max-width: 768px) 100vw, 70vw"')
+    # Solo la primera diapositiva se pide al cargar la página
+    attributes.append('fetchpriority="high"' if number == 1 else 'loading="lazy"')
+    return f'<div class="banner-slide" id="banner-{number}"><img {" ".join(attributes)}></div>'
+
+
+def _banner_carousel(data):
+    slides = []
+    for item in data.get("banners", []):
+        if len(slides) == MAX_BANNERS:
+            break
+        slide = _banner_slide(len(slides) + 1, get_image_path(item.get("img") or BANNER_PLACEHOLDER))
+        if slide:
+            slides.append(slide)
+    if not slides:
+        slides.append(_banner_slide(1, BANNER_PLACEHOLDER))
+    dots = "".join(f'<a href="#banner-{number}" aria-label="Banner {number}"></a>' for number in range(1, len(slides) + 1))
+    return f"""
+<div class="banner-carousel">
+    <div class="banner-track">{"".join(slides)}</div>
+    {f'<div class="banner-dots">{dots}</div>' if len(slides) > 1 else ''}
+</div>
+"""
+
+
+def _icon(name):
+    return data_uri(asset_path(name))
+
+
+def _benefits(data):
+    home_texts = data.get("home_texts", {})
+    return f"""
+<h2 class='section-title'>{home_texts.get('section1_title', '¿Por Qué Elegir Finisima? Tu Cabello Lo Merece.')}</h2>
+<p class='section-description'>{home_texts.get('section1_description', 'Descubre los pilares que hacen de Finisima la elección perfecta para un cuidado capilar excepcional.')}</p>
+<div class='benefits-grid'>
+    <div class='benefit-card'>
+        <img src="{_icon('beneficio-botanico.svg')}" class="benefit-icon" alt="" width="50" height="50">
+        <h4>Fórmulas Botánicas Premium</h4>
+        <p>Ingredientes naturales seleccionados que nutren y revitalizan tu cabello desde la raíz.</p>
+    </div>
+    <div class='benefit-card'>
+        <img src="{_icon('beneficio-tecnologia.svg')}" class="benefit-icon" alt="" width="50" height="50">
+        <h4>Tecnología Capilar Avanzada</h4>
+        <p>Innovación y ciencia al servicio de la belleza. Nuestras fórmulas combinan lo mejor de la naturaleza con tecnologías de vanguardia.</p>
+    </div>
+    <div class='benefit-card'>
+        <img src="{_icon('beneficio-cruelty-free.svg')}" class="benefit-icon" alt="" width="50" height="50">
+        <h4>Ética y Sostenibilidad</h4>
+        <p>Somos una marca Cruelty-Free, comprometida con el respeto animal y el cuidado del planeta.</p>
+    </div>
+</div>
+"""
+
+
+def _about_us(data):
+    about_us_texts = data.get("about_us", {})
+    faqs_html = "".join(
+        f"<details class='faq-item'><summary>{faq.get('question', faq.get('q', 'Pregunta frecuente...'))}</summary>"
+        f"<p>{faq.get('answer', faq.get('a', 'Respuesta no disponible.'))}</p></details>"
+        for faq in data.get("faqs", [])
+    )
+    return f"""
+<h1 class='page-title'>Sobre Nosotros</h1>
+<p class='section-description'>Conoce la historia detrás de Finisima y nuestros valores.</p>
+<div class='about-section-card'>
+    <h3>{about_us_texts.get('about_title', 'Nuestra Historia')}</h3>
+    <p>{about_us_texts.get('about_story', 'Historia no disponible.')}</p>
+    <div class='section-spacer-small'></div>
+    <h3>{about_us_texts.get('values_title', 'Nuestros Valores')}</h3>
+    <ul>
+        <li style="margin-bottom: 10px;"><strong style="color: #008C82;">✨ {about_us_texts.get('value1_title', 'Calidad Superior:')}</strong> {about_us_texts.get('value1_text', 'Comprometidos con la excelencia en cada producto que creamos.')}</li>
+        <li style="margin-bottom: 10px;"><strong style="color: #008C82;">🌱 {about_us_texts.get('value2_title', 'Innovación Constante:')}</strong> {about_us_texts.get('value2_text', 'Siempre a la vanguardia, explorando nuevos ingredientes y tecnologías de vanguardia.')}</li>
+        <li style="margin-bottom: 10px;"><strong style="color: #008C82;">🌿 {about_us_texts.get('value3_title', 'Sostenibilidad y Ética:')}</strong> {about_us_texts.get('value3_text', 'Respeto por el medio ambiente y prácticas responsables en toda nuestra cadena de valor.')}</li>
+        <li style="margin-bottom: 10px;"><strong style="color: #008C82;">💖 {about_us_texts.get('value4_title', 'Pasión por la Belleza:')}</strong> {about_us_texts.get('value4_text', 'Amor por lo que hacemos y dedicación por tu bienestar.')}</li>
+    </ul>
+</div>
+<div class='section-spacer-small'></div>
+<div class='about-section-card'>
+    <h3>{about_us_texts.get('faqs_title', 'Preguntas Frecuentes')}</h3>
+    {faqs_html}
+</div>
+<div class='section-spacer-small'></div>
+<div class='about-section-card'>
+    <h3>{about_us_texts.get('team_title', 'Conoce a Nuestro Equipo')}</h3>
+    <p>{about_us_texts.get('team_text', 'Información del equipo no disponible.')}</p>
+</div>
+"""
+
+
+def _contact_info(data):
+    contact_info = data.get("contact_info", {})
+    return f"""
+<div class='contact-info-card'>
+    <h3>Nuestros Datos de Contacto</h3>
+    <p><strong>Dirección:</strong> {contact_info.get('address', 'Dirección no disponible.')}</p>
+    <p><strong>Teléfono:</strong> {contact_info.get('phone', 'Teléfono no disponible.')}</p>
+    <p><strong>Email:</strong> {contact_info.get('email', 'Email no disponible.')}</p>
+    <p><strong>Horario:</strong> {contact_info.get('hours', 'Horario no disponible.')}</p>
+</div>
+"""
+
+
+def _footer(data):
+    contact_info = data.get("contact_info", {})
+    return f"""
+<div class='footer'>
+    <div class='footer-grid'>
+        <div>
+            <h4>Síguenos</h4>
+            <a href='#' class='social-icon'><img src='{_icon("facebook.svg")}' alt='Facebook' width='30' height='30'></a>
+            <a href='#' class='social-icon'><img src='{_icon("instagram.svg")}' alt='Instagram' width='30' height='30'></a>
+            <a href='#' class='social-icon'><img src='{_icon("twitter.svg")}' alt='Twitter' width='30' height='30'></a>
+        </div>
+        <div>
+            <h4>Contacto</h4>
+            <p>Email: {contact_info.get('email', 'N/A')}</p>
+            <p>Tel: {contact_info.get('phone', 'N/A')}</p>
+        </div>
+        <div>
+            <h4>Legal</h4>
+            <p>Términos y Condiciones</p>
+            <p>Política de Privacidad</p>
+        </div>
+    </div>
+</div>
+"""
+
+
+def _banner_images(data):
+    return tuple(get_image_path(item.get("img") or BANNER_PLACEHOLDER) for item in data.get("banners", []))
+
+
+# Secciones con imágenes: rutas resueltas que forman parte de la clave de caché
+_IMAGE_KEYS = {
+    "banner_carousel": _banner_images,
+}
+
+_SECTIONS = {
+    "top_banner": _top_banner,
+    "banner_carousel": _banner_carousel,
+    "benefits": _benefits,
+    "about_us": _about_us,
+    "contact_info": _contact_info,
+    "footer": _footer,
+}
+
+
+@timed("fragmentos")
+def render_fragment(catalog, name):
+    """HTML de la sección `name`, construido una sola vez por versión del catálogo."""
+    key = f"fragment:{name}"
+    if name in _IMAGE_KEYS:
+        key = (key, _IMAGE_KEYS[name](catalog.data))
+    return catalog.derive(key, lambda snapshot: _SECTIONS[name](snapshot.data))
+
+
+def render_product_detail(product, free_shipping=False):
+    """HTML de la página de detalle de `product` (schema.Product)."""
+    return _product_detail(product, get_image_path(product.imagen), free_shipping)
+
+
+@functools.lru_cache(maxsize=DETAIL_CACHE_SIZE)
+def _product_detail(product, image_path, free_shipping):
+    image = variant_url(image_path, "detail") or data_uri(PLACEHOLDER_IMAGE)
+    badge = "<span class='free-shipping-badge'>Envío gratis</span>" if free_shipping else ""
+    return f"""
+<div class='product-detail'>
+    <img class='product-detail-image' src="{html.escape(image)}" alt="{html.escape(product.nombre)}" fetchpriority="high">
+    <div class='product-detail-info'>
+        <h1 class='page-title'>{html.escape(product.nombre, quote=False)}</h1>
+        <p class='product-price'>{html.escape(product.precio, quote=False)}</p>
+        {badge}
+        <p class='section-description'>{html.escape(product.descripcion, quote=False)}</p>
+        <h3>Detalles</h3>
+        <p>{html.escape(product.detalles, quote=False)}</p>
+    </div>
+</div>
+"""
@@ -0,0 +1,96 @@
+"""
+Almacén de imágenes direccionado por contenido.
+
+Cada archivo subido desde el panel de administración se guarda como
+images/store/<2 primeros caracteres>/<sha256>.<ext>. Dos subidas del mismo
+archivo producen el mismo nombre, así que la segunda solo cuesta calcular el
+hash y comprobar que el archivo ya existe.
+
+    python -m minerva.image_store          # lista imágenes duplicadas del repositorio
+"""
+import hashlib
+import os
+import sys
+import tempfile
+
+from PIL import Image
+
+STORE_DIR = os.path.join("images", "store")
+CHUNK_SIZE = 1024 * 1024
+
+# Formatos aceptados (según Pillow) y extensión con la que se guardan
+EXTENSIONS = {
+    "JPEG": "jpg",
+    "PNG": "png",
+    "WEBP": "webp",
+    "GIF": "gif",
+}
+
+
+def _check_image(path):
+    """Valida la imagen leyendo solo su cabecera (sin decodificar el bitmap completo)."""
+    try:
+        with Image.open(path) as img:
+            fmt = img.format
+            img.verify()
+    except Exception as e:
+        raise ValueError(f"El archivo no es una imagen válida: {e}") from e
+    if fmt not in EXTENSIONS:
+        raise ValueError(f"Formato de imagen no soportado: {fmt}")
+    return EXTENSIONS[fmt]
+
+
+def store_upload(uploaded_file, store_dir=STORE_DIR):
+    """
+    Guarda un archivo subido (cualquier objeto con `.read()`) y devuelve su
+    ruta relativa con "/" como separador, lista para guardar en data.json.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    digest = hashlib.sha256()
+    if hasattr(uploaded_file, "seek"):
+        uploaded_file.seek(0)
+    # El temporal se crea dentro del almacén para que os.replace sea atómico
+    fd, tmp_path = tempfile.mkstemp(dir=store_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            for chunk in iter(lambda: uploaded_file.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+                tmp.write(chunk)
+        ext = _check_image(tmp_path)
+        name = digest.hexdigest()
+        target_dir = os.path.join(store_dir, name[:2])
+        target = os.path.join(target_dir, f"{name}.{ext}")
+        if os.path.exists(target):
+            os.remove(tmp_path)
+        else:
+            os.makedirs(target_dir, exist_ok=True)
+            os.replace(tmp_path, target)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return target.replace(os.sep, "/")
+
+
+def find_duplicates(root="."):
+    """Agrupa las imágenes bajo `root` que tienen exactamente el mismo contenido."""
+    by_hash = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+        for filename in filenames:
+            if filename.rsplit(".", 1)[-1].lower() not in ("jpg", "jpeg", "png", "webp", "gif"):
+                continue
+            path = os.path.join(dirpath, filename)
+            digest = hashlib.sha256()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                    digest.update(chunk)
+            by_hash.setdefault(digest.hexdigest(), []).append(os.path.relpath(path, root))
+    return [sorted(paths) for paths in by_hash.values() if len(paths) > 1]
+
+
+if __name__ == "__main__":
+    groups = find_duplicates(sys.argv[1] if len(sys.argv) > 1 else ".")
+    for paths in groups:
+        print(" = ".join(paths))
+    print(f"{len(groups)} grupos de imágenes duplicadas.")
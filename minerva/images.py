@@ -0,0 +1,247 @@
+"""
+Resolución de rutas y derivados redimensionados de las imágenes del catálogo.
+
+Las tarjetas de producto, las novedades y el carrusel mostraban el archivo
+original completo. Aquí se generan (una sola vez) versiones reducidas por
+"slot" en WebP, o JPEG/PNG si Pillow no tiene soporte WebP, nombradas por el
+hash del archivo fuente: si la imagen original cambia, cambia el hash y se
+genera un derivado nuevo; si no, se reutiliza el que ya está en disco.
+
+Los derivados viven en static/ para que Streamlit los sirva como archivos
+estáticos (enableStaticServing en .streamlit/config.toml): así el HTML de la
+tienda, como el carrusel de banners, puede referenciarlos por URL. Las
+imágenes faltantes se reemplazan por un SVG local (minerva/assets).
+"""
+import logging
+import os
+import threading
+import time
+
+from PIL import Image, ImageOps, features
+
+from minerva.assets import STATIC_DIR, asset_path, data_uri, file_hash, static_url
+from minerva.metrics import timed
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVES_DIR = os.path.join(STATIC_DIR, "imagenes")
+
+# Ancho máximo (px) de cada lugar donde se muestra una imagen
+SLOT_WIDTHS = {
+    "logo": 300,
+    "card": 480,
+    "news": 640,
+    "detail": 960,
+    "banner": 1920,
+}
+
+QUALITY = 82
+
+PLACEHOLDER_IMAGE = asset_path("sin-imagen.svg")
+
+# Directorios indexados (además de los archivos sueltos en la raíz del proyecto)
+IMAGE_DIRS = ("images", "data_minerva")
+# Cada cuántos segundos se vuelve a recorrer el disco para ver imágenes nuevas
+INDEX_TTL = 30
+
+_lock = threading.Lock()
+# (ruta, slot) -> (mtime_ns, tamaño, derivado): mientras la fuente no cambie,
+# resolver el derivado cuesta un solo os.stat
+_variants = {}
+
+
+def _is_url(value):
+    return value.startswith("http://") or value.startswith("https://")
+
+
+class ImageResolver:
+    """
+    Índice en memoria de las imágenes locales. Resolver una ruta es una
+    búsqueda en un set en lugar de un os.path.exists por imagen y por rerun.
+    El índice se reconstruye cada `ttl` segundos o al llamar a `refresh()`.
+    Las rutas que no están en el índice (absolutas o recién creadas) se
+    consultan en disco una vez y el resultado vale hasta la próxima
+    reconstrucción. Los aciertos y fallos se exportan con minerva.metrics.
+    """
+
+    def __init__(self, roots=IMAGE_DIRS, base_dir=".", ttl=INDEX_TTL):
+        self.roots = roots
+        self.base_dir = base_dir
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._paths = frozenset()
+        # ruta fuera del índice -> existe (se vacía al reconstruir el índice)
+        self._checked = {}
+        self._built_at = None
+        self._warned = set()
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Recorre los directorios de imágenes y reemplaza el índice."""
+        paths = set()
+        with os.scandir(self.base_dir) as entries:
+            paths.update(entry.name for entry in entries if entry.is_file())
+        for root in self.roots:
+            for dirpath, _, filenames in os.walk(os.path.join(self.base_dir, root)):
+                rel_dir = os.path.relpath(dirpath, self.base_dir).replace(os.sep, "/")
+                paths.update(f"{rel_dir}/{filename}" for filename in filenames)
+        with self._lock:
+            self._paths = frozenset(paths)
+            self._checked = {}
+            self._built_at = time.monotonic()
+
+    def _exists(self, image_path):
+        if self._built_at is None or time.monotonic() - self._built_at > self.ttl:
+            self.refresh()
+        key = image_path.replace("\\", "/")
+        if key.startswith("./"):
+            key = key[2:]
+        if key in self._paths:
+            return True
+        checked = self._checked.get(key)
+        if checked is not None:
+            return checked
+        # Fuera del índice: una ruta absoluta (los placeholders) o una imagen
+        # recién subida. Se confirma en disco una sola vez
+        exists = os.path.exists(key if os.path.isabs(key) else os.path.join(self.base_dir, key))
+        self._checked[key] = exists
+        return exists
+
+    def resolve(self, image_url_or_path):
+        """
+        Devuelve la ruta si la imagen existe (o la URL tal cual) y un
+        placeholder si no. Cada imagen faltante se registra una sola vez.
+        """
+        if not image_url_or_path:
+            return PLACEHOLDER_IMAGE
+        if _is_url(image_url_or_path):
+            return image_url_or_path
+        if self._exists(image_url_or_path):
+            self.hits += 1
+            return image_url_or_path
+        self.misses += 1
+        if image_url_or_path not in self._warned:
+            self._warned.add(image_url_or_path)
+            logger.warning("Imagen no encontrada: %s. Se usará un placeholder.", image_url_or_path)
+        return PLACEHOLDER_IMAGE
+
+    def stats(self):
+        """Contadores para monitoreo."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "indexed": len(self._paths),
+            "missing": sorted(self._warned),
+        }
+
+
+_resolver = ImageResolver()
+
+
+@timed("imagenes.ruta")
+def get_image_path(image_url_or_path):
+    """
+    Verifica si la ruta de la imagen existe.
+    Si no existe, devuelve una URL de placeholder.
+    Acepta URLs directas o rutas de archivo locales.
+    """
+    return _resolver.resolve(image_url_or_path)
+
+
+def image_index_stats():
+    """Aciertos/fallos del índice de imágenes y rutas faltantes."""
+    return _resolver.stats()
+
+
+def _has_alpha(img):
+    return img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+
+
+def _render(source, target_base, width):
+    with Image.open(source) as img:
+        if img.width > width:
+            # En JPEG decodifica directamente a escala reducida (más rápido y con menos memoria)
+            img.draft("RGB", (width, max(1, round(img.height * width / img.width))))
+        img = ImageOps.exif_transpose(img)
+        if img.width > width:
+            img = img.resize((width, max(1, round(img.height * width / img.width))), Image.Resampling.LANCZOS)
+        mode = "RGBA" if _has_alpha(img) else "RGB"
+        if features.check("webp"):
+            fmt, ext = "WEBP", "webp"
+        elif mode == "RGBA":
+            fmt, ext = "PNG", "png"
+        else:
+            fmt, ext = "JPEG", "jpg"
+        if img.mode != mode:
+            img = img.convert(mode)
+        target = f"{target_base}.{ext}"
+        tmp_path = f"{target}.tmp"
+        img.save(tmp_path, fmt, quality=QUALITY, optimize=True)
+        os.replace(tmp_path, target)
+        return target
+
+
+def _existing(target_base):
+    for ext in ("webp", "jpg", "png"):
+        candidate = f"{target_base}.{ext}"
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+
+@timed("imagenes.derivado")
+def get_variant(image_path, slot):
+    """
+    Devuelve la ruta del derivado de `image_path` para el `slot` indicado
+    ("card", "detail", "banner", "news", "logo"). Las URLs externas y
+    cualquier error de procesamiento devuelven la imagen original, igual que
+    los SVG (no necesitan derivados).
+    """
+    if not image_path or _is_url(image_path) or image_path.endswith(".svg") or slot not in SLOT_WIDTHS:
+        return image_path
+    source = image_path.replace("\\", "/").replace("/", os.sep)
+    try:
+        st = os.stat(source)
+        cached = _variants.get((source, slot))
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+        variant = _build_variant(source, slot)
+    except (OSError, ValueError) as e:
+        logger.warning("No se pudo generar el derivado '%s' de %s: %s", slot, image_path, e)
+        return image_path
+    _variants[(source, slot)] = (st.st_mtime_ns, st.st_size, variant)
+    return variant
+
+
+def _build_variant(source, slot):
+    target_base = os.path.join(DERIVATIVES_DIR, f"{file_hash(source)}_{slot}")
+    existing = _existing(target_base)
+    if existing:
+        return existing
+    with _lock:
+        # Otro hilo pudo haberlo generado mientras esperábamos
+        existing = _existing(target_base)
+        if existing:
+            return existing
+        os.makedirs(DERIVATIVES_DIR, exist_ok=True)
+        return _render(source, target_base, SLOT_WIDTHS[slot])
+
+
+def variant_url(image_path, slot):
+    """
+    URL servible del derivado de `image_path` para usar en HTML, versionada
+    por contenido. Las URLs externas se devuelven tal cual y los SVG como
+    data URI; None si no hay un derivado en static/.
+    """
+    if image_path and _is_url(image_path):
+        return image_path
+    variant = get_variant(image_path, slot)
+    if not variant or _is_url(variant):
+        return variant
+    if variant.endswith(".svg"):
+        try:
+            return data_uri(variant)
+        except OSError:
+            return None
+    return static_url(variant)
@@ -0,0 +1,218 @@
+"""
+Instrumentación opcional de cada ejecución (rerun) de la tienda.
+
+Se activa para todo el proceso con MINERVA_PROFILE=1, o para una sesión
+abriendo la tienda con ?profile=1 si el proceso se inició con
+MINERVA_PROFILE_PARAM=1 (sin esa variable el parámetro se ignora: perfilar
+instala contadores en todo el proceso y muestra tiempos internos, así que no
+puede quedar en manos de cualquier visitante). Mientras una ejecución está
+perfilada se mide:
+
+- el tiempo de cada sección con nombre (section() / @timed),
+- las llamadas al sistema de archivos (os.stat, os.scandir, os.listdir, open),
+- los elementos que Streamlit envía al navegador.
+
+Las métricas quedan en formato de texto de Prometheus (junto con los
+aciertos y fallos del índice de imágenes de minerva.images): con
+MINERVA_METRICS_PORT se sirven en http://localhost:<puerto>/metrics; si no,
+se escriben en MINERVA_METRICS_FILE al terminar cada ejecución perfilada.
+Sin perfilar, section() y @timed solo consultan una variable por hilo.
+"""
+import builtins
+import functools
+import logging
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from prometheus_client import CollectorRegistry, Counter as PromCounter, Histogram, start_http_server, write_to_textfile
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+logger = logging.getLogger(__name__)
+
+PROFILE_ALL = os.environ.get("MINERVA_PROFILE", "") == "1"
+# Permite perfilar una sesión con ?profile=1
+PROFILE_PARAM = os.environ.get("MINERVA_PROFILE_PARAM", "") == "1"
+METRICS_PORT = os.environ.get("MINERVA_METRICS_PORT")
+METRICS_FILE = os.environ.get("MINERVA_METRICS_FILE", "metrics.prom")
+
+REGISTRY = CollectorRegistry()
+SECTION_SECONDS = Histogram(
+    "minerva_section_seconds", "Tiempo de cada sección de la ejecución", ["section"], registry=REGISTRY,
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+RERUN_SECONDS = Histogram(
+    "minerva_rerun_seconds", "Tiempo total de la ejecución de app.py", registry=REGISTRY,
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+RERUN_ELEMENTS = Histogram(
+    "minerva_rerun_elements", "Elementos enviados al navegador por ejecución", registry=REGISTRY,
+    buckets=(10, 25, 50, 100, 250, 500, 1000, 2500, 5000),
+)
+FS_CALLS = PromCounter("minerva_fs_calls", "Llamadas al sistema de archivos durante ejecuciones perfiladas", ["call"], registry=REGISTRY)
+
+
+class _ImageIndexCollector:
+    """Contadores del índice de imágenes; se leen al exportar, sin costo por búsqueda."""
+
+    def collect(self):
+        # Import diferido: minerva.images usa @timed de este módulo
+        from minerva.images import image_index_stats
+        stats = image_index_stats()
+        lookups = CounterMetricFamily("minerva_image_lookups", "Rutas de imagen resueltas por resultado", labels=["result"])
+        lookups.add_metric(["hit"], stats["hits"])
+        lookups.add_metric(["miss"], stats["misses"])
+        yield lookups
+        yield GaugeMetricFamily("minerva_image_index_size", "Imágenes en el índice", value=stats["indexed"])
+        yield GaugeMetricFamily("minerva_images_missing", "Imágenes del catálogo que no están en disco", value=len(stats["missing"]))
+
+
+REGISTRY.register(_ImageIndexCollector())
+
+_local = threading.local()
+_install_lock = threading.Lock()
+_installed = False
+
+
+class _Rerun:
+    __slots__ = ("start", "sections", "fs_calls", "elements")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.sections = defaultdict(float)
+        self.fs_calls = Counter()
+        self.elements = 0
+
+
+def _current():
+    return getattr(_local, "rerun", None)
+
+
+# --- Contadores (se instalan una sola vez por proceso) ---
+def _counting(call, fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        rerun = _current()
+        if rerun is not None:
+            rerun.fs_calls[call] += 1
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+def _patch_os(name):
+    original = getattr(os, name)
+    wrapper = _counting(name, original)
+    # os.path, shutil y pathlib consultan estos conjuntos con la función original
+    for supported in (os.supports_fd, os.supports_dir_fd, os.supports_follow_symlinks):
+        if original in supported:
+            supported.add(wrapper)
+    setattr(os, name, wrapper)
+
+
+def _patch_elements():
+    try:
+        from streamlit.delta_generator import DeltaGenerator
+        original = DeltaGenerator._enqueue
+    except (ImportError, AttributeError):
+        logger.warning("Esta versión de Streamlit no permite contar elementos; se omite esa métrica.")
+        return
+
+    @functools.wraps(original)
+    def _enqueue(self, *args, **kwargs):
+        rerun = _current()
+        if rerun is not None:
+            rerun.elements += 1
+        return original(self, *args, **kwargs)
+
+    DeltaGenerator._enqueue = _enqueue
+
+
+def install():
+    """Instala los contadores y, si corresponde, el endpoint /metrics."""
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        for name in ("stat", "scandir", "listdir"):
+            _patch_os(name)
+        builtins.open = _counting("open", builtins.open)
+        _patch_elements()
+        if METRICS_PORT:
+            try:
+                start_http_server(int(METRICS_PORT), registry=REGISTRY)
+            except OSError as e:
+                logger.error("No se pudo abrir el puerto de métricas %s: %s", METRICS_PORT, e)
+        _installed = True
+
+
+# --- Secciones ---
+@contextmanager
+def section(name):
+    """Mide el bloque como la sección `name` de la ejecución perfilada en curso."""
+    rerun = _current()
+    if rerun is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        rerun.sections[name] += elapsed
+        SECTION_SECONDS.labels(name).observe(elapsed)
+
+
+def timed(name):
+    """Decorador: cada llamada cuenta como la sección `name`."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _current() is None:
+                return fn(*args, **kwargs)
+            with section(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# --- Ejecuciones ---
+def begin_rerun(requested=False):
+    """
+    Empieza a perfilar la ejecución si MINERVA_PROFILE=1, o si se pidió
+    (`requested`) y MINERVA_PROFILE_PARAM=1. Si la ejecución anterior se
+    cortó (st.rerun, st.stop) sus secciones ya quedaron registradas y solo
+    se descarta el total.
+    """
+    if not (PROFILE_ALL or (requested and PROFILE_PARAM)):
+        _local.rerun = None
+        return False
+    install()
+    _local.rerun = _Rerun()
+    return True
+
+
+def end_rerun():
+    """Cierra la ejecución perfilada, exporta las métricas y devuelve un resumen (o None)."""
+    rerun = _current()
+    if rerun is None:
+        return None
+    _local.rerun = None
+    elapsed = time.perf_counter() - rerun.start
+    RERUN_SECONDS.observe(elapsed)
+    RERUN_ELEMENTS.observe(rerun.elements)
+    for call, count in rerun.fs_calls.items():
+        FS_CALLS.labels(call).inc(count)
+    if not METRICS_PORT:
+        try:
+            write_to_textfile(METRICS_FILE, REGISTRY)
+        except OSError as e:
+            logger.error("No se pudieron escribir las métricas en %s: %s", METRICS_FILE, e)
+
+    sections = " · ".join(f"{name} {seconds * 1000:.1f} ms"
+                          for name, seconds in sorted(rerun.sections.items(), key=lambda item: -item[1]))
+    summary = (f"Ejecución {elapsed * 1000:.1f} ms · {rerun.elements} elementos · "
+               f"{sum(rerun.fs_calls.values())} accesos a disco" + (f" — {sections}" if sections else ""))
+    logger.info(summary)
+    return summary
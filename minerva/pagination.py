@@ -0,0 +1,38 @@
+"""Paginación del lado del servidor para las grillas de productos."""
+import os
+from collections.abc import Sequence
+
+# Productos por página (múltiplo de 3 para completar las filas de la grilla)
+PAGE_SIZE = int(os.environ.get("MINERVA_PAGE_SIZE", "12"))
+
+
+def page_count(total, page_size=PAGE_SIZE):
+    """Cantidad de páginas para `total` elementos (al menos una)."""
+    return max(1, -(-total // page_size))
+
+
+def paginate(items, page, page_size=PAGE_SIZE):
+    """
+    Devuelve (elementos de la página, página, total de páginas). La página se
+    numera desde 1 y se ajusta al rango válido si el catálogo se achicó.
+    """
+    pages = page_count(len(items), page_size)
+    page = min(max(1, page), pages)
+    start = (page - 1) * page_size
+    return items[start:start + page_size], page, pages
+
+
+class Selection(Sequence):
+    """Vista de `items` en las posiciones dadas; solo se materializa la página que se muestra."""
+
+    def __init__(self, items, positions):
+        self.items = items
+        self.positions = positions
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.items[position] for position in self.positions[index]]
+        return self.items[self.positions[index]]
@@ -0,0 +1,138 @@
+"""
+Precios como enteros en centavos.
+
+En data.json los precios son texto libre ("$15.000", "8000", "$15.999,50").
+Se interpretan una vez por versión del catálogo y a partir de ahí los totales
+se calculan con enteros, sin volver a parsear cadenas en cada render.
+
+Para filtrar y ordenar, el catálogo se convierte (también una vez por versión)
+en un DataFrame columnar: los filtros por rango de precio, los ordenamientos
+y la elegibilidad de envío gratis son operaciones vectorizadas sobre
+columnas, no bucles por producto.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+from minerva.search import fold
+
+_NON_NUMERIC = re.compile(r"[^\d.,]")
+# Sin separadores al final: "mayores a $100.000." -> "$100.000"
+_PRICE_IN_TEXT = re.compile(r"\$\s?\d(?:[\d.,]*\d)?")
+_DECIMALS = re.compile(r"\d{1,2}")
+_DOT_DECIMAL = re.compile(r"\d*\.\d{1,2}")
+_THOUSANDS = re.compile(r"\d{1,3}(?:\.\d{3})+")
+
+# Umbral de envío gratis si el texto del banner no indica un monto
+DEFAULT_FREE_SHIPPING_CENTS = 100_000_00
+
+# Opciones de orden: etiqueta -> (columna, ascendente); None conserva el orden recibido
+SORT_OPTIONS = {
+    "Destacados": None,
+    "Precio: menor a mayor": ("precio", True),
+    "Precio: mayor a menor": ("precio", False),
+    "Nombre (A-Z)": ("nombre", True),
+    "Más vendidos": ("ventas", False),
+}
+
+
+def parse_price(text):
+    """
+    Convierte un precio en formato argentino a centavos ("$15.000" -> 1500000).
+    El punto es separador de miles y la coma de decimales; un único punto
+    seguido de 1 o 2 dígitos se toma como decimal ("15.5"). Devuelve None si
+    no hay un número, si es negativo o si los separadores son ambiguos
+    ("1,234.56", "1,234"): no se adivina el formato.
+    """
+    if isinstance(text, (int, float)):
+        return int(round(text * 100)) if text >= 0 else None
+    text = text or ""
+    cleaned = _NON_NUMERIC.sub("", text)
+    if "-" in text or not any(ch.isdigit() for ch in cleaned):
+        return None
+    integer, comma, decimals = cleaned.partition(",")
+    if comma:
+        # Coma decimal: uno o dos dígitos y ningún separador después
+        if not _DECIMALS.fullmatch(decimals):
+            return None
+    elif _DOT_DECIMAL.fullmatch(cleaned):
+        integer, _, decimals = cleaned.partition(".")
+    # Parte entera: solo dígitos o miles separados con punto ("15.000")
+    if "." in integer and not _THOUSANDS.fullmatch(integer):
+        return None
+    return int(integer.replace(".", "") or 0) * 100 + int((decimals + "00")[:2])
+
+
+def format_price(cents):
+    """Formatea centavos como "$15.000" (o "$15.999,50" si hay decimales; "-$2,50" si es negativo)."""
+    sign = "-" if cents < 0 else ""
+    integer, decimals = divmod(abs(cents), 100)
+    text = f"{sign}${integer:,}".replace(",", ".")
+    return f"{text},{decimals:02d}" if decimals else text
+
+
+def get_price_index(catalog):
+    """Diccionario id -> precio en centavos (None si el precio no es numérico)."""
+    return catalog.derive("price_index", lambda snapshot: {
+        product.id: product.precio_centavos for product in snapshot.products
+    })
+
+
+def free_shipping_threshold(data):
+    """Monto (centavos) del envío gratis prometido en cta_texts.banner_text ("... mayores a $100.000")."""
+    match = _PRICE_IN_TEXT.search(data.get("cta_texts", {}).get("banner_text", ""))
+    threshold = parse_price(match.group()) if match else None
+    return DEFAULT_FREE_SHIPPING_CENTS if threshold is None else threshold
+
+
+def build_price_frame(products, threshold=DEFAULT_FREE_SHIPPING_CENTS):
+    """DataFrame con una fila por producto (schema.Product), indexado por su posición en el catálogo."""
+    frame = pd.DataFrame({
+        "id": [product.id for product in products],
+        "nombre": [fold(product.nombre) for product in products],
+        "precio": pd.array([product.precio_centavos for product in products], dtype="Int64"),
+        "ventas": np.fromiter((product.ventas for product in products), dtype=np.int64, count=len(products)),
+    })
+    frame["envio_gratis"] = frame["precio"].ge(threshold).fillna(False).astype(bool)
+    return frame
+
+
+def get_price_frame(catalog):
+    """DataFrame de precios del snapshot (se arma una vez por versión)."""
+    return catalog.derive("price_frame", lambda snapshot: build_price_frame(
+        snapshot.products, free_shipping_threshold(snapshot.data)))
+
+
+def price_bounds(frame):
+    """(mínimo, máximo) en centavos de los precios numéricos, o None si no hay."""
+    prices = frame["precio"].dropna()
+    if prices.empty:
+        return None
+    return int(prices.min()), int(prices.max())
+
+
+def select_positions(frame, positions=None, min_price=None, max_price=None, sort=None):
+    """
+    Posiciones de los productos que cumplen el rango de precio, ordenadas
+    según `sort` (clave de SORT_OPTIONS). `positions` restringe la selección
+    (p. ej. a resultados de búsqueda) y define el orden cuando no se ordena.
+    """
+    selected = frame if positions is None else frame.iloc[np.asarray(positions, dtype=np.intp)]
+    mask = np.ones(len(selected), dtype=bool)
+    if min_price is not None:
+        mask &= selected["precio"].ge(min_price).fillna(False).to_numpy(dtype=bool)
+    if max_price is not None:
+        mask &= selected["precio"].le(max_price).fillna(False).to_numpy(dtype=bool)
+    selected = selected[mask]
+    order = SORT_OPTIONS.get(sort)
+    if order is not None:
+        column, ascending = order
+        selected = selected.sort_values(column, ascending=ascending, kind="stable", na_position="last")
+    return selected.index.to_numpy()
+
+
+def get_free_shipping_ids(catalog):
+    """Ids de los productos que por sí solos alcanzan el envío gratis."""
+    return catalog.derive("free_shipping_ids", lambda snapshot: frozenset(
+        get_price_frame(snapshot).loc[lambda frame: frame["envio_gratis"], "id"]))
@@ -0,0 +1,25 @@
+"""
+Ranking de "Más Vendidos".
+
+Los `k` productos con más ventas (campo `ventas`) se eligen con
+heapq.nlargest, O(n log k), una vez por versión del catálogo: cada visita
+reutiliza el resultado en lugar de ordenar todo el catálogo. No hay
+actualización incremental: cualquier cambio en el catálogo (por ejemplo, una
+importación masiva que actualiza `ventas`) es una versión nueva y el ranking
+se vuelve a calcular entero.
+"""
+import heapq
+import os
+
+BEST_SELLERS_COUNT = int(os.environ.get("MINERVA_BEST_SELLERS", "3"))
+
+
+def _best_sellers(products, k):
+    # Desempate: el orden del catálogo
+    ranked = heapq.nlargest(k, enumerate(products), key=lambda entry: (entry[1].ventas, -entry[0]))
+    return tuple(product for _, product in ranked)
+
+
+def top_products(catalog, k=BEST_SELLERS_COUNT):
+    """Los `k` productos más vendidos de un snapshot del catálogo (se calcula una vez por versión)."""
+    return catalog.derive(("best_sellers", k), lambda snapshot: _best_sellers(snapshot.products, k))
@@ -0,0 +1,103 @@
+"""
+Validación y normalización de productos.
+
+Cada versión del catálogo se valida una sola vez contra PRODUCT_SCHEMA
+(jsonschema). Los productos válidos se convierten en instancias de Product
+con los valores por defecto ya aplicados, de modo que la tienda usa
+`product.precio` en lugar de repetir `product.get("precio", ...)` en cada
+render. Los registros inválidos se excluyen de la tienda y se informan en el
+panel de administración.
+"""
+from dataclasses import dataclass
+
+from jsonschema import Draft7Validator
+
+from minerva.pricing import parse_price
+
+PRODUCT_SCHEMA = {
+    "type": "object",
+    "required": ["id", "nombre"],
+    "properties": {
+        "id": {"type": ["string", "integer"], "minLength": 1},
+        "nombre": {"type": "string", "minLength": 1},
+        "descripcion": {"type": "string"},
+        "detalles": {"type": "string"},
+        "precio": {"type": ["string", "number", "null"]},
+        "imagen": {"type": ["string", "null"]},
+        "categoria": {"type": ["string", "null"]},
+        "ventas": {"type": ["integer", "string"]},
+    },
+}
+
+_validator = Draft7Validator(PRODUCT_SCHEMA)
+
+DEFAULT_DETALLES = "Detalles no disponibles."
+DEFAULT_PRECIO = "Precio no disponible"
+
+
+@dataclass(frozen=True, slots=True)
+class Product:
+    """Producto normalizado, con los textos por defecto de la tienda ya aplicados."""
+
+    id: str
+    nombre: str
+    descripcion: str = ""
+    detalles: str = DEFAULT_DETALLES
+    precio: str = DEFAULT_PRECIO
+    precio_centavos: int | None = None
+    imagen: str = ""
+    categoria: str = ""
+    ventas: int = 0
+
+
+def sales_count(product):
+    """Ventas de un producto como entero (0 si falta o no es numérico)."""
+    try:
+        return int(product.get("ventas", 0) or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def normalize_product(raw):
+    """Convierte un producto de data.json (ya validado) en Product."""
+    precio = raw.get("precio")
+    return Product(
+        id=str(raw["id"]),
+        nombre=raw["nombre"],
+        descripcion=raw.get("descripcion") or "",
+        detalles=raw.get("detalles") or DEFAULT_DETALLES,
+        precio=str(precio) if precio not in (None, "") else DEFAULT_PRECIO,
+        precio_centavos=parse_price(precio),
+        imagen=raw.get("imagen") or "",
+        categoria=raw.get("categoria") or "",
+        ventas=sales_count(raw),
+    )
+
+
+def validate_products(raw_products):
+    """
+    Devuelve (productos válidos como tupla de Product, errores). Cada error
+    es un dict con la posición, el id y el nombre (si existen) y el motivo.
+    """
+    products = []
+    errors = []
+    seen_ids = set()
+    for position, raw in enumerate(raw_products):
+        instance = dict(raw) if hasattr(raw, "keys") else raw
+        messages = [
+            f"{'/'.join(str(part) for part in error.path) or 'producto'}: {error.message}"
+            for error in _validator.iter_errors(instance)
+        ]
+        if not messages and str(raw["id"]) in seen_ids:
+            messages.append(f"id: '{raw['id']}' está repetido")
+        if messages:
+            errors.append({
+                "posicion": position + 1,
+                "id": instance.get("id") if isinstance(instance, dict) else None,
+                "nombre": instance.get("nombre") if isinstance(instance, dict) else None,
+                "errores": "; ".join(messages),
+            })
+            continue
+        seen_ids.add(str(raw["id"]))
+        products.append(normalize_product(raw))
+    return tuple(products), errors
@@ -0,0 +1,215 @@
+"""
+Búsqueda de productos con un índice invertido.
+
+El índice se construye una vez por versión del catálogo: cada palabra de
+"nombre" y "descripcion" se normaliza (minúsculas, sin tildes) y apunta a los
+productos que la contienen junto con un puntaje según el campo. Una consulta
+solo recorre las listas de las palabras que coinciden por prefijo, en lugar
+de todo el catálogo.
+
+Para la búsqueda mientras se escribe, los resultados recientes se guardan en
+una caché LRU compartida por todas las sesiones (versión del catálogo +
+consulta normalizada). Si la consulta nueva solo agrega letras o palabras a
+una anterior, se filtran los resultados anteriores en lugar del índice.
+"""
+import heapq
+import itertools
+import os
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+
+from cachetools import LRUCache
+
+# Peso de cada campo en el ranking de resultados
+FIELD_WEIGHTS = {
+    "nombre": 3.0,
+    "descripcion": 1.0,
+}
+
+# Consultas recientes guardadas en la caché compartida
+SEARCH_CACHE_SIZE = int(os.environ.get("MINERVA_SEARCH_CACHE_SIZE", "256"))
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def fold(text):
+    """Pasa a minúsculas y quita tildes ("Peluquería" -> "peluqueria")."""
+    if text.isascii():
+        return text.lower()
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text):
+    """Divide un texto en palabras normalizadas."""
+    return _TOKEN_RE.findall(fold(text or ""))
+
+
+class SearchIndex:
+    """Índice invertido palabra -> {posición del producto: puntaje}."""
+
+    def __init__(self, products, field_weights=FIELD_WEIGHTS):
+        self.products = tuple(products)
+        postings = {}
+        for position, product in enumerate(self.products):
+            for field, weight in field_weights.items():
+                for token in tokenize(getattr(product, field)):
+                    scores = postings.setdefault(token, {})
+                    scores[position] = scores.get(position, 0.0) + weight
+        self._postings = postings
+        # Vocabulario ordenado para resolver prefijos con búsqueda binaria
+        self._vocabulary = sorted(postings)
+        # Entradas acumuladas por palabra del vocabulario: estima en O(log n)
+        # cuántas entradas recorre un prefijo
+        self._cumulative = [0, *itertools.accumulate(len(postings[token]) for token in self._vocabulary)]
+        # Índice directo posición -> ((palabra, puntaje), ...) para filtrar candidatos
+        forward = [[] for _ in self.products]
+        for token, scores in postings.items():
+            for position, score in scores.items():
+                forward[position].append((token, score))
+        self._forward = [tuple(tokens) for tokens in forward]
+        self._tokens_per_product = sum(map(len, forward)) / len(forward) if forward else 0.0
+
+    def prefix_volume(self, terms):
+        """Entradas del índice que hay que recorrer para resolver `terms`."""
+        vocabulary = self._vocabulary
+        volume = 0
+        for term in terms:
+            start = bisect_left(vocabulary, term)
+            end = bisect_left(vocabulary, term + "\U0010ffff", start)
+            volume += self._cumulative[end] - self._cumulative[start]
+        return volume
+
+    def prefers_candidates(self, terms, candidates):
+        """True si filtrar `candidates` es más barato que resolver `terms` en el índice."""
+        return len(candidates) * len(terms) * self._tokens_per_product < self.prefix_volume(terms)
+
+    def _prefix_scores(self, prefix):
+        """Puntajes de todos los productos con alguna palabra que empiece con `prefix`."""
+        vocabulary = self._vocabulary
+        start = bisect_left(vocabulary, prefix)
+        if start < len(vocabulary) and vocabulary[start] == prefix and (
+                start + 1 == len(vocabulary) or not vocabulary[start + 1].startswith(prefix)):
+            # Caso frecuente: palabra completa sin otras que la extiendan
+            return self._postings[prefix]
+        scores = {}
+        for token in vocabulary[start:]:
+            if not token.startswith(prefix):
+                break
+            for position, score in self._postings[token].items():
+                # Una coincidencia exacta pesa más que una por prefijo
+                if token != prefix:
+                    score *= 0.5
+                if score > scores.get(position, 0.0):
+                    scores[position] = score
+        return scores
+
+    def _candidate_scores(self, terms, candidates):
+        """Mismos puntajes que _prefix_scores, pero recorriendo solo `candidates`."""
+        totals = {}
+        for position in candidates:
+            tokens = self._forward[position]
+            total = 0.0
+            for term in terms:
+                best = 0.0
+                for token, score in tokens:
+                    if token.startswith(term):
+                        if token != term:
+                            score *= 0.5
+                        if score > best:
+                            best = score
+                if not best:
+                    break
+                total += best
+            else:
+                totals[position] = total
+        return totals
+
+    def search_positions(self, query, limit=None, candidates=None):
+        """
+        Posiciones de los productos que contienen todas las palabras de la
+        consulta (por prefijo), ordenadas por relevancia. Con `limit` solo se
+        ordenan los mejores resultados. Con `candidates` (posiciones) solo se
+        consideran esos productos.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+        if candidates is not None:
+            totals = self._candidate_scores(terms, candidates)
+            return self._rank(totals, limit)
+        per_term = sorted((self._prefix_scores(term) for term in terms), key=len)
+        if not per_term[0]:
+            return []
+        totals = dict(per_term[0])
+        for scores in per_term[1:]:
+            totals = {position: total + scores[position] for position, total in totals.items() if position in scores}
+            if not totals:
+                return []
+        return self._rank(totals, limit)
+
+    @staticmethod
+    def _rank(totals, limit):
+        rank = lambda position: (-totals[position], position)  # noqa: E731
+        if limit is not None:
+            return heapq.nsmallest(limit, totals, key=rank)
+        return sorted(totals, key=rank)
+
+    def search(self, query, limit=None):
+        """Productos que coinciden con la consulta, del más al menos relevante."""
+        return [self.products[position] for position in self.search_positions(query, limit)]
+
+
+def get_search_index(catalog):
+    """Índice de búsqueda de un snapshot del catálogo (se construye una sola vez por versión)."""
+    return catalog.derive("search_index", lambda snapshot: SearchIndex(snapshot.products))
+
+
+def search_products(catalog, query, limit=None):
+    """Atajo para buscar productos en el catálogo vigente."""
+    return get_search_index(catalog).search(query, limit)
+
+
+# --- Búsqueda mientras se escribe ---
+_recent = LRUCache(maxsize=SEARCH_CACHE_SIZE)
+_recent_lock = threading.Lock()
+
+
+def narrows(terms, previous_terms):
+    """
+    True si todo producto que coincide con `terms` coincide también con
+    `previous_terms` (cada palabra anterior es prefijo de alguna nueva).
+    """
+    return bool(previous_terms) and all(
+        any(term.startswith(previous) for term in terms) for previous in previous_terms
+    )
+
+
+def search_as_you_type(catalog, query, previous_query=None):
+    """
+    Posiciones ordenadas para `query`, reutilizando la caché compartida. Si
+    `previous_query` (lo que la sesión buscó antes) está en caché y la
+    consulta nueva lo estrecha, solo se filtran sus resultados.
+    """
+    terms = tuple(tokenize(query))
+    if not terms:
+        return ()
+    key = (catalog.version, terms)
+    with _recent_lock:
+        cached = _recent.get(key)
+        if cached is not None:
+            return cached
+        previous_terms = tuple(tokenize(previous_query or ""))
+        candidates = _recent.get((catalog.version, previous_terms)) if narrows(terms, previous_terms) else None
+    index = get_search_index(catalog)
+    # Filtrar los resultados anteriores conviene cuando ya son pocos; con
+    # prefijos cortos el índice invertido sigue siendo más rápido
+    if candidates is not None and index.prefers_candidates(terms, candidates):
+        positions = tuple(index.search_positions(query, candidates=candidates))
+    else:
+        positions = tuple(index.search_positions(query))
+    with _recent_lock:
+        _recent[key] = positions
+    return positions
@@ -0,0 +1,254 @@
+"""
+Almacenamiento del catálogo en SQLite (opcional, MINERVA_STORAGE=sqlite).
+
+Ofrece la misma interfaz que JsonStore (fingerprint/read/write), así que
+load_data y save_data funcionan igual en app.py y admin_app.py. Los productos
+van en una tabla propia, una fila por producto, para que editar uno no
+reescriba el resto; las demás colecciones se guardan como JSON, una fila por
+clave. La base usa WAL para que la tienda pueda leer mientras el panel de
+administración escribe.
+
+La tabla de productos solo se indexa por id y posición: las búsquedas por
+categoría y los más vendidos usan los índices en memoria que se arman una vez
+por versión del catálogo (minerva.catalog y minerva.rankings), y el panel
+busca por id en su borrador, que vive en memoria.
+
+Migración única desde los archivos JSON:
+
+    python -m minerva.sqlite_store migrate --db minerva.db
+"""
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import uuid
+
+from minerva.storage import DATA_FILE, SQLITE_FILE, JsonStore, StoreError, apply_ops, diff_documents
+
+LEGACY_FILE = os.path.join("data_minerva", "contenido.json")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS collections (
+    key TEXT PRIMARY KEY,
+    doc TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS products (
+    id TEXT PRIMARY KEY,
+    position REAL NOT NULL,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_products_position ON products(position);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('version', '0');
+"""
+
+
+def _check_products(products):
+    """La tabla usa el id como clave: se rechazan productos sin id o con id repetido."""
+    seen = set()
+    for position, product in enumerate(products):
+        if not isinstance(product, dict) or product.get("id") in (None, ""):
+            name = product.get("nombre", "") if isinstance(product, dict) else ""
+            raise StoreError(f"El producto en la posición {position + 1} ({name or 'sin nombre'}) no tiene id.")
+        product_id = str(product["id"])
+        if product_id in seen:
+            raise StoreError(f"Hay más de un producto con el id {product_id}.")
+        seen.add(product_id)
+
+
+def _product_row(product, position):
+    return (str(product["id"]), position, json.dumps(product, ensure_ascii=False))
+
+
+class SqliteStore:
+    """Catálogo en una base SQLite con una conexión por hilo."""
+
+    def __init__(self, path=SQLITE_FILE):
+        self.path = path
+        self._local = threading.local()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def _version(self):
+        return self._conn().execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+
+    def fingerprint(self):
+        """Número de versión de la base (None si todavía no existe)."""
+        if not os.path.exists(self.path):
+            return None
+        return self._version()
+
+    def watched_files(self):
+        """Archivos cuyo cambio implica una versión nueva del catálogo."""
+        return (self.path, self.path + "-wal")
+
+    def read(self, known_version=None):
+        """Devuelve (documento, versión); el documento es None si la versión no cambió."""
+        conn = self._conn()
+        conn.execute("BEGIN")
+        try:
+            version = self._version()
+            if version == known_version:
+                return None, version
+            doc = {"products": [json.loads(row[0]) for row in conn.execute("SELECT doc FROM products ORDER BY position")]}
+            for key, value in conn.execute("SELECT key, doc FROM collections"):
+                doc[key] = json.loads(value)
+            return doc, version
+        finally:
+            conn.execute("COMMIT")
+
+    def write(self, doc, base=None, ops=None):
+        """
+        Persiste `doc` en una transacción; con `ops` (o `base`, para
+        calcularlas) solo se tocan las filas que cambiaron. Lanza StoreError
+        (un OSError, como los errores de JsonStore) si la base rechaza el
+        documento.
+        """
+        if ops is None and base is not None:
+            ops = diff_documents(base, doc)
+        conn = self._conn()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+        except sqlite3.Error as e:
+            raise StoreError(f"No se pudo escribir en {self.path}: {e}") from e
+        try:
+            if ops is None:
+                self._replace_all(conn, doc)
+            else:
+                for op in ops:
+                    self._apply(conn, op)
+            conn.execute("UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'version'")
+        except BaseException as e:
+            conn.execute("ROLLBACK")
+            if isinstance(e, sqlite3.Error):
+                raise StoreError(f"No se pudo escribir en {self.path}: {e}") from e
+            raise
+        conn.execute("COMMIT")
+
+    def _replace_all(self, conn, doc):
+        conn.execute("DELETE FROM collections")
+        self._set_products(conn, doc.get("products", []))
+        conn.executemany(
+            "INSERT INTO collections (key, doc) VALUES (?, ?)",
+            [(key, json.dumps(value, ensure_ascii=False)) for key, value in doc.items() if key != "products"],
+        )
+
+    def _set_products(self, conn, products):
+        _check_products(products)
+        conn.execute("DELETE FROM products")
+        conn.executemany(
+            "INSERT INTO products (id, position, doc) VALUES (?, ?, ?)",
+            [_product_row(product, position) for position, product in enumerate(products)],
+        )
+
+    def _apply(self, conn, op):
+        kind, key = op["op"], op["key"]
+        if key == "products":
+            if kind == "set":
+                self._set_products(conn, op["value"])
+            elif kind == "drop":
+                conn.execute("DELETE FROM products")
+            elif kind == "delete":
+                conn.execute("DELETE FROM products WHERE id = ?", (str(op["id"]),))
+            elif kind == "upsert":
+                row = conn.execute("SELECT position FROM products WHERE id = ?", (str(op["item"]["id"]),)).fetchone()
+                if row is None:
+                    row = conn.execute("SELECT COALESCE(MAX(position), -1) + 1 FROM products").fetchone()
+                conn.execute(
+                    "INSERT OR REPLACE INTO products (id, position, doc) VALUES (?, ?, ?)",
+                    _product_row(op["item"], row[0]),
+                )
+            return
+        if kind == "drop":
+            conn.execute("DELETE FROM collections WHERE key = ?", (key,))
+            return
+        if kind == "set":
+            value = op["value"]
+        else:
+            # Operaciones por id sobre colecciones guardadas como JSON (banners, novedades)
+            row = conn.execute("SELECT doc FROM collections WHERE key = ?", (key,)).fetchone()
+            current = {key: json.loads(row[0]) if row else []}
+            value = apply_ops(current, [op])[key]
+        conn.execute("INSERT OR REPLACE INTO collections (key, doc) VALUES (?, ?)", (key, json.dumps(value, ensure_ascii=False)))
+
+
+# --- Migración desde JSON ---
+def _legacy_id(kind, value):
+    # Ids deterministas: migrar dos veces no duplica registros
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"minerva:{kind}:{value}"))
+
+
+def merge_legacy_content(doc, legacy):
+    """Incorpora data_minerva/contenido.json (formato anterior) sin pisar datos de data.json."""
+    normalize = lambda path: (path or "").replace("\\", "/")  # noqa: E731
+    names = {product.get("nombre", "").strip().lower() for product in doc.setdefault("products", [])}
+    for product in legacy.get("productos", []):
+        if product.get("nombre", "").strip().lower() in names:
+            continue
+        doc["products"].append({
+            "id": _legacy_id("producto", product.get("nombre", "")),
+            "nombre": product.get("nombre", ""),
+            "descripcion": product.get("descripcion", ""),
+            "detalles": product.get("descripcion", ""),
+            "precio": product.get("precio", ""),
+            "imagen": normalize(product.get("imagen")),
+        })
+    banner_images = {banner.get("img") for banner in doc.setdefault("banners", [])}
+    for slide in legacy.get("slider", []):
+        img = normalize(slide.get("imagen"))
+        if img in banner_images:
+            continue
+        doc["banners"].append({"id": _legacy_id("banner", img), "img": img, "titulo": slide.get("titulo", ""), "descripcion": slide.get("descripcion", "")})
+    if legacy.get("beneficios") and "benefits" not in doc:
+        doc["benefits"] = list(legacy["beneficios"])
+    if legacy.get("logo"):
+        doc.setdefault("general_settings", {}).setdefault("logo", normalize(legacy["logo"]))
+    return doc
+
+
+def migrate(db_path=SQLITE_FILE, data_path=DATA_FILE, legacy_path=LEGACY_FILE, force=False):
+    """Carga data.json (con su journal) y contenido.json en una base SQLite nueva."""
+    store = SqliteStore(db_path)
+    if store.read()[0]["products"] and not force:
+        raise SystemExit(f"{db_path} ya tiene productos; usa --force para reemplazarlos.")
+    doc = {}
+    if os.path.exists(data_path):
+        doc, _ = JsonStore(data_path).read()
+    if legacy_path and os.path.exists(legacy_path):
+        with open(legacy_path, encoding="utf-8") as f:
+            merge_legacy_content(doc, json.load(f))
+    try:
+        store.write(doc)
+    except StoreError as e:
+        raise SystemExit(f"No se pudo migrar a {db_path}: {e}") from e
+    return doc
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Herramientas del almacenamiento SQLite.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    migrate_parser = sub.add_parser("migrate", help="Importa data.json y contenido.json a SQLite")
+    migrate_parser.add_argument("--db", default=SQLITE_FILE)
+    migrate_parser.add_argument("--data", default=DATA_FILE)
+    migrate_parser.add_argument("--legacy", default=LEGACY_FILE)
+    migrate_parser.add_argument("--force", action="store_true")
+    args = parser.parse_args()
+    doc = migrate(args.db, args.data, args.legacy, args.force)
+    print(f"Migrados {len(doc.get('products', []))} productos y {len(doc) - 1} colecciones a {args.db}.")
+    print("Activa el backend con MINERVA_STORAGE=sqlite.")
+
+
+if __name__ == "__main__":
+    main()
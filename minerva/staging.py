@@ -0,0 +1,141 @@
+"""
+Borrador de cambios del panel de administración.
+
+Cada ▲/▼, cada eliminación y cada formulario del panel guardaba data.json y
+volvía a ejecutar el script. Ahora los cambios de todas las secciones se
+acumulan en un ChangeSet (uno por sesión, en st.session_state), se revisan
+como diferencias contra lo publicado y se publican juntos con un solo
+save_data.
+
+Si otro administrador publicó mientras tanto, las operaciones del borrador
+(las mismas de storage.diff_documents) se aplican sobre el catálogo actual:
+las ediciones de elementos con id se combinan; las listas y textos
+reemplazados completos quedan como en el borrador.
+"""
+import copy
+import difflib
+import json
+
+from minerva.storage import apply_ops, diff_documents
+
+# Nombre de cada colección de data.json en la vista previa
+SECTION_LABELS = {
+    "products": "Productos",
+    "banners": "Banners",
+    "testimonials": "Testimonios",
+    "home_texts": "Textos de la Página de Inicio",
+    "nav_menu": "Menú de Navegación",
+    "news": "Novedades",
+    "contact_info": "Información de Contacto",
+    "about_us": "Sobre Nosotros",
+    "faqs": "Preguntas Frecuentes",
+    "cta_texts": "Textos de CTA",
+}
+
+_ACTIONS = {"set": "Reemplazado", "drop": "Eliminado", "delete": "Elemento eliminado", "upsert": "Elemento agregado o editado"}
+
+
+def _json_lines(value):
+    if value is None:
+        return []
+    return json.dumps(value, indent=2, ensure_ascii=False, sort_keys=True).splitlines()
+
+
+def _item_title(item):
+    for field in ("nombre", "titulo", "q", "name", "img"):
+        if item.get(field):
+            return str(item[field])
+    return str(item.get("id", ""))
+
+
+def describe_changes(old, new, diff_limit=None, ops=None):
+    """
+    Una fila (sección, cambio, elemento, diff) por operación entre dos
+    documentos. El diff solo se calcula para las primeras `diff_limit` filas
+    (las demás llevan None); `ops` evita recalcular diff_documents.
+    """
+    if ops is None:
+        ops = diff_documents(old, new)
+    # id -> elemento anterior, una vez por colección
+    previous_by_id = {}
+    rows = []
+    for op in ops:
+        key = op["key"]
+        previous_value = old.get(key)
+        if op["op"] in ("upsert", "delete"):
+            if key not in previous_by_id:
+                previous_by_id[key] = {item.get("id"): item for item in previous_value or ()}
+            item_id = op["item"]["id"] if op["op"] == "upsert" else op["id"]
+            previous = previous_by_id[key].get(item_id)
+        if op["op"] == "upsert":
+            title, before, after = _item_title(op["item"]), previous, op["item"]
+        elif op["op"] == "delete":
+            title, before, after = _item_title(previous or {"id": op["id"]}), previous, None
+        else:
+            title, before, after = "", previous_value, op.get("value")
+        diff = None
+        if diff_limit is None or len(rows) < diff_limit:
+            diff = "\n".join(difflib.unified_diff(_json_lines(before), _json_lines(after),
+                                                  "anterior", "nuevo", lineterm="", n=2))
+        rows.append({
+            "seccion": SECTION_LABELS.get(key, key),
+            "cambio": _ACTIONS[op["op"]],
+            "elemento": title,
+            "diff": diff,
+        })
+    return rows
+
+
+class ChangeSet:
+    """Documento publicado (`base`) y copia editable (`draft`) de una sesión."""
+
+    def __init__(self, doc, version=None):
+        self.draft = doc
+        self.base = copy.deepcopy(doc)
+        # Versión del catálogo en disco de la que se partió
+        self.version = version
+        # Aumenta con cada stage(); las operaciones se recalculan solo entonces
+        self.revision = 0
+        self._ops = None
+
+    def stage(self):
+        """Avisa que el borrador cambió (después de editarlo)."""
+        self.revision += 1
+        self._ops = None
+
+    def pending(self):
+        return bool(self.ops())
+
+    def ops(self):
+        """Operaciones que llevan de lo publicado al borrador (en caché hasta el próximo stage())."""
+        if self._ops is None:
+            self._ops = diff_documents(self.base, self.draft)
+        return self._ops
+
+    def describe(self, diff_limit=None):
+        """Cambios pendientes para la vista previa (ver describe_changes)."""
+        return describe_changes(self.base, self.draft, diff_limit, self.ops())
+
+    def discard(self):
+        self.draft = copy.deepcopy(self.base)
+        self.stage()
+
+    def commit(self, current, save):
+        """
+        Publica el borrador con una sola llamada a `save(doc, ops)`. `current`
+        es el catálogo en disco: si cambió desde que se empezó el borrador, las
+        operaciones se aplican sobre él. `doc` no se vuelve a modificar (pasa a
+        ser `base`). Devuelve el error de `save` o None.
+        """
+        ops = self.ops()
+        if current == self.base:
+            doc = self.draft
+        else:
+            doc = apply_ops(copy.deepcopy(current), ops)
+        error = save(doc, ops)
+        if error is None:
+            self.base = doc
+            self.draft = copy.deepcopy(doc)
+            self.version = None
+            self.stage()
+        return error
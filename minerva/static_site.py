@@ -0,0 +1,321 @@
+"""
+Exportación de la tienda como sitio estático.
+
+La grilla del catálogo, las categorías, las fichas de producto, las novedades,
+"Sobre Nosotros" y los datos de contacto son iguales para todos los
+visitantes. Este comando los pre-renderiza desde data.json como HTML plano
+(plantillas Jinja2 en minerva/templates, con el mismo style.css minificado,
+las fuentes locales y los derivados de imagen ya optimizados) para servirlos
+desde disco o un CDN. La
+búsqueda y el carrito enlazan a la app de Streamlit (--app-url).
+
+La regeneración es incremental: .manifest.json guarda, por página, el hash
+de los datos con los que se generó. Solo se reescriben las páginas cuyos
+registros cambiaron (o todas si cambian las plantillas, el menú o el pie), y
+se borran las páginas e imágenes que ya no corresponden a ningún registro.
+
+Uso (desde la raíz del proyecto):
+    python -m minerva.static_site --out sitio --app-url https://tienda.example.com/
+"""
+import argparse
+import dataclasses
+import hashlib
+import json
+import os
+import re
+import shutil
+from collections.abc import Mapping
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+from minerva.assets import file_hash, font_faces, minify_css
+from minerva.catalog import CATEGORIES, CatalogCache, get_category_positions
+from minerva.fragments import render_fragment
+from minerva.images import PLACEHOLDER_IMAGE, get_image_path, get_variant
+from minerva.pagination import PAGE_SIZE, page_count
+from minerva.pricing import get_free_shipping_ids
+from minerva.rankings import top_products
+from minerva.search import fold
+from minerva.storage import atomic_write, open_store
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+MANIFEST_FILE = ".manifest.json"
+IMAGES_DIR = "imagenes"
+FONTS_DIR = "fonts"
+STYLE_FILE = "style.css"
+SITE_TITLE = "Finisima Productos Capilares"
+# App de Streamlit a la que enlazan la búsqueda, el carrito y "Comprar"
+APP_URL = os.environ.get("MINERVA_APP_URL", "/")
+
+# Páginas del menú que tienen versión estática (además de las categorías)
+STATIC_PAGES = {
+    "Inicio": "index.html",
+    "Novedades": "novedades.html",
+    "Contacto": "contacto.html",
+    "Sobre Nosotros": "sobre-nosotros.html",
+}
+
+
+def slugify(text):
+    """Nombre de archivo seguro ("Peluquería" -> "peluqueria")."""
+    return re.sub(r"[^a-z0-9]+", "-", fold(str(text))).strip("-") or "item"
+
+
+def _plain(value):
+    # Los snapshots usan MappingProxyType y schema.Product; el hash necesita JSON
+    if isinstance(value, Mapping):
+        return dict(value)
+    return dataclasses.asdict(value)
+
+
+def _digest(value):
+    text = json.dumps(value, sort_keys=True, ensure_ascii=False, default=_plain)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _asset_url(path, root):
+    """Filtro de plantillas: rutas del sitio relativas a la página, URLs externas tal cual."""
+    if path.startswith(("http://", "https://", "data:", "/")):
+        return path
+    return root + path
+
+
+def _file_digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+class SiteExporter:
+    """Genera las páginas de un snapshot del catálogo en `out_dir`."""
+
+    def __init__(self, catalog, out_dir, app_url=APP_URL, force=False):
+        self.catalog = catalog
+        self.out_dir = out_dir
+        self.app_url = app_url
+        self.force = force
+        self.env = Environment(loader=FileSystemLoader(TEMPLATES_DIR), autoescape=select_autoescape(["html"]))
+        self.env.filters["asset"] = _asset_url
+        self.previous = self._read_manifest()
+        self.pages = {}
+        self.written = 0
+        self.unchanged = 0
+        self._assets = set()
+        self.free_shipping_ids = get_free_shipping_ids(catalog)
+
+        data = catalog.data
+        nav = [{"label": label, "href": self._nav_href(label)} for label in ["Inicio", *data.get("nav_menu", ())]]
+        nav = [item for i, item in enumerate(nav) if item["href"] and item not in nav[:i]]
+        self.common = {
+            "site_title": SITE_TITLE,
+            "app_url": app_url,
+            "nav": nav,
+            "top_banner": render_fragment(catalog, "top_banner"),
+            "footer": render_fragment(catalog, "footer"),
+            "logo": self.image("images/logo.png", "logo"),
+            "style": self.bundle_style(),
+        }
+        self._common_assets = set(self._assets)
+        templates = sorted(os.listdir(TEMPLATES_DIR))
+        # Lo que aparece en todas las páginas: si cambia, se regenera todo
+        self._chrome = _digest({
+            "common": {key: value for key, value in self.common.items()},
+            "templates": {name: _file_digest(os.path.join(TEMPLATES_DIR, name)) for name in templates},
+        })
+
+    @staticmethod
+    def _nav_href(label):
+        if label in STATIC_PAGES:
+            return STATIC_PAGES[label]
+        if label in CATEGORIES:
+            return f"categoria/{slugify(label)}/1.html"
+        return None
+
+    def _read_manifest(self):
+        try:
+            with open(os.path.join(self.out_dir, MANIFEST_FILE), encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {"pages": {}, "assets": []}
+        manifest.setdefault("pages", {})
+        manifest.setdefault("assets", [])
+        return manifest
+
+    # --- Recursos ---
+    def image(self, image_path, slot):
+        """Copia el derivado de `image_path` a imagenes/ y devuelve su ruta relativa a la raíz."""
+        variant = get_variant(get_image_path(image_path), slot)
+        if not variant or variant.startswith(("http://", "https://")):
+            return variant or PLACEHOLDER_IMAGE
+        # Los derivados llevan el hash del original en el nombre: nunca se pisan
+        name = os.path.basename(variant)
+        target = os.path.join(self.out_dir, IMAGES_DIR, name)
+        if not os.path.exists(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copyfile(variant, target)
+        relative = f"{IMAGES_DIR}/{name}"
+        self._assets.add(relative)
+        return relative
+
+    def _font(self, path):
+        name = os.path.basename(path)
+        target = os.path.join(self.out_dir, FONTS_DIR, name)
+        if not os.path.exists(target) or file_hash(target) != file_hash(path):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copyfile(path, target)
+        relative = f"{FONTS_DIR}/{name}"
+        self._assets.add(relative)
+        # La hoja de estilos está en la raíz del sitio
+        return f"{relative}?v={file_hash(path)[:12]}"
+
+    def bundle_style(self):
+        """Escribe style.css minificado con las fuentes locales y devuelve su URL versionada."""
+        try:
+            with open(STYLE_FILE, encoding="utf-8") as f:
+                css = font_faces(self._font) + minify_css(f.read())
+        except OSError:
+            css = font_faces(self._font)
+        target = os.path.join(self.out_dir, STYLE_FILE)
+        digest = hashlib.sha1(css.encode("utf-8")).hexdigest()
+        if not os.path.exists(target) or _file_digest(target) != digest:
+            atomic_write(target, css)
+        self._assets.add(STYLE_FILE)
+        return f"{STYLE_FILE}?v={digest[:12]}"
+
+    # --- Páginas ---
+    def page(self, path, template, sources, build):
+        """
+        Escribe `path` con `template` y el contexto que devuelve `build()`,
+        salvo que `sources` (los registros de los que depende) no hayan cambiado.
+        """
+        digest = _digest([self._chrome, template, sources])
+        previous = self.previous["pages"].get(path)
+        target = os.path.join(self.out_dir, *path.split("/"))
+        if not self.force and previous and previous["hash"] == digest and os.path.exists(target):
+            self.pages[path] = previous
+            self.unchanged += 1
+            return
+        self._assets = set()
+        context = build()
+        html = self.env.get_template(template).render(root="../" * path.count("/"), **self.common, **context)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        atomic_write(target, html)
+        self.pages[path] = {"hash": digest, "assets": sorted(self._assets)}
+        self.written += 1
+
+    def _card(self, product):
+        return {
+            "href": f"producto/{slugify(product.id)}.html",
+            "image": self.image(product.imagen, "card"),
+            "nombre": product.nombre,
+            "precio": product.precio,
+            "envio_gratis": product.id in self.free_shipping_ids,
+        }
+
+    def _listing(self, base, title, description, products):
+        pages = page_count(len(products), PAGE_SIZE)
+        for number in range(1, pages + 1):
+            visible = products[(number - 1) * PAGE_SIZE:number * PAGE_SIZE]
+            self.page(
+                f"{base}/{number}.html", "listing.html", [title, description, number, pages, visible],
+                lambda visible=visible, number=number: {
+                    "title": title, "description": description, "page": number, "pages": pages,
+                    "products": [self._card(product) for product in visible],
+                },
+            )
+
+    def export(self):
+        catalog = self.catalog
+        data = catalog.data
+        products = catalog.products
+        home_texts = data.get("home_texts", {})
+        best_sellers = top_products(catalog)
+        banners = [item.get("img") for item in data.get("banners", ()) if item.get("img")]
+
+        self.page("index.html", "index.html", [home_texts, banners, best_sellers, render_fragment(catalog, "benefits")], lambda: {
+            "home_texts": home_texts,
+            "banners": [self.image(banner, "banner") for banner in banners],
+            "benefits": render_fragment(catalog, "benefits"),
+            "best_sellers": [self._card(product) for product in best_sellers],
+        })
+        self._listing("catalogo", "Todos los Productos", "", products)
+        for categoria in CATEGORIES:
+            positions = get_category_positions(catalog, categoria)
+            self._listing(f"categoria/{slugify(categoria)}", categoria, "",
+                          [products[position] for position in positions])
+        for product in products:
+            free_shipping = product.id in self.free_shipping_ids
+            self.page(
+                f"producto/{slugify(product.id)}.html", "product.html", [product, free_shipping],
+                lambda product=product, free_shipping=free_shipping: {
+                    "product": {**dataclasses.asdict(product), "image": self.image(product.imagen, "detail"),
+                                "envio_gratis": free_shipping},
+                },
+            )
+        news = data.get("news", ())
+        self.page("novedades.html", "news.html", [news], lambda: {
+            "news": [{**item, "image": self.image(item["imagen"], "news") if item.get("imagen") else None} for item in news],
+        })
+        contact = render_fragment(catalog, "contact_info")
+        self.page("contacto.html", "page.html", [contact], lambda: {
+            "title": "Contacto",
+            "body": f"<h1 class='page-title'>Contáctanos</h1>{contact}"
+                    f"<p class='section-description'><a href='{self.app_url}'>Escríbenos desde la tienda</a></p>",
+        })
+        about = render_fragment(catalog, "about_us")
+        self.page("sobre-nosotros.html", "page.html", [about], lambda: {"title": "Sobre Nosotros", "body": about})
+
+        removed = self._cleanup()
+        self._write_manifest()
+        return {"escritas": self.written, "sin_cambios": self.unchanged, "eliminadas": removed}
+
+    def _cleanup(self):
+        """Borra las páginas e imágenes que quedaron de exportaciones anteriores."""
+        removed = 0
+        for path in set(self.previous["pages"]) - set(self.pages):
+            try:
+                os.remove(os.path.join(self.out_dir, *path.split("/")))
+                removed += 1
+            except FileNotFoundError:
+                pass
+        assets = self._current_assets()
+        for asset in set(self.previous["assets"]) - assets:
+            try:
+                os.remove(os.path.join(self.out_dir, *asset.split("/")))
+            except FileNotFoundError:
+                pass
+        return removed
+
+    def _current_assets(self):
+        assets = set(self._common_assets)
+        for page in self.pages.values():
+            assets.update(page["assets"])
+        return assets
+
+    def _write_manifest(self):
+        manifest = {"pages": self.pages, "assets": sorted(self._current_assets())}
+        atomic_write(os.path.join(self.out_dir, MANIFEST_FILE), json.dumps(manifest, indent=1, ensure_ascii=False))
+
+
+def export_site(out_dir, data_path=None, app_url=APP_URL, force=False):
+    """Exporta el catálogo de `data_path` (o el configurado) a `out_dir`."""
+    catalog = CatalogCache(open_store(data_path)).get()
+    if catalog.error:
+        raise SystemExit(catalog.error)
+    os.makedirs(out_dir, exist_ok=True)
+    return SiteExporter(catalog, out_dir, app_url=app_url, force=force).export()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta la tienda como sitio estático.")
+    parser.add_argument("--out", default="sitio", help="Directorio de salida")
+    parser.add_argument("--data", default=None, help="Archivo de datos (por defecto MINERVA_DATA_FILE o data.json)")
+    parser.add_argument("--app-url", default=APP_URL, help="URL de la app de Streamlit (búsqueda y carrito)")
+    parser.add_argument("--force", action="store_true", help="Regenera todas las páginas")
+    args = parser.parse_args()
+    result = export_site(args.out, args.data, args.app_url, args.force)
+    print(f"{result['escritas']} páginas escritas, {result['sin_cambios']} sin cambios, "
+          f"{result['eliminadas']} eliminadas en {args.out}/")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+"""
+Persistencia de data.json con escrituras atómicas e incrementales.
+
+- data.json es la base completa y solo se reescribe al compactar, siempre a
+  un archivo temporal que luego reemplaza al original (os.replace), de modo
+  que un corte a mitad de escritura nunca deja un JSON truncado.
+- Cada guardado agrega al journal (data.json.journal, una línea JSON por
+  guardado) solo las operaciones que cambiaron: el producto editado, la FAQ
+  eliminada o la lista reordenada, no el catálogo entero.
+- Al leer se aplica el journal sobre la base. Cuando el journal crece se
+  compacta en un data.json nuevo.
+- Los guardados muy seguidos (p. ej. varios ▲/▼ en el menú) se agrupan en
+  una sola escritura.
+"""
+import atexit
+import copy
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from filelock import FileLock
+
+logger = logging.getLogger(__name__)
+
+# Se compacta cuando el journal supera esta cantidad de registros...
+COMPACT_MAX_RECORDS = 500
+# ...o cuando pesa más que esta fracción de data.json
+COMPACT_MAX_RATIO = 0.5
+# Ventana (segundos) en la que varios guardados seguidos se agrupan
+COALESCE_DELAY = 0.5
+
+DATA_FILE = os.environ.get("MINERVA_DATA_FILE", "data.json")
+# "json" (data.json + journal) o "sqlite" (ver minerva/sqlite_store.py)
+STORAGE_BACKEND = os.environ.get("MINERVA_STORAGE", "json")
+SQLITE_FILE = os.environ.get("MINERVA_DB_FILE", "minerva.db")
+
+
+class StoreError(OSError):
+    """El almacenamiento no pudo guardar el documento (queda en CatalogWriter.last_error)."""
+
+
+# --- Diferencias entre documentos ---
+def _is_keyed_list(value):
+    return isinstance(value, list) and all(isinstance(item, dict) and "id" in item for item in value)
+
+
+def _diff_keyed_list(key, old, new):
+    old_ids = [item["id"] for item in old]
+    new_ids = [item["id"] for item in new]
+    old_set, new_set = set(old_ids), set(new_ids)
+    if len(old_set) != len(old_ids) or len(new_set) != len(new_ids):
+        return None
+    # Solo se expresan como operaciones sueltas los cambios que conservan el
+    # orden (editar, eliminar, agregar al final); un reordenamiento reemplaza la lista
+    expected = [item_id for item_id in old_ids if item_id in new_set] + [item_id for item_id in new_ids if item_id not in old_set]
+    if expected != new_ids:
+        return None
+    old_by_id = {item["id"]: item for item in old}
+    ops = [{"op": "delete", "key": key, "id": item_id} for item_id in old_ids if item_id not in new_set]
+    ops.extend({"op": "upsert", "key": key, "item": item} for item in new if old_by_id.get(item["id"]) != item)
+    return ops
+
+
+def diff_documents(old, new):
+    """Lista de operaciones que transforman `old` en `new`."""
+    ops = []
+    for key in old:
+        if key not in new:
+            ops.append({"op": "drop", "key": key})
+    for key, value in new.items():
+        if key in old and old[key] == value:
+            continue
+        item_ops = None
+        if key in old and _is_keyed_list(old[key]) and _is_keyed_list(value):
+            item_ops = _diff_keyed_list(key, old[key], value)
+        ops.extend(item_ops if item_ops is not None else [{"op": "set", "key": key, "value": value}])
+    return ops
+
+
+def apply_ops(doc, ops):
+    """Aplica sobre `doc` (en el lugar) operaciones generadas por diff_documents."""
+    for op in ops:
+        kind, key = op["op"], op["key"]
+        if kind == "set":
+            doc[key] = op["value"]
+        elif kind == "drop":
+            doc.pop(key, None)
+        elif kind == "delete":
+            doc[key] = [item for item in doc.get(key, []) if item.get("id") != op["id"]]
+        elif kind == "upsert":
+            items = doc.setdefault(key, [])
+            for i, item in enumerate(items):
+                if item.get("id") == op["item"]["id"]:
+                    items[i] = op["item"]
+                    break
+            else:
+                items.append(op["item"])
+    return doc
+
+
+# --- Archivos ---
+def _stat(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def atomic_write(path, text):
+    """Escribe `text` en un temporal del mismo directorio y lo mueve sobre `path`."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class JsonStore:
+    """data.json + journal de operaciones."""
+
+    def __init__(self, path):
+        self.path = path
+        self.journal_path = path + ".journal"
+        self._lock = FileLock(path + ".lock")
+
+    def fingerprint(self):
+        """Identifica el estado en disco sin leer el contenido (None si no hay datos)."""
+        base = _stat(self.path)
+        if base is None:
+            return None
+        return (base, _stat(self.journal_path))
+
+    def watched_files(self):
+        """Archivos cuyo cambio implica una versión nueva del catálogo."""
+        return (self.path, self.journal_path)
+
+    def _read_raw(self):
+        with open(self.path, "rb") as f:
+            base = f.read()
+        try:
+            with open(self.journal_path, "rb") as f:
+                journal = f.read()
+        except FileNotFoundError:
+            journal = b""
+        return base, journal
+
+    def read(self, known_version=None):
+        """
+        Devuelve (documento, versión). Si el contenido coincide con
+        `known_version` no se parsea y el documento es None. Lanza ValueError
+        si data.json no es un JSON válido.
+        """
+        base, journal = self._read_raw()
+        version = hashlib.sha1(base + b"\0" + journal).hexdigest()
+        if version == known_version:
+            return None, version
+        doc = json.loads(base)
+        for line in journal.splitlines():
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # Última línea incompleta por un corte durante el append: se descarta
+                logger.warning("Registro incompleto en %s, se ignora.", self.journal_path)
+                continue
+            apply_ops(doc, record["ops"])
+        return doc, version
+
+    def write(self, doc, base=None, ops=None):
+        """
+        Persiste `doc`. Con `ops` (las operaciones que llevan de lo guardado
+        a `doc`) o con `base` (el documento tal como se leyó, para calcularlas)
+        solo se agregan al journal las diferencias; sin ninguno se reescribe todo.
+        """
+        with self._lock:
+            if (base is None and ops is None) or not os.path.exists(self.path):
+                self._compact(doc)
+                return
+            if ops is None:
+                ops = diff_documents(base, doc)
+            if not ops:
+                return
+            line = json.dumps({"ts": time.time(), "ops": ops}, ensure_ascii=False) + "\n"
+            with open(self.journal_path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            if self._should_compact():
+                # Se compacta lo que hay en disco: el journal puede tener
+                # registros de otros procesos que `doc` no incluye
+                self._compact(self.read()[0])
+
+    def _should_compact(self):
+        journal = _stat(self.journal_path)
+        base = _stat(self.path)
+        if journal is None or base is None:
+            return False
+        if journal[1] > base[1] * COMPACT_MAX_RATIO:
+            return True
+        with open(self.journal_path, "rb") as f:
+            return sum(1 for _ in f) > COMPACT_MAX_RECORDS
+
+    def _compact(self, doc):
+        atomic_write(self.path, json.dumps(doc, indent=4, ensure_ascii=False))
+        # Si el proceso se corta antes de vaciar el journal, volver a aplicarlo
+        # sobre la base nueva es inofensivo: las operaciones son idempotentes
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+
+
+class CatalogWriter:
+    """Agrupa guardados seguidos y los escribe en segundo plano."""
+
+    def __init__(self, store, delay=COALESCE_DELAY):
+        self.store = store
+        self.delay = delay
+        self.last_error = None
+        self._base = None
+        self._pending = None
+        # Operaciones de los guardados pendientes (None: se calculan con diff_documents)
+        self._pending_ops = None
+        # (callback, documento) de cada guardado pendiente, para después de escribir
+        self._on_written = []
+        self._timer = None
+        self._last_flush = 0.0
+        self._listeners = []
+        self._lock = threading.RLock()
+
+    def subscribe(self, callback):
+        """Registra `callback()`, que se llama después de cada escritura en disco."""
+        self._listeners.append(callback)
+
+    def load(self):
+        """Documento actual (incluye guardados aún no escritos). None si no existe data.json."""
+        with self._lock:
+            if self._pending is not None:
+                return copy.deepcopy(self._pending)
+            if not os.path.exists(self.store.path):
+                self._base = None
+                return None
+            try:
+                doc, _ = self.store.read()
+            except ValueError:
+                self._base = None
+                raise
+            self._base = copy.deepcopy(doc)
+            return doc
+
+    def save(self, doc, ops=None, on_written=None):
+        """
+        Registra `doc` para guardar. Si hubo una escritura hace menos de
+        `delay` segundos, se posterga y se agrupa con los siguientes guardados.
+
+        Con `ops` (las operaciones de diff_documents que llevan del documento
+        actual a `doc`) no se copia ni se compara el catálogo entero: `doc`
+        queda en manos del escritor y quien lo pasa no debe modificarlo.
+
+        `on_written(doc)` se llama cuando `doc` quedó escrito en disco; si la
+        escritura falla, se llama con la siguiente que funcione.
+        """
+        with self._lock:
+            if ops is None:
+                self._pending_ops = None
+                doc = copy.deepcopy(doc)
+            elif self._pending is None or self._pending_ops is not None:
+                self._pending_ops = (self._pending_ops or []) + list(ops)
+            self._pending = doc
+            if on_written is not None:
+                self._on_written.append((on_written, doc))
+            if self._timer is not None:
+                return
+            wait = self.delay - (time.monotonic() - self._last_flush)
+            if wait <= 0:
+                self.flush()
+            else:
+                self._timer = threading.Timer(wait, self._flush_in_background)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _flush_in_background(self):
+        try:
+            self.flush()
+        except OSError as e:
+            logger.error("Error al guardar %s: %s", self.store.path, e)
+
+    def flush(self):
+        """Escribe ya los cambios pendientes."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._pending is None:
+                return
+            doc = self._pending
+            try:
+                self.store.write(doc, base=self._base, ops=self._pending_ops)
+            except OSError as e:
+                self.last_error = e
+                raise
+            self.last_error = None
+            self._base = doc
+            self._pending = None
+            self._pending_ops = None
+            self._last_flush = time.monotonic()
+            written, self._on_written = self._on_written, []
+        for callback, saved in written:
+            callback(saved)
+        for callback in list(self._listeners):
+            callback()
+
+
+def open_store(path=None):
+    """Almacenamiento configurado con MINERVA_STORAGE (por defecto data.json)."""
+    if STORAGE_BACKEND == "sqlite":
+        from minerva.sqlite_store import SqliteStore
+        return SqliteStore(path or SQLITE_FILE)
+    return JsonStore(path or DATA_FILE)
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def get_writer(path=None):
+    """Escritor compartido por todas las sesiones del proceso."""
+    store = open_store(path)
+    with _writers_lock:
+        if store.path not in _writers:
+            _writers[store.path] = CatalogWriter(store)
+        return _writers[store.path]
+
+
+@atexit.register
+def _flush_all():
+    for writer in list(_writers.values()):
+        try:
+            writer.flush()
+        except OSError as e:
+            logger.error("Error al guardar %s al salir: %s", writer.store.path, e)
@@ -0,0 +1,179 @@
+"""
+Historial de versiones del catálogo.
+
+Cada publicación del panel (save_data) registra una versión. Una versión es
+un manifiesto pequeño (id, fecha, mensaje y, por colección de data.json, el
+hash de su contenido); el contenido de cada colección se guarda una sola vez
+como objeto direccionado por hash. Las colecciones que no cambiaron apuntan
+al mismo objeto que la versión anterior, así que editar un FAQ no vuelve a
+copiar los productos.
+
+Con esto se puede volver a cualquier versión (se publica su contenido como
+una versión nueva), comparar dos versiones leyendo solo las colecciones que
+difieren, y la tienda carga la última versión si data.json está dañado.
+
+Se conservan las últimas MAX_VERSIONS versiones; al superarlas por una tanda
+se borran las más viejas y los objetos que ya no usa ninguna.
+
+Estructura (junto al archivo de datos, p. ej. data.json.versions/):
+    objetos/<hash>.json     contenido de una colección
+    versiones/<id>.json     manifiesto de cada versión
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+from filelock import FileLock
+
+from minerva.storage import atomic_write, open_store
+
+logger = logging.getLogger(__name__)
+
+VERSIONS_SUFFIX = ".versions"
+# Versiones que se conservan (las más viejas se borran de a tandas)
+MAX_VERSIONS = int(os.environ.get("MINERVA_MAX_VERSIONS", "100"))
+PRUNE_BATCH = max(1, MAX_VERSIONS // 10)
+
+
+def _canonical(value):
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+
+
+class VersionStore:
+    """Objetos por contenido y manifiestos de versión en `root`."""
+
+    def __init__(self, root):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objetos")
+        self.versions_dir = os.path.join(root, "versiones")
+        self._lock = FileLock(root + ".lock")
+
+    # --- Objetos ---
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, f"{digest}.json")
+
+    def _store_object(self, value):
+        text = _canonical(value)
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        path = self._object_path(digest)
+        # Mismo hash, mismo contenido: si ya existe no se vuelve a escribir
+        if not os.path.exists(path):
+            atomic_write(path, text)
+        return digest
+
+    def _load_object(self, digest):
+        with open(self._object_path(digest), encoding="utf-8") as f:
+            return json.load(f)
+
+    # --- Manifiestos ---
+    def _manifest_path(self, version_id):
+        return os.path.join(self.versions_dir, f"{version_id:06d}.json")
+
+    def ids(self):
+        """Ids de las versiones registradas, de la más nueva a la más vieja."""
+        try:
+            names = os.listdir(self.versions_dir)
+        except FileNotFoundError:
+            return []
+        return sorted((int(name[:-5]) for name in names if name.endswith(".json") and name[:-5].isdigit()), reverse=True)
+
+    def get(self, version_id):
+        """Manifiesto de una versión (None si no existe)."""
+        try:
+            with open(self._manifest_path(version_id), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def latest(self):
+        ids = self.ids()
+        return self.get(ids[0]) if ids else None
+
+    def history(self):
+        """Manifiestos de todas las versiones, de la más nueva a la más vieja."""
+        return [manifest for manifest in map(self.get, self.ids()) if manifest is not None]
+
+    def record(self, doc, message="", ops=None):
+        """
+        Registra `doc` como versión nueva y devuelve su manifiesto. Con `ops`
+        (las operaciones desde la última versión) solo se serializan las
+        colecciones que tocan; las demás reutilizan los objetos de esa
+        versión. Si no cambió nada, devuelve la última versión.
+        """
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.versions_dir, exist_ok=True)
+        with self._lock:
+            latest = self.latest()
+            parent = latest["colecciones"] if latest else {}
+            if ops is None or latest is None:
+                touched = set(doc)
+            else:
+                touched = {op["key"] for op in ops} | (set(doc) - set(parent))
+            collections = {key: self._store_object(value) if key in touched else parent[key]
+                           for key, value in doc.items()}
+            if latest is not None and parent == collections:
+                return latest
+            manifest = {
+                "id": latest["id"] + 1 if latest else 1,
+                "fecha": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "mensaje": message,
+                "colecciones": collections,
+                # Colecciones nuevas, modificadas o quitadas respecto de la anterior
+                "cambios": sorted(key for key in set(collections) | set(parent) if collections.get(key) != parent.get(key)),
+            }
+            atomic_write(self._manifest_path(manifest["id"]), json.dumps(manifest, indent=1, ensure_ascii=False))
+            self._prune()
+        return manifest
+
+    def _prune(self):
+        """Borra las versiones que exceden MAX_VERSIONS y los objetos sin referencias (con el lock tomado)."""
+        ids = self.ids()
+        if len(ids) <= MAX_VERSIONS + PRUNE_BATCH:
+            return
+        for version_id in ids[MAX_VERSIONS:]:
+            os.remove(self._manifest_path(version_id))
+        used = set()
+        for manifest in self.history():
+            used.update(manifest["colecciones"].values())
+        for name in os.listdir(self.objects_dir):
+            if name.endswith(".json") and name[:-5] not in used:
+                os.remove(os.path.join(self.objects_dir, name))
+
+    def load(self, version_id):
+        """Documento completo de una versión (None si no existe)."""
+        manifest = self.get(version_id)
+        if manifest is None:
+            return None
+        return {key: self._load_object(digest) for key, digest in manifest["colecciones"].items()}
+
+    def diff(self, old_id, new_id):
+        """
+        (anterior, nuevo) con solo las colecciones que difieren entre dos
+        versiones; las que comparten objeto no se leen.
+        """
+        old, new = self.get(old_id), self.get(new_id)
+        if old is None or new is None:
+            raise KeyError(old_id if old is None else new_id)
+        old_collections, new_collections = old["colecciones"], new["colecciones"]
+        changed = [key for key in set(old_collections) | set(new_collections)
+                   if old_collections.get(key) != new_collections.get(key)]
+        return (
+            {key: self._load_object(old_collections[key]) for key in changed if key in old_collections},
+            {key: self._load_object(new_collections[key]) for key in changed if key in new_collections},
+        )
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_versions(path=None):
+    """Historial del archivo de datos configurado (o de `path`)."""
+    root = open_store(path).path + VERSIONS_SUFFIX
+    with _stores_lock:
+        if root not in _stores:
+            _stores[root] = VersionStore(root)
+        return _stores[root]
@@ -0,0 +1,67 @@
+"""
+Aviso de cambios en los archivos del catálogo entre procesos.
+
+La tienda (app.py) y el panel (admin_app.py) corren en procesos distintos.
+Con watchdog, el sistema operativo avisa cuando el panel escribe data.json,
+su journal o la base SQLite, y la tienda invalida su caché en ese momento sin
+tener que consultar el disco en cada ejecución. Si watchdog no está instalado
+(o no se puede vigilar el directorio) se devuelve None y la caché vuelve a
+comparar mtime/tamaño en cada acceso.
+"""
+import logging
+import os
+
+try:
+    from watchdog.events import (
+        EVENT_TYPE_CLOSED, EVENT_TYPE_CREATED, EVENT_TYPE_DELETED, EVENT_TYPE_MODIFIED, EVENT_TYPE_MOVED,
+        FileSystemEventHandler,
+    )
+    from watchdog.observers import Observer
+except ImportError:  # pragma: no cover - dependencia opcional
+    FileSystemEventHandler = object
+    Observer = None
+
+# Eventos que implican un cambio de contenido. "opened" y "closed_no_write"
+# los produce la propia lectura de la caché y no deben invalidarla.
+CHANGE_EVENTS = frozenset() if Observer is None else frozenset({
+    EVENT_TYPE_CREATED, EVENT_TYPE_MODIFIED, EVENT_TYPE_MOVED, EVENT_TYPE_DELETED, EVENT_TYPE_CLOSED,
+})
+
+logger = logging.getLogger(__name__)
+
+
+class _Handler(FileSystemEventHandler):
+    def __init__(self, paths, callback):
+        self.paths = paths
+        self.callback = callback
+
+    def on_any_event(self, event):
+        if event.event_type not in CHANGE_EVENTS:
+            return
+        # Las escrituras atómicas llegan como "moved" del temporal al destino
+        for path in (event.src_path, getattr(event, "dest_path", "")):
+            if path and os.path.abspath(path) in self.paths:
+                self.callback()
+                return
+
+
+def watch_files(paths, callback):
+    """
+    Llama a `callback` cada vez que se crea, modifica, mueve o borra alguno
+    de `paths`. Devuelve el observador en marcha, o None si no hay watchdog.
+    """
+    if Observer is None:
+        return None
+    paths = frozenset(os.path.abspath(path) for path in paths)
+    observer = Observer()
+    observer.daemon = True
+    handler = _Handler(paths, callback)
+    try:
+        for directory in {os.path.dirname(path) for path in paths}:
+            observer.schedule(handler, directory, recursive=False)
+        observer.start()
+    except OSError as e:
+        # p. ej. se agotó el límite de inotify del sistema
+        logger.warning("No se pueden vigilar los cambios del catálogo (%s); se comprobará el disco en cada acceso.", e)
+        return None
+    return observer
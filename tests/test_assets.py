@@ -0,0 +1,16 @@
+from minerva.assets import minify_css
+
+
+def test_minify_css_keeps_quoted_text():
+    css = """
+    /* Comillas tipográficas */
+    blockquote::before {
+        content: "«  /* no es comentario */  ";
+        font-family: 'Open  Sans', serif;
+        margin : 0  auto ;
+    }
+    """
+    assert minify_css(css) == (
+        "blockquote::before{content: \"«  /* no es comentario */  \";"
+        "font-family: 'Open  Sans',serif;margin : 0 auto;}"
+    )
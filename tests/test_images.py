@@ -0,0 +1,20 @@
+import os
+
+from minerva.images import PLACEHOLDER_IMAGE, ImageResolver
+
+
+def test_misses_hit_the_disk_once_until_the_index_is_rebuilt(tmp_path, monkeypatch):
+    (tmp_path / "images").mkdir()
+    resolver = ImageResolver(base_dir=str(tmp_path), ttl=3600)
+    checks = []
+    exists = os.path.exists
+    monkeypatch.setattr(os.path, "exists", lambda path: checks.append(path) or exists(path))
+
+    for _ in range(3):
+        assert resolver.resolve("images/nueva.jpg") == PLACEHOLDER_IMAGE
+    assert len(checks) == 1
+
+    (tmp_path / "images" / "nueva.jpg").write_bytes(b"")
+    resolver.refresh()
+    assert resolver.resolve("images/nueva.jpg") == "images/nueva.jpg"
+    assert resolver.stats()["hits"] == 1 and resolver.stats()["misses"] == 3
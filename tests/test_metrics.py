@@ -0,0 +1,12 @@
+from minerva import metrics
+
+
+def test_profile_query_param_needs_the_env_opt_in(monkeypatch):
+    monkeypatch.setattr(metrics, "PROFILE_ALL", False)
+    monkeypatch.setattr(metrics, "PROFILE_PARAM", False)
+    monkeypatch.setattr(metrics, "install", lambda: None)
+    assert metrics.begin_rerun(requested=True) is False
+
+    monkeypatch.setattr(metrics, "PROFILE_PARAM", True)
+    assert metrics.begin_rerun(requested=True) is True
+    metrics._local.rerun = None
@@ -0,0 +1,41 @@
+import pytest
+
+from minerva.pricing import DEFAULT_FREE_SHIPPING_CENTS, format_price, free_shipping_threshold, parse_price
+
+
+@pytest.mark.parametrize("text, cents", [
+    ("$15.000", 1_500_000),
+    ("8000", 800_000),
+    ("$15.999,50", 1_599_950),
+    ("1.234.567,5", 123_456_750),
+    ("15.5", 1_550),
+    ("1000.00", 100_000),
+    (",50", 50),
+    (1200, 120_000),
+    (15.5, 1_550),
+])
+def test_parse_price(text, cents):
+    assert parse_price(text) == cents
+
+
+@pytest.mark.parametrize("text", [
+    "1,234.56", "1,234", "1,234,567", "1.23.4", "12.34.567", "-2,50", -3, "", None, "Consultar",
+])
+def test_parse_price_rejects_ambiguous_or_invalid(text):
+    assert parse_price(text) is None
+
+
+@pytest.mark.parametrize("cents, text", [
+    (1_500_000, "$15.000"),
+    (1_599_950, "$15.999,50"),
+    (5, "$0,05"),
+    (0, "$0"),
+    (-250, "-$2,50"),
+])
+def test_format_price(cents, text):
+    assert format_price(cents) == text
+
+
+def test_free_shipping_threshold_from_banner_text():
+    assert free_shipping_threshold({"cta_texts": {"banner_text": "Envíos gratis en compras mayores a $50.000."}}) == 5_000_000
+    assert free_shipping_threshold({"cta_texts": {"banner_text": "Envíos a todo el país"}}) == DEFAULT_FREE_SHIPPING_CENTS
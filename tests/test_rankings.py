@@ -0,0 +1,9 @@
+from minerva.catalog import CatalogSnapshot, freeze
+from minerva.rankings import top_products
+
+
+def test_top_products_by_sales_with_catalog_order_as_tiebreak():
+    products = [{"id": str(i), "nombre": f"P{i}", "ventas": ventas} for i, ventas in enumerate([5, 9, 5, 1, "7"])]
+    catalog = CatalogSnapshot(freeze({"products": products}), "v1")
+    assert [product.id for product in top_products(catalog, 3)] == ["1", "4", "0"]
+    assert top_products(catalog, 3) is top_products(catalog, 3)
@@ -0,0 +1,8 @@
+from minerva.schema import DEFAULT_PRECIO, validate_products
+
+
+def test_null_price_is_shown_as_unavailable():
+    products, errors = validate_products([{"id": "a", "nombre": "Shampoo", "precio": None}])
+    assert errors == []
+    assert products[0].precio == DEFAULT_PRECIO
+    assert products[0].precio_centavos is None
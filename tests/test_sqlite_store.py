@@ -0,0 +1,33 @@
+import pytest
+
+from minerva.sqlite_store import SqliteStore, migrate
+from minerva.storage import CatalogWriter, StoreError
+
+
+@pytest.mark.parametrize("products", [
+    [{"id": "a", "nombre": "Uno"}, {"id": "a", "nombre": "Dos"}],
+    [{"id": "a", "nombre": "Uno"}, {"nombre": "Sin id"}],
+])
+def test_invalid_products_are_recorded_as_save_error(tmp_path, products):
+    store = SqliteStore(str(tmp_path / "minerva.db"))
+    store.write({"products": [{"id": "a", "nombre": "Uno"}]})
+    writer = CatalogWriter(store, delay=0)
+    writer.load()
+
+    with pytest.raises(StoreError):
+        writer.save({"products": products})
+    assert isinstance(writer.last_error, StoreError)
+    # La base queda como estaba
+    assert store.read()[0]["products"] == [{"id": "a", "nombre": "Uno"}]
+
+    # Un guardado válido posterior se escribe y limpia el error
+    writer.save({"products": [{"id": "b", "nombre": "Otro"}]})
+    assert writer.last_error is None
+    assert store.read()[0]["products"] == [{"id": "b", "nombre": "Otro"}]
+
+
+def test_migrate_reports_products_without_id(tmp_path):
+    data_path = tmp_path / "data.json"
+    data_path.write_text('{"products": [{"id": "a", "nombre": "Uno"}, {"nombre": "Sin id"}]}', encoding="utf-8")
+    with pytest.raises(SystemExit, match="posición 2 \\(Sin id\\)"):
+        migrate(str(tmp_path / "minerva.db"), str(data_path), legacy_path=None)
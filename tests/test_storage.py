@@ -0,0 +1,147 @@
+import copy
+import json
+
+from minerva import storage
+from minerva.storage import CatalogWriter, JsonStore, apply_ops, diff_documents
+
+DOC = {
+    "products": [{"id": "a", "nombre": "Uno"}, {"id": "b", "nombre": "Dos"}],
+    "faqs": [{"q": "¿Envíos?", "a": "Sí"}],
+    "home_texts": {"hero_title": "Hola"},
+}
+
+
+def test_diff_of_equal_documents_is_empty():
+    assert diff_documents(DOC, copy.deepcopy(DOC)) == []
+
+
+def test_keyed_list_edits_are_item_operations():
+    new = copy.deepcopy(DOC)
+    new["products"][0]["nombre"] = "Uno editado"
+    new["products"].pop(1)
+    new["products"].append({"id": "c", "nombre": "Tres"})
+    ops = diff_documents(DOC, new)
+    assert ops == [
+        {"op": "delete", "key": "products", "id": "b"},
+        {"op": "upsert", "key": "products", "item": {"id": "a", "nombre": "Uno editado"}},
+        {"op": "upsert", "key": "products", "item": {"id": "c", "nombre": "Tres"}},
+    ]
+    assert apply_ops(copy.deepcopy(DOC), ops) == new
+
+
+def test_reorders_and_unkeyed_collections_replace_the_value():
+    new = copy.deepcopy(DOC)
+    new["products"].reverse()
+    new["faqs"].append({"q": "¿Pagos?", "a": "Tarjeta"})
+    del new["home_texts"]
+    ops = diff_documents(DOC, new)
+    assert {"op": "drop", "key": "home_texts"} in ops
+    assert {"op": "set", "key": "products", "value": new["products"]} in ops
+    assert {"op": "set", "key": "faqs", "value": new["faqs"]} in ops
+    assert apply_ops(copy.deepcopy(DOC), ops) == new
+
+
+def test_writes_append_to_the_journal_and_reads_replay_it(tmp_path):
+    path = str(tmp_path / "data.json")
+    store = JsonStore(path)
+    store.write(DOC)
+    new = copy.deepcopy(DOC)
+    new["products"][1]["nombre"] = "Dos editado"
+    store.write(new, base=DOC)
+
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f) == DOC
+    with open(store.journal_path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert [record["ops"] for record in records] == [diff_documents(DOC, new)]
+    assert store.read()[0] == new
+
+
+def test_incomplete_journal_line_is_ignored(tmp_path):
+    path = str(tmp_path / "data.json")
+    store = JsonStore(path)
+    store.write(DOC)
+    with open(store.journal_path, "w", encoding="utf-8") as f:
+        f.write('{"ts": 1, "ops": [{"op": "drop", "key": "fa')
+    assert store.read()[0] == DOC
+
+
+def test_compaction_rewrites_the_base_and_removes_the_journal(tmp_path, monkeypatch):
+    path = str(tmp_path / "data.json")
+    store = JsonStore(path)
+    store.write(DOC)
+    monkeypatch.setattr(storage, "COMPACT_MAX_RECORDS", 0)
+    new = copy.deepcopy(DOC)
+    new["faqs"] = []
+    store.write(new, base=DOC)
+
+    assert not (tmp_path / "data.json.journal").exists()
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f) == new
+
+
+def test_compaction_keeps_records_from_other_writers(tmp_path, monkeypatch):
+    path = str(tmp_path / "data.json")
+    first, second = JsonStore(path), JsonStore(path)
+    first.write({"faqs": [], "news": []})
+    base, _ = first.read()
+
+    # Otro proceso agrega una novedad después de que `first` leyó
+    second.write({"faqs": [], "news": [{"id": "n1", "titulo": "Nueva"}]}, base=base)
+
+    monkeypatch.setattr(storage, "COMPACT_MAX_RECORDS", 0)
+    first.write({"faqs": [{"q": "¿Envíos?", "a": "Sí"}], "news": []}, base=base)
+
+    doc, _ = JsonStore(path).read()
+    assert doc["faqs"] == [{"q": "¿Envíos?", "a": "Sí"}]
+    assert doc["news"] == [{"id": "n1", "titulo": "Nueva"}]
+
+
+def test_writer_journals_the_ops_it_receives(tmp_path, monkeypatch):
+    path = str(tmp_path / "data.json")
+    JsonStore(path).write(DOC)
+    writer = CatalogWriter(JsonStore(path), delay=60)
+    writer.load()
+    monkeypatch.setattr(storage, "COMPACT_MAX_RATIO", 100)
+    monkeypatch.setattr(storage, "diff_documents", None)  # no se debe recalcular nada
+
+    # El primer guardado se escribe enseguida; los dos siguientes se agrupan
+    first = copy.deepcopy(DOC)
+    first["faqs"] = []
+    writer.save(first, [{"op": "set", "key": "faqs", "value": []}])
+    second = copy.deepcopy(first)
+    second["products"][0]["nombre"] = "Uno editado"
+    writer.save(second, [{"op": "upsert", "key": "products", "item": second["products"][0]}])
+    third = copy.deepcopy(second)
+    del third["home_texts"]
+    writer.save(third, [{"op": "drop", "key": "home_texts"}])
+    writer.flush()
+
+    assert JsonStore(path).read()[0] == third
+    with open(path + ".journal", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert [len(record["ops"]) for record in records] == [1, 2]
+
+
+def test_on_written_runs_only_after_a_successful_write(tmp_path):
+    path = str(tmp_path / "data.json")
+    JsonStore(path).write(DOC)
+    store = JsonStore(path)
+    writer = CatalogWriter(store, delay=60)
+    written = []
+
+    def fail(doc, base=None, ops=None):
+        raise OSError("disco lleno")
+
+    store.write = fail
+    try:
+        writer.save(DOC, on_written=written.append)
+    except OSError:
+        pass
+    assert written == [] and writer.last_error is not None
+
+    del store.write
+    new = copy.deepcopy(DOC)
+    new["faqs"] = []
+    writer.save(new, on_written=written.append)
+    assert written == [DOC, new]
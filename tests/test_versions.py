@@ -0,0 +1,39 @@
+import copy
+
+from minerva import versions
+from minerva.storage import diff_documents
+from minerva.versions import VersionStore
+
+DOC = {
+    "products": [{"id": str(i), "nombre": f"Producto {i}"} for i in range(50)],
+    "faqs": [{"q": "¿Envíos?", "a": "Sí"}],
+}
+
+
+def test_record_with_ops_only_serializes_touched_collections(tmp_path, monkeypatch):
+    store = VersionStore(str(tmp_path / "data.json.versions"))
+    first = store.record(DOC, "inicial")
+
+    stored = []
+    original = VersionStore._store_object
+    monkeypatch.setattr(VersionStore, "_store_object", lambda self, value: stored.append(value) or original(self, value))
+    new = copy.deepcopy(DOC)
+    new["faqs"].append({"q": "¿Pagos?", "a": "Tarjeta"})
+    second = store.record(new, "faq", diff_documents(DOC, new))
+
+    assert stored == [new["faqs"]]
+    assert second["colecciones"]["products"] == first["colecciones"]["products"]
+    assert second["cambios"] == ["faqs"]
+    assert store.load(second["id"]) == new
+
+
+def test_old_versions_and_unused_objects_are_pruned(tmp_path, monkeypatch):
+    monkeypatch.setattr(versions, "MAX_VERSIONS", 3)
+    monkeypatch.setattr(versions, "PRUNE_BATCH", 2)
+    store = VersionStore(str(tmp_path / "data.json.versions"))
+    for i in range(6):
+        store.record({"faqs": [{"q": str(i), "a": ""}]})
+
+    assert store.ids() == [6, 5, 4]
+    assert store.load(4) == {"faqs": [{"q": "3", "a": ""}]}
+    assert len(list((tmp_path / "data.json.versions" / "objetos").iterdir())) == 3
@@ -0,0 +1,43 @@
+"""La vigilancia de archivos solo invalida la caché cuando el catálogo cambia."""
+import json
+import time
+
+import pytest
+
+from minerva.catalog import CatalogCache
+from minerva.storage import JsonStore
+from minerva.watch import Observer
+
+pytestmark = pytest.mark.skipif(Observer is None, reason="watchdog no está instalado")
+
+
+def _wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return condition()
+
+
+def test_idle_get_does_not_reread(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text(json.dumps({"products": []}), encoding="utf-8")
+    store = JsonStore(str(path))
+    reads = []
+    original_read = store.read
+    store.read = lambda *args, **kwargs: reads.append(1) or original_read(*args, **kwargs)
+    cache = CatalogCache(store)
+    assert cache.watch()
+
+    first = cache.get()
+    # Los eventos de la propia lectura (opened, closed_no_write) no deben invalidar
+    time.sleep(0.5)
+    reads.clear()
+    for _ in range(5):
+        assert cache.get() is first
+        time.sleep(0.1)
+    assert reads == []
+
+    path.write_text(json.dumps({"products": [{"id": "1", "nombre": "A", "precio": 1}]}), encoding="utf-8")
+    assert _wait_for(lambda: cache.get() is not first)